@@ -0,0 +1,94 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Measures confirmation throughput against the local SMTP stand-in, with
+# a connection per message and with the connection pool, over plain SMTP
+# and STARTTLS. The STARTTLS runs need openssl for a test certificate.
+#
+#   python bench_smtp.py [--messages 400] [--threads 4]
+
+import argparse
+import os
+import shutil
+import smtplib
+import ssl
+import subprocess
+import tempfile
+import time
+from concurrent import futures
+
+from fake_smtp import FakeSMTPServer
+from smtp_pool import SMTPPool
+from test_smtp_pool import make_message
+
+class PerMessage(object):
+  """Opens, and quits, a connection for every message."""
+  def __init__(self, port, security, ssl_context):
+    self.port = port
+    self.security = security
+    self.ssl_context = ssl_context
+
+  def send(self, message):
+    with smtplib.SMTP('localhost', self.port) as conn:
+      if self.security == 'starttls':
+        conn.starttls(context=self.ssl_context)
+      conn.send_message(message)
+
+  def close(self):
+    pass
+
+def tls_contexts(tmp):
+  cert, key = os.path.join(tmp, 'cert.pem'), os.path.join(tmp, 'key.pem')
+  subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                  '-subj', '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost',
+                  '-keyout', key, '-out', cert], check=True, capture_output=True)
+  server = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+  server.load_cert_chain(cert, key)
+  return server, ssl.create_default_context(cafile=cert)
+
+def run(sender, messages, threads):
+  message = make_message()
+  started = time.perf_counter()
+  with futures.ThreadPoolExecutor(threads) as executor:
+    list(executor.map(lambda _: sender.send(message), range(messages)))
+  sender.close()
+  return messages / (time.perf_counter() - started)
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--messages', type=int, default=400)
+  parser.add_argument('--threads', type=int, default=4)
+  args = parser.parse_args()
+
+  securities = [('none', None, None)]
+  tmp = tempfile.mkdtemp()
+  if shutil.which('openssl'):
+    securities.append(('starttls',) + tls_contexts(tmp))
+  print("{} messages from {} threads".format(args.messages, args.threads))
+  for security, server_context, client_context in securities:
+    server = FakeSMTPServer(ssl_context=server_context).start()
+    senders = [
+      ('per message', PerMessage(server.port, security, client_context)),
+      ('pooled', SMTPPool('localhost', server.port, size=args.threads, security=security,
+                          ssl_context=client_context)),
+    ]
+    for name, sender in senders:
+      connections = server.connections
+      rate = run(sender, args.messages, args.threads)
+      print("{:9s} {:12s} {:8.0f} messages/s {:5d} connections".format(
+        security, name, rate, server.connections - connections))
+    server.stop()
+  shutil.rmtree(tmp)
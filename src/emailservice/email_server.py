@@ -14,15 +14,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from concurrent import futures
 import argparse
 import os
+import smtplib
 import sys
-import time
 import grpc
 import traceback
+from email.message import EmailMessage
 from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateError
-from google.api_core.exceptions import GoogleAPICallError
 from google.auth.exceptions import DefaultCredentialsError
 
 import demo_pb2
@@ -36,10 +35,17 @@ from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 
-import googlecloudprofiler
-
+import launcher
+import metrics
+import profiling
+import server_config
+from smtp_pool import PoolTimeout, smtp_configured, smtp_pool_from_env
 from logger import getJSONLogger
 logger = getJSONLogger('emailservice-server')
+# per-request lines, which can be sampled with LOG_SAMPLE_RATES
+request_logger = getJSONLogger('emailservice-requests')
+
+profiler = profiling.ProfilerAgent('email_server', logger)
 
 # Loads confirmation email template from file
 env = Environment(
@@ -50,6 +56,8 @@ template = env.get_template('confirmation.html')
 
 class BaseEmailService(demo_pb2_grpc.EmailServiceServicer):
   def Check(self, request, context):
+    if request.service == profiling.HEALTH_SERVICE:
+      return health_pb2.HealthCheckResponse(status=profiler.health_status())
     return health_pb2.HealthCheckResponse(
       status=health_pb2.HealthCheckResponse.SERVING)
   
@@ -58,29 +66,22 @@ class BaseEmailService(demo_pb2_grpc.EmailServiceServicer):
       status=health_pb2.HealthCheckResponse.UNIMPLEMENTED)
 
 class EmailService(BaseEmailService):
-  def __init__(self):
-    raise Exception('cloud mail client not implemented')
-    super().__init__()
+  """Sends order confirmations through `pool`, an SMTPPool, from the
+  address `sender`."""
 
-  @staticmethod
-  def send_email(client, email_address, content):
-    response = client.send_message(
-      sender = client.sender_path(project_id, region, sender_id),
-      envelope_from_authority = '',
-      header_from_authority = '',
-      envelope_from_address = from_address,
-      simple_message = {
-        "from": {
-          "address_spec": from_address,
-        },
-        "to": [{
-          "address_spec": email_address
-        }],
-        "subject": "Your Confirmation Email",
-        "html_body": content
-      }
-    )
-    logger.info("Message sent: {}".format(response.rfc822_message_id))
+  def __init__(self, pool, sender):
+    super().__init__()
+    self.pool = pool
+    self.sender = sender
+
+  def send_email(self, email_address, content):
+    message = EmailMessage()
+    message['From'] = self.sender
+    message['To'] = email_address
+    message['Subject'] = "Your Confirmation Email"
+    message.set_content(content, subtype='html')
+    self.pool.send(message)
+    request_logger.info("Message sent to %s", email_address)
 
   def SendOrderConfirmation(self, request, context):
     email = request.email
@@ -95,10 +96,27 @@ class EmailService(BaseEmailService):
       return demo_pb2.Empty()
 
     try:
-      EmailService.send_email(self.client, email, confirmation)
-    except GoogleAPICallError as err:
+      self.send_email(email, confirmation)
+    except ValueError as err:
+      # e.g. a line break in the address, which would inject headers
+      context.set_details("Invalid email address.")
+      logger.error("Cannot address a confirmation to %r: %s", email, err)
+      context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+      return demo_pb2.Empty()
+    except smtplib.SMTPRecipientsRefused as err:
+      context.set_details("The email address was refused.")
+      logger.error("The mail server refused %s: %s", email, err.recipients)
+      context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+      return demo_pb2.Empty()
+    except PoolTimeout as err:
+      # every connection is busy; the caller may retry later
+      context.set_details("Too many emails are being sent.")
+      logger.error("Sending the confirmation to %s failed: %s", email, err)
+      context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+      return demo_pb2.Empty()
+    except (smtplib.SMTPException, OSError) as err:
       context.set_details("An error occurred when sending the email.")
-      print(err.message)
+      logger.error("Sending the confirmation to %s failed: %s", email, err)
       context.set_code(grpc.StatusCode.INTERNAL)
       return demo_pb2.Empty()
 
@@ -106,7 +124,7 @@ class EmailService(BaseEmailService):
 
 class DummyEmailService(BaseEmailService):
   def SendOrderConfirmation(self, request, context):
-    logger.info('A request to send order confirmation email to {} has been received.'.format(request.email))
+    request_logger.info('A request to send order confirmation email to %s has been received.', request.email)
     return demo_pb2.Empty()
 
 class HealthCheck():
@@ -115,12 +133,23 @@ class HealthCheck():
       status=health_pb2.HealthCheckResponse.SERVING)
 
 def start(dummy_mode):
-  server = grpc.server(futures.ThreadPoolExecutor(max_workers=10),)
+  server = server_config.create_server(logger, default_max_workers=10)
   service = None
+  pool = None
   if dummy_mode:
     service = DummyEmailService()
   else:
-    raise Exception('non-dummy mode not implemented yet')
+    # SMTP_* configure the server and the connection pool; see smtp_pool.py
+    pool = smtp_pool_from_env(logger)
+    metrics.REGISTRY.callback_gauge(
+      'smtp_pool_connections_in_use', 'SMTP connections sending a message.',
+      lambda: pool.in_use)
+    metrics.REGISTRY.callback_gauge(
+      'smtp_pool_connections_idle', 'Open SMTP connections waiting for a message.',
+      pool.idle)
+    metrics.REGISTRY.callback_counter(
+      'smtp_pool_connects_total', 'SMTP connections opened.', lambda: pool.connects)
+    service = EmailService(pool, os.environ.get('EMAIL_FROM', 'noreply@example.com'))
 
   demo_pb2_grpc.add_EmailServiceServicer_to_server(service, server)
   health_pb2_grpc.add_HealthServicer_to_server(service, server)
@@ -129,48 +158,19 @@ def start(dummy_mode):
   logger.info("listening on port: "+port)
   server.add_insecure_port('[::]:'+port)
   server.start()
-  try:
-    while True:
-      time.sleep(3600)
-  except KeyboardInterrupt:
-    server.stop(0)
-
-def initStackdriverProfiling():
-  project_id = None
-  try:
-    project_id = os.environ["GCP_PROJECT_ID"]
-  except KeyError:
-    # Environment variable not set
-    pass
-
-  for retry in range(1,4):
-    try:
-      if project_id:
-        googlecloudprofiler.start(service='email_server', service_version='1.0.0', verbose=0, project_id=project_id)
-      else:
-        googlecloudprofiler.start(service='email_server', service_version='1.0.0', verbose=0)
-      logger.info("Successfully started Stackdriver Profiler.")
-      return
-    except (BaseException) as exc:
-      logger.info("Unable to start Stackdriver Profiler Python agent. " + str(exc))
-      if (retry < 4):
-        logger.info("Sleeping %d to retry initializing Stackdriver Profiler"%(retry*10))
-        time.sleep (1)
-      else:
-        logger.warning("Could not initialize Stackdriver Profiler after retrying, giving up")
-  return
-
-
-if __name__ == '__main__':
-  logger.info('starting the email service in dummy mode.')
+  launcher.wait_for_termination(server, logger)
+  if pool is not None:
+    pool.close()
 
+def init_telemetry():
   # Profiler
   try:
     if "DISABLE_PROFILER" in os.environ:
       raise KeyError()
     else:
       logger.info("Profiler enabled.")
-      initStackdriverProfiling()
+      # retried in the background; the server starts without waiting
+      profiler.start_in_background()
   except KeyError:
       logger.info("Profiler disabled.")
 
@@ -194,5 +194,17 @@ if __name__ == '__main__':
       logger.info("Tracing disabled.")
   except Exception as e:
       logger.warn(f"Exception on Cloud Trace setup: {traceback.format_exc()}, tracing disabled.") 
-  
-  start(dummy_mode = True)
+
+
+if __name__ == '__main__':
+  dummy_mode = not smtp_configured()
+  if dummy_mode:
+    logger.info('starting the email service in dummy mode.')
+  else:
+    logger.info('starting the email service, sending mail through %s.', os.environ['SMTP_HOST'])
+
+  # profiler, tracing and the server are set up per worker process
+  def serve_worker():
+    init_telemetry()
+    start(dummy_mode = dummy_mode)
+  launcher.run(serve_worker, logger)
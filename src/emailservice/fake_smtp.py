@@ -0,0 +1,230 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A local SMTP server standing in for a mail provider, used by tests and
+# load tests. Like aiosmtpd's Controller it runs in a background thread
+# and keeps the messages it accepts, but it only needs the standard
+# library. It speaks enough ESMTP for smtplib: EHLO, STARTTLS, AUTH PLAIN,
+# MAIL, RCPT, DATA, RSET, NOOP and QUIT.
+#
+#   python fake_smtp.py [port]
+
+import base64
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+class _Session(socketserver.StreamRequestHandler):
+  def setup(self):
+    if self.server.implicit_tls:
+      self.request = self.server.ssl_context.wrap_socket(self.request, server_side=True)
+      self.server.count('tls_handshakes')
+    super().setup()
+    self.tls = self.server.implicit_tls
+    self.authenticated = self.server.credentials is None
+    self.mail_from = None
+    self.rcpt_tos = []
+
+  def reply(self, *lines):
+    # a multi-line reply in one write, like real servers
+    self.wfile.write(b''.join(line.encode() + b'\r\n' for line in lines))
+
+  def handle(self):
+    # STARTTLS wraps the socket; the server tracks the one it accepted
+    sock = self.request
+    # replies go out at once instead of waiting on the client's delayed ACKs
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    self.server.opened(sock)
+    try:
+      self.reply('220 fake-smtp ready')
+      # not a for loop: STARTTLS replaces rfile
+      while True:
+        line = self.rfile.readline()
+        if not line:
+          return
+        command, _, arg = line.decode().rstrip('\r\n').partition(' ')
+        handler = getattr(self, 'smtp_' + command.upper(), None)
+        if handler is None:
+          self.reply('502 command not implemented')
+        elif handler(arg) is False:
+          return
+    except (OSError, ValueError):
+      # the connection was dropped
+      pass
+    finally:
+      self.server.closed(sock)
+
+  def smtp_EHLO(self, arg):
+    lines = ['fake-smtp', '8BITMIME']
+    if self.server.ssl_context is not None and not self.tls:
+      lines.append('STARTTLS')
+    if self.server.credentials is not None:
+      lines.append('AUTH PLAIN')
+    self.reply(*['250-' + line for line in lines[:-1]], '250 ' + lines[-1])
+
+  def smtp_HELO(self, arg):
+    self.reply('250 fake-smtp')
+
+  def smtp_STARTTLS(self, arg):
+    if self.server.ssl_context is None or self.tls:
+      self.reply('454 TLS not available')
+      return
+    self.reply('220 ready to start TLS')
+    self.wfile.flush()
+    self.request = self.server.ssl_context.wrap_socket(self.request, server_side=True)
+    self.server.count('tls_handshakes')
+    self.rfile = self.request.makefile('rb')
+    self.wfile = self.request.makefile('wb', buffering=0)
+    self.tls = True
+
+  def smtp_AUTH(self, arg):
+    mechanism, _, response = arg.partition(' ')
+    if mechanism.upper() != 'PLAIN' or self.server.credentials is None:
+      self.reply('504 mechanism not supported')
+      return
+    _, username, password = base64.b64decode(response).decode().split('\0')
+    if (username, password) != self.server.credentials:
+      self.reply('535 authentication failed')
+      return
+    self.authenticated = True
+    self.reply('235 authenticated')
+
+  def smtp_MAIL(self, arg):
+    if not self.authenticated:
+      self.reply('530 authentication required')
+      return
+    self.mail_from = _address(arg)
+    self.rcpt_tos = []
+    self.reply('250 OK')
+
+  def smtp_RCPT(self, arg):
+    address = _address(arg)
+    if address in self.server.refused:
+      self.reply('550 no such user')
+      return
+    self.rcpt_tos.append(address)
+    self.reply('250 OK')
+
+  def smtp_DATA(self, arg):
+    if self.mail_from is None or not self.rcpt_tos:
+      self.reply('503 need MAIL and RCPT first')
+      return
+    self.reply('354 end data with <CR><LF>.<CR><LF>')
+    lines = []
+    for line in self.rfile:
+      if line == b'.\r\n':
+        break
+      # undo dot stuffing
+      lines.append(line[1:] if line.startswith(b'.') else line)
+    if self.server.latency:
+      time.sleep(self.server.latency)
+    self.server.received(self.mail_from, self.rcpt_tos, b''.join(lines))
+    self.mail_from, self.rcpt_tos = None, []
+    self.reply('250 OK queued')
+
+  def smtp_RSET(self, arg):
+    self.mail_from, self.rcpt_tos = None, []
+    self.reply('250 OK')
+
+  def smtp_NOOP(self, arg):
+    self.reply('250 OK')
+
+  def smtp_QUIT(self, arg):
+    self.reply('221 bye')
+    return False
+
+def _address(arg):
+  # "FROM:<a@example.com> BODY=8BITMIME" -> "a@example.com"
+  return arg.partition(':')[2].split(' ')[0].strip('<>')
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+  """Accepts mail on localhost:`port` and keeps (mail from, recipients,
+  data) of each message in `messages`.
+
+  With `ssl_context` it offers STARTTLS, or with `implicit_tls` speaks TLS
+  from the start. With `credentials`, a (username, password) pair, it
+  requires AUTH PLAIN. Recipients in `refused` are rejected, and every
+  message is delayed by `latency` seconds.
+  """
+  daemon_threads = True
+  allow_reuse_address = True
+
+  def __init__(self, port=0, ssl_context=None, implicit_tls=False, credentials=None,
+               latency=0.0):
+    super().__init__(('localhost', port), _Session)
+    self.port = self.server_address[1]
+    self.ssl_context = ssl_context
+    self.implicit_tls = implicit_tls
+    self.credentials = credentials
+    self.latency = latency
+    self.refused = set()
+    self.messages = []
+    self.connections = 0
+    self.tls_handshakes = 0
+    self._lock = threading.Lock()
+    self._open = set()
+    self._thread = None
+
+  def count(self, name):
+    with self._lock:
+      setattr(self, name, getattr(self, name) + 1)
+
+  def opened(self, sock):
+    with self._lock:
+      self.connections += 1
+      self._open.add(sock)
+
+  def closed(self, sock):
+    with self._lock:
+      self._open.discard(sock)
+
+  def received(self, mail_from, rcpt_tos, data):
+    with self._lock:
+      self.messages.append((mail_from, rcpt_tos, data))
+
+  def open_connections(self):
+    with self._lock:
+      return len(self._open)
+
+  def drop_connections(self):
+    """Closes every client connection, as a server does to idle ones."""
+    with self._lock:
+      sockets = list(self._open)
+    for sock in sockets:
+      try:
+        sock.shutdown(socket.SHUT_RDWR)
+      except OSError:
+        pass
+
+  def start(self):
+    # a short poll interval, so that stop() returns quickly
+    self._thread = threading.Thread(target=self.serve_forever, args=(0.05,),
+                                    name='fake-smtp', daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    self.shutdown()
+    self.drop_connections()
+    self.server_close()
+
+if __name__ == "__main__":
+  port = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+  server = FakeSMTPServer(port)
+  print("fake SMTP server listening on port {}".format(server.port))
+  server.serve_forever()
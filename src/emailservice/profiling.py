@@ -0,0 +1,115 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Cloud Profiler agent startup off the serving path.
+#
+# This module is shared by emailservice and recommendationservice and
+# copied into each of them; keep the copies identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+
+import os
+import random
+import threading
+
+from grpc_health.v1 import health_pb2
+
+# Health check service name that reports the profiler agent's state. The
+# server's own health ('' service) does not depend on it, so an
+# unreachable profiler backend never keeps a pod from becoming ready.
+HEALTH_SERVICE = 'profiler'
+
+DISABLED = 'disabled'
+STARTING = 'starting'
+RUNNING = 'running'
+FAILED = 'failed'
+
+_HEALTH_STATUS = {
+  DISABLED: health_pb2.HealthCheckResponse.SERVICE_UNKNOWN,
+  STARTING: health_pb2.HealthCheckResponse.UNKNOWN,
+  RUNNING: health_pb2.HealthCheckResponse.SERVING,
+  FAILED: health_pb2.HealthCheckResponse.NOT_SERVING,
+}
+
+def backoff_delays(attempts, base_delay, max_delay, rng=random):
+  """Yields the waits between `attempts` tries: exponential backoff with
+  full jitter, i.e. wait n is uniform in [0, min(max_delay, base_delay * 2**n)]."""
+  for n in range(attempts - 1):
+    yield rng.uniform(0, min(max_delay, base_delay * 2 ** n))
+
+class ProfilerAgent(object):
+  """Starts the Cloud Profiler agent in a daemon thread, retrying with
+  backoff, and keeps its state for the health check.
+
+  googlecloudprofiler only allows wall time profiling when started on the
+  main thread, and it would only sample the main thread, which just waits
+  for termination here; it is started with CPU profiling only.
+  """
+
+  def __init__(self, service, logger, attempts=5, base_delay=1.0, max_delay=30.0,
+               start=None, rng=random):
+    self.service = service
+    self.status = DISABLED
+    self.attempts = attempts
+    self.base_delay = base_delay
+    self.max_delay = max_delay
+    self.thread = None
+    self._logger = logger
+    self._start = start
+    self._rng = rng
+    self._stop = threading.Event()
+
+  def start_in_background(self):
+    self.status = STARTING
+    self.thread = threading.Thread(target=self._run, name='profiler-init', daemon=True)
+    self.thread.start()
+    return self.thread
+
+  def stop(self):
+    """Abandons any remaining retries."""
+    self._stop.set()
+
+  def health_status(self):
+    return _HEALTH_STATUS[self.status]
+
+  def _run(self):
+    kwargs = {'service': self.service, 'service_version': '1.0.0', 'verbose': 0,
+              'disable_wall_profiling': True}
+    project_id = os.environ.get("GCP_PROJECT_ID")
+    if project_id:
+      kwargs['project_id'] = project_id
+    delays = backoff_delays(self.attempts, self.base_delay, self.max_delay, self._rng)
+    for attempt in range(1, self.attempts + 1):
+      try:
+        start = self._start
+        if start is None:
+          # imported here: the agent and its dependencies are slow to load
+          import googlecloudprofiler
+          start = googlecloudprofiler.start
+        start(**kwargs)
+        self.status = RUNNING
+        self._logger.info("Successfully started Stackdriver Profiler.")
+        return
+      except Exception as exc:
+        self._logger.info("Unable to start Stackdriver Profiler Python agent (attempt {}/{}): {}".format(
+          attempt, self.attempts, exc))
+      delay = next(delays, None)
+      if delay is None:
+        break
+      self._logger.info("Retrying Stackdriver Profiler initialization in {:.1f} seconds".format(delay))
+      if self._stop.wait(delay):
+        break
+    self.status = FAILED
+    self._logger.warning("Could not initialize Stackdriver Profiler after retrying, giving up")
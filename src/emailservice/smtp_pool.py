@@ -0,0 +1,241 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Delivers mail over a pool of persistent SMTP connections.
+#
+# Connections stay open between messages, so a confirmation costs one
+# MAIL, RCPT and DATA exchange instead of a TCP connect, TLS handshake,
+# EHLO and login each. A connection that has been idle for a while is
+# checked with NOOP before it is used, and one the server closed while
+# idle is replaced and the message sent again on the new connection.
+#
+#   SMTP_HOST              mail server; without it the service runs in
+#                          dummy mode and sends nothing
+#   SMTP_PORT              (default 587, or 465 with SMTP_SECURITY=tls)
+#   SMTP_SECURITY          starttls (default), tls for implicit TLS, or none
+#   SMTP_TLS_VERIFY        0 to accept any server certificate (default 1)
+#   SMTP_USERNAME          login, when set, with SMTP_PASSWORD
+#   SMTP_POOL_SIZE         connections open at most (default 4)
+#   SMTP_TIMEOUT_SECONDS   connect, command and pool wait timeout
+#                          (default 10)
+#   SMTP_MAX_IDLE_SECONDS  idle time after which a connection is checked
+#                          with NOOP before use (default 30)
+
+import os
+import smtplib
+import ssl
+import threading
+import time
+
+DEFAULT_PORTS = {'starttls': 587, 'tls': 465, 'none': 25}
+
+# The connection was lost rather than the message refused; on a pooled
+# connection, the server most likely closed it while it was idle.
+_DISCONNECTS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+class PoolTimeout(TimeoutError):
+  """No connection of the pool became free in time. Unlike a socket
+  timeout, the SMTP server has not been contacted."""
+
+def tls_context(verify=True):
+  context = ssl.create_default_context()
+  if not verify:
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+  return context
+
+class SMTPPool(object):
+  """Sends messages through up to `size` connections to the SMTP server at
+  `host`; see above.
+
+  `security` is 'starttls', 'tls' or 'none'. send() waits up to `timeout`
+  seconds for a free connection and raises PoolTimeout after that.
+  """
+
+  def __init__(self, host, port=None, size=4, security='starttls', username=None,
+               password=None, timeout=10.0, max_idle=30.0, ssl_context=None,
+               logger=None, clock=time.monotonic):
+    if security not in DEFAULT_PORTS:
+      raise ValueError("SMTP security must be one of {}, got {!r}".format(
+        ', '.join(DEFAULT_PORTS), security))
+    self.host = host
+    self.port = port or DEFAULT_PORTS[security]
+    self.size = size
+    self.security = security
+    self.username = username
+    self.password = password
+    self.timeout = timeout
+    self.max_idle = max_idle
+    self.ssl_context = ssl_context
+    if self.ssl_context is None and security != 'none':
+      self.ssl_context = tls_context()
+    self._logger = logger
+    self._clock = clock
+    self._slots = threading.BoundedSemaphore(size)
+    self._lock = threading.Lock()
+    # (connection, last used) of the connections not in use, most
+    # recently used last
+    self._idle = []
+    self._closed = False
+    self.in_use = 0
+    self.connects = 0
+    self.reconnects = 0
+    self.sent = 0
+    self.failed = 0
+
+  def send(self, message):
+    """Sends `message`, an email.message.EmailMessage. Raises the
+    smtplib.SMTPException or OSError of a failed delivery."""
+    if not self._slots.acquire(timeout=self.timeout):
+      raise PoolTimeout("no SMTP connection became free in {}s".format(self.timeout))
+    conn = None
+    try:
+      with self._lock:
+        self.in_use += 1
+      conn, reused = self._checkout()
+      try:
+        conn.send_message(message)
+      except _DISCONNECTS as err:
+        if not reused:
+          raise
+        if self._logger is not None:
+          self._logger.info("SMTP connection closed by the server, reconnecting: %s", err)
+        self._discard(conn)
+        conn = None
+        self._count('reconnects')
+        conn = self._connect()
+        conn.send_message(message)
+      self._count('sent')
+    except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+      # the server answered, and smtplib has reset the transaction, so the
+      # connection can take the next message
+      self._count('failed')
+      raise
+    except BaseException:
+      self._count('failed')
+      self._discard(conn)
+      conn = None
+      raise
+    finally:
+      if conn is not None:
+        self._checkin(conn)
+      with self._lock:
+        self.in_use -= 1
+      self._slots.release()
+
+  def _count(self, name):
+    # send() runs on many handler threads at once
+    with self._lock:
+      setattr(self, name, getattr(self, name) + 1)
+
+  def _checkout(self):
+    """Returns (connection, whether it was open already)."""
+    with self._lock:
+      idle = self._idle.pop() if self._idle else None
+    if idle is None:
+      return self._connect(), False
+    conn, last_used = idle
+    if self._clock() - last_used > self.max_idle:
+      try:
+        conn.noop()
+      except (smtplib.SMTPException, OSError):
+        self._discard(conn)
+        self._count('reconnects')
+        return self._connect(), False
+    return conn, True
+
+  def _checkin(self, conn):
+    with self._lock:
+      if not self._closed:
+        self._idle.append((conn, self._clock()))
+        return
+    self._quit(conn)
+
+  def _connect(self):
+    if self.security == 'tls':
+      conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                              context=self.ssl_context)
+    else:
+      conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+    try:
+      if self.security == 'starttls':
+        conn.starttls(context=self.ssl_context)
+      if self.username:
+        conn.login(self.username, self.password or '')
+    except BaseException:
+      self._discard(conn)
+      raise
+    self._count('connects')
+    return conn
+
+  def _discard(self, conn):
+    if conn is None:
+      return
+    try:
+      conn.close()
+    except OSError:
+      pass
+
+  def _quit(self, conn):
+    try:
+      conn.quit()
+    except (smtplib.SMTPException, OSError):
+      self._discard(conn)
+
+  def idle(self):
+    with self._lock:
+      return len(self._idle)
+
+  def close(self):
+    """Closes the idle connections, and the others once they are returned."""
+    with self._lock:
+      self._closed = True
+      idle, self._idle = self._idle, []
+    for conn, _ in idle:
+      self._quit(conn)
+
+  def stats(self):
+    with self._lock:
+      return {
+        'size': self.size,
+        'in_use': self.in_use,
+        'idle': len(self._idle),
+        'connects': self.connects,
+        'reconnects': self.reconnects,
+        'sent': self.sent,
+        'failed': self.failed,
+      }
+
+def smtp_configured():
+  return bool(os.environ.get('SMTP_HOST'))
+
+def smtp_pool_from_env(logger=None):
+  env = os.environ.get
+  security = env('SMTP_SECURITY', 'starttls')
+  context = None
+  if security != 'none':
+    context = tls_context(verify=env('SMTP_TLS_VERIFY', '1') != '0')
+  return SMTPPool(
+    env('SMTP_HOST'),
+    port=int(env('SMTP_PORT', '0')) or None,
+    size=int(env('SMTP_POOL_SIZE', '4')),
+    security=security,
+    username=env('SMTP_USERNAME') or None,
+    password=env('SMTP_PASSWORD'),
+    timeout=float(env('SMTP_TIMEOUT_SECONDS', '10')),
+    max_idle=float(env('SMTP_MAX_IDLE_SECONDS', '30')),
+    ssl_context=context,
+    logger=logger)
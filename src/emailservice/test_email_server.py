@@ -0,0 +1,81 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import email
+import unittest
+from email import policy
+from unittest import mock
+
+import grpc
+
+import demo_pb2
+import email_server
+from fake_smtp import FakeSMTPServer
+from smtp_pool import SMTPPool
+
+def confirmation_request(address='shopper@example.com'):
+  return demo_pb2.SendOrderConfirmationRequest(
+    email=address,
+    order=demo_pb2.OrderResult(order_id='order-1', shipping_tracking_id='track-1'))
+
+class EmailServiceTest(unittest.TestCase):
+  def setUp(self):
+    self.server = FakeSMTPServer().start()
+    self.addCleanup(self.server.stop)
+    self.pool = SMTPPool('localhost', self.server.port, security='none', timeout=1)
+    self.addCleanup(self.pool.close)
+    self.service = email_server.EmailService(self.pool, 'noreply@example.com')
+
+  def test_sends_the_confirmation(self):
+    context = mock.Mock()
+    self.service.SendOrderConfirmation(confirmation_request(), context)
+    context.set_code.assert_not_called()
+    mail_from, rcpt_tos, data = self.server.messages[0]
+    self.assertEqual((mail_from, rcpt_tos), ('noreply@example.com', ['shopper@example.com']))
+    message = email.message_from_bytes(data, policy=policy.default)
+    self.assertEqual(message['Subject'], 'Your Confirmation Email')
+    self.assertEqual(message.get_content_type(), 'text/html')
+    self.assertIn('order-1', message.get_content())
+
+  def test_invalid_address(self):
+    context = mock.Mock()
+    self.service.SendOrderConfirmation(
+      confirmation_request('shopper@example.com\nBcc: all@example.com'), context)
+    context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+    self.assertEqual(self.server.messages, [])
+
+  def test_refused_recipient(self):
+    self.server.refused.add('nobody@example.com')
+    context = mock.Mock()
+    self.service.SendOrderConfirmation(confirmation_request('nobody@example.com'), context)
+    context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+  def test_no_free_connection(self):
+    self.pool.timeout = 0.05
+    for _ in range(self.pool.size):
+      self.pool._slots.acquire()
+    context = mock.Mock()
+    self.service.SendOrderConfirmation(confirmation_request(), context)
+    context.set_code.assert_called_once_with(grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+  def test_delivery_failure(self):
+    self.server.stop()
+    context = mock.Mock()
+    self.service.SendOrderConfirmation(confirmation_request(), context)
+    context.set_code.assert_called_once_with(grpc.StatusCode.INTERNAL)
+
+if __name__ == '__main__':
+  unittest.main()
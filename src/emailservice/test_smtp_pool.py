@@ -0,0 +1,229 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import smtplib
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from email.message import EmailMessage
+from unittest import mock
+
+from fake_smtp import FakeSMTPServer
+from smtp_pool import PoolTimeout, SMTPPool, smtp_pool_from_env
+
+def make_message(to='shopper@example.com'):
+  message = EmailMessage()
+  message['From'] = 'noreply@example.com'
+  message['To'] = to
+  message['Subject'] = 'Your Confirmation Email'
+  message.set_content('<p>Thanks!</p>', subtype='html')
+  return message
+
+def wait_for(condition, timeout=2.0):
+  deadline = time.monotonic() + timeout
+  while not condition():
+    if time.monotonic() > deadline:
+      raise AssertionError('timed out')
+    time.sleep(0.01)
+
+def unused_port():
+  with socket.socket() as sock:
+    sock.bind(('localhost', 0))
+    return sock.getsockname()[1]
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+class SMTPPoolTest(unittest.TestCase):
+  def start_server(self, **kwargs):
+    server = FakeSMTPServer(**kwargs).start()
+    self.addCleanup(server.stop)
+    return server
+
+  def make_pool(self, server, **kwargs):
+    kwargs.setdefault('security', 'none')
+    pool = SMTPPool('localhost', server.port, **kwargs)
+    self.addCleanup(pool.close)
+    return pool
+
+  def test_connections_are_reused(self):
+    server = self.start_server()
+    pool = self.make_pool(server, size=2)
+    for _ in range(20):
+      pool.send(make_message())
+    self.assertEqual(len(server.messages), 20)
+    self.assertEqual(server.connections, 1)
+    self.assertEqual(server.messages[0][:2], ('noreply@example.com', ['shopper@example.com']))
+    self.assertEqual(pool.stats()['sent'], 20)
+
+  def test_size_bounds_open_connections(self):
+    server = self.start_server(latency=0.01)
+    pool = self.make_pool(server, size=3)
+    def send():
+      for _ in range(5):
+        pool.send(make_message())
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual(len(server.messages), 40)
+    self.assertLessEqual(server.connections, 3)
+    stats = pool.stats()
+    self.assertEqual((stats['in_use'], stats['sent'], stats['connects']),
+                     (0, 40, server.connections))
+
+  def test_reconnects_when_the_server_closed_the_connection(self):
+    server = self.start_server()
+    pool = self.make_pool(server)
+    pool.send(make_message())
+    server.drop_connections()
+    wait_for(lambda: server.open_connections() == 0)
+    pool.send(make_message())
+    self.assertEqual(len(server.messages), 2)
+    self.assertEqual((server.connections, pool.reconnects, pool.failed), (2, 1, 0))
+
+  def test_idle_connections_are_checked_before_use(self):
+    server = self.start_server()
+    clock = FakeClock()
+    pool = self.make_pool(server, max_idle=30, clock=clock)
+    pool.send(make_message())
+    clock.now = 31
+    pool.send(make_message())
+    self.assertEqual(server.connections, 1)
+    server.drop_connections()
+    wait_for(lambda: server.open_connections() == 0)
+    clock.now = 62
+    pool.send(make_message())
+    self.assertEqual((server.connections, pool.reconnects), (2, 1))
+
+  def test_refused_recipient_keeps_the_connection(self):
+    server = self.start_server()
+    server.refused.add('nobody@example.com')
+    pool = self.make_pool(server)
+    with self.assertRaises(smtplib.SMTPRecipientsRefused):
+      pool.send(make_message('nobody@example.com'))
+    pool.send(make_message())
+    self.assertEqual(len(server.messages), 1)
+    self.assertEqual((server.connections, pool.failed, pool.idle()), (1, 1, 1))
+
+  def test_connect_errors_are_raised(self):
+    pool = SMTPPool('localhost', unused_port(), size=1, security='none', timeout=1)
+    for _ in range(2):
+      # the connection slot is given back after each failure
+      with self.assertRaises(ConnectionRefusedError):
+        pool.send(make_message())
+    self.assertEqual(pool.stats()['in_use'], 0)
+
+  def test_waiting_for_a_connection_times_out(self):
+    server = self.start_server()
+    pool = self.make_pool(server, size=1, timeout=0.05)
+    pool._slots.acquire()
+    with self.assertRaises(PoolTimeout):
+      pool.send(make_message())
+    pool._slots.release()
+    pool.send(make_message())
+
+  def test_login(self):
+    server = self.start_server(credentials=('shop', 'secret'))
+    pool = self.make_pool(server, username='shop', password='secret')
+    pool.send(make_message())
+    self.assertEqual(len(server.messages), 1)
+    pool = self.make_pool(server, username='shop', password='wrong')
+    with self.assertRaises(smtplib.SMTPAuthenticationError):
+      pool.send(make_message())
+
+  def test_close_quits_idle_connections(self):
+    server = self.start_server()
+    pool = self.make_pool(server)
+    pool.send(make_message())
+    self.assertEqual(server.open_connections(), 1)
+    pool.close()
+    wait_for(lambda: server.open_connections() == 0)
+
+  def test_from_env(self):
+    env = {'SMTP_HOST': 'mail.example.com', 'SMTP_SECURITY': 'tls', 'SMTP_POOL_SIZE': '8',
+           'SMTP_TLS_VERIFY': '0', 'SMTP_USERNAME': 'shop'}
+    with mock.patch.dict(os.environ, env, clear=True):
+      pool = smtp_pool_from_env()
+    self.assertEqual((pool.host, pool.port, pool.size, pool.username),
+                     ('mail.example.com', 465, 8, 'shop'))
+    self.assertEqual(pool.ssl_context.verify_mode, ssl.CERT_NONE)
+    with mock.patch.dict(os.environ, {'SMTP_HOST': 'mail', 'SMTP_SECURITY': 'ssl'}, clear=True):
+      with self.assertRaises(ValueError):
+        smtp_pool_from_env()
+
+@unittest.skipUnless(shutil.which('openssl'), 'needs openssl to make a test certificate')
+class SMTPPoolTLSTest(unittest.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    cls.tmp = tempfile.mkdtemp()
+    cls.cert = os.path.join(cls.tmp, 'cert.pem')
+    cls.key = os.path.join(cls.tmp, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost',
+                    '-keyout', cls.key, '-out', cls.cert],
+                   check=True, capture_output=True)
+
+  @classmethod
+  def tearDownClass(cls):
+    shutil.rmtree(cls.tmp)
+
+  def server_context(self):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(self.cert, self.key)
+    return context
+
+  def client_context(self):
+    return ssl.create_default_context(cafile=self.cert)
+
+  def check_one_handshake(self, security, implicit_tls):
+    server = FakeSMTPServer(ssl_context=self.server_context(), implicit_tls=implicit_tls).start()
+    self.addCleanup(server.stop)
+    pool = SMTPPool('localhost', server.port, security=security,
+                    ssl_context=self.client_context())
+    self.addCleanup(pool.close)
+    for _ in range(10):
+      pool.send(make_message())
+    self.assertEqual(len(server.messages), 10)
+    self.assertEqual(server.tls_handshakes, 1)
+
+  def test_starttls(self):
+    self.check_one_handshake('starttls', implicit_tls=False)
+
+  def test_implicit_tls(self):
+    self.check_one_handshake('tls', implicit_tls=True)
+
+  def test_untrusted_certificate_is_refused(self):
+    server = FakeSMTPServer(ssl_context=self.server_context()).start()
+    self.addCleanup(server.stop)
+    pool = SMTPPool('localhost', server.port, security='starttls')
+    with self.assertRaises(ssl.SSLError):
+      pool.send(make_message())
+    self.assertEqual(server.messages, [])
+
+if __name__ == '__main__':
+  unittest.main()
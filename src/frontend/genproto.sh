@@ -22,4 +22,7 @@ outdir=./genproto
 
 protoc --proto_path=$protodir --go_out=./$outdir --go_opt=paths=source_relative --go-grpc_out=./$outdir --go-grpc_opt=paths=source_relative $protodir/demo.proto
 
+# the popup client; copy the result into ../popupservice as well
+protoc --proto_path=../popupservice --go_out=./popupservice --go_opt=paths=source_relative --go-grpc_out=./popupservice --go-grpc_opt=paths=source_relative ../popupservice/popup.proto
+
 # [END gke_frontend_genproto]
\ No newline at end of file
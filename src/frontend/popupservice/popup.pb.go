@@ -22,8 +22,10 @@ const (
 )
 
 type PopupRequest struct {
-	state         protoimpl.MessageState `protogen:"open.v1"`
-	SessionId     string                 `protobuf:"bytes,1,opt,name=session_id,json=sessionId,proto3" json:"session_id,omitempty"`
+	state     protoimpl.MessageState `protogen:"open.v1"`
+	SessionId string                 `protobuf:"bytes,1,opt,name=session_id,json=sessionId,proto3" json:"session_id,omitempty"`
+	// Set by clients that read items, to leave message empty.
+	ItemsOnly     bool `protobuf:"varint,2,opt,name=items_only,json=itemsOnly,proto3" json:"items_only,omitempty"`
 	unknownFields protoimpl.UnknownFields
 	sizeCache     protoimpl.SizeCache
 }
@@ -65,9 +67,19 @@ func (x *PopupRequest) GetSessionId() string {
 	return ""
 }
 
+func (x *PopupRequest) GetItemsOnly() bool {
+	if x != nil {
+		return x.ItemsOnly
+	}
+	return false
+}
+
 type PopupReply struct {
-	state         protoimpl.MessageState `protogen:"open.v1"`
-	Message       string                 `protobuf:"bytes,1,opt,name=message,proto3" json:"message,omitempty"`
+	state protoimpl.MessageState `protogen:"open.v1"`
+	// The outfit as JSON, {"items": [{"id": ..., "name": ..., "slug": ...}]},
+	// for clients that predate items.
+	Message       string        `protobuf:"bytes,1,opt,name=message,proto3" json:"message,omitempty"`
+	Items         []*OutfitItem `protobuf:"bytes,2,rep,name=items,proto3" json:"items,omitempty"`
 	unknownFields protoimpl.UnknownFields
 	sizeCache     protoimpl.SizeCache
 }
@@ -109,17 +121,92 @@ func (x *PopupReply) GetMessage() string {
 	return ""
 }
 
+func (x *PopupReply) GetItems() []*OutfitItem {
+	if x != nil {
+		return x.Items
+	}
+	return nil
+}
+
+type OutfitItem struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Id            string                 `protobuf:"bytes,1,opt,name=id,proto3" json:"id,omitempty"`
+	Name          string                 `protobuf:"bytes,2,opt,name=name,proto3" json:"name,omitempty"`
+	Slug          string                 `protobuf:"bytes,3,opt,name=slug,proto3" json:"slug,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *OutfitItem) Reset() {
+	*x = OutfitItem{}
+	mi := &file_popup_proto_msgTypes[2]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *OutfitItem) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*OutfitItem) ProtoMessage() {}
+
+func (x *OutfitItem) ProtoReflect() protoreflect.Message {
+	mi := &file_popup_proto_msgTypes[2]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use OutfitItem.ProtoReflect.Descriptor instead.
+func (*OutfitItem) Descriptor() ([]byte, []int) {
+	return file_popup_proto_rawDescGZIP(), []int{2}
+}
+
+func (x *OutfitItem) GetId() string {
+	if x != nil {
+		return x.Id
+	}
+	return ""
+}
+
+func (x *OutfitItem) GetName() string {
+	if x != nil {
+		return x.Name
+	}
+	return ""
+}
+
+func (x *OutfitItem) GetSlug() string {
+	if x != nil {
+		return x.Slug
+	}
+	return ""
+}
+
 var File_popup_proto protoreflect.FileDescriptor
 
 const file_popup_proto_rawDesc = "" +
 	"\n" +
-	"\vpopup.proto\x12\x05popup\"-\n" +
+	"\vpopup.proto\x12\x05popup\"L\n" +
 	"\fPopupRequest\x12\x1d\n" +
 	"\n" +
-	"session_id\x18\x01 \x01(\tR\tsessionId\"&\n" +
+	"session_id\x18\x01 \x01(\tR\tsessionId\x12\x1d\n" +
+	"\n" +
+	"items_only\x18\x02 \x01(\bR\titemsOnly\"O\n" +
 	"\n" +
 	"PopupReply\x12\x18\n" +
-	"\amessage\x18\x01 \x01(\tR\amessage2K\n" +
+	"\amessage\x18\x01 \x01(\tR\amessage\x12'\n" +
+	"\x05items\x18\x02 \x03(\v2\x11.popup.OutfitItemR\x05items\"D\n" +
+	"\n" +
+	"OutfitItem\x12\x0e\n" +
+	"\x02id\x18\x01 \x01(\tR\x02id\x12\x12\n" +
+	"\x04name\x18\x02 \x01(\tR\x04name\x12\x12\n" +
+	"\x04slug\x18\x03 \x01(\tR\x04slug2K\n" +
 	"\fPopupService\x12;\n" +
 	"\x0fGetPopupMessage\x12\x13.popup.PopupRequest\x1a\x11.popup.PopupReply\"\x00B/Z-github.com/your/module/src/popupservice;popupb\x06proto3"
 
@@ -135,19 +222,21 @@ func file_popup_proto_rawDescGZIP() []byte {
 	return file_popup_proto_rawDescData
 }
 
-var file_popup_proto_msgTypes = make([]protoimpl.MessageInfo, 2)
+var file_popup_proto_msgTypes = make([]protoimpl.MessageInfo, 3)
 var file_popup_proto_goTypes = []any{
 	(*PopupRequest)(nil), // 0: popup.PopupRequest
 	(*PopupReply)(nil),   // 1: popup.PopupReply
+	(*OutfitItem)(nil),   // 2: popup.OutfitItem
 }
 var file_popup_proto_depIdxs = []int32{
-	0, // 0: popup.PopupService.GetPopupMessage:input_type -> popup.PopupRequest
-	1, // 1: popup.PopupService.GetPopupMessage:output_type -> popup.PopupReply
-	1, // [1:2] is the sub-list for method output_type
-	0, // [0:1] is the sub-list for method input_type
-	0, // [0:0] is the sub-list for extension type_name
-	0, // [0:0] is the sub-list for extension extendee
-	0, // [0:0] is the sub-list for field type_name
+	2, // 0: popup.PopupReply.items:type_name -> popup.OutfitItem
+	0, // 1: popup.PopupService.GetPopupMessage:input_type -> popup.PopupRequest
+	1, // 2: popup.PopupService.GetPopupMessage:output_type -> popup.PopupReply
+	2, // [2:3] is the sub-list for method output_type
+	1, // [1:2] is the sub-list for method input_type
+	1, // [1:1] is the sub-list for extension type_name
+	1, // [1:1] is the sub-list for extension extendee
+	0, // [0:1] is the sub-list for field type_name
 }
 
 func init() { file_popup_proto_init() }
@@ -161,7 +250,7 @@ func file_popup_proto_init() {
 			GoPackagePath: reflect.TypeOf(x{}).PkgPath(),
 			RawDescriptor: unsafe.Slice(unsafe.StringData(file_popup_proto_rawDesc), len(file_popup_proto_rawDesc)),
 			NumEnums:      0,
-			NumMessages:   2,
+			NumMessages:   3,
 			NumExtensions: 0,
 			NumServices:   1,
 		},
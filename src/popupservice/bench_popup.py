@@ -0,0 +1,160 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Measures picking popup outfits from a large synthetic catalog.
+#
+# "per request" categorizes the product list on every call, as popups
+# did before category buckets were kept per snapshot. "same snapshot"
+# serves repeated calls from one product list object (a watched
+# catalog), "fresh reply" from equal lists parsed from separate replies
+# (a ListProducts call per popup).
+#
+# The second table compares GetPopupMessage on one snapshot with the
+# reply it used to build per request: item dicts, json.dumps and
+# PopupReply.SerializeToString. "repeat session" is a session served
+# from the session store.
+#
+# The third table compares the reply forms: the JSON message alone, as
+# before items were added, the default message and items, and items
+# only. "client" is the time a caller takes to get at the items: parsing
+# the reply and then its JSON for the message alone, parsing the reply
+# for the others. Times are process CPU time.
+#
+#   python bench_popup.py [--products 10000] [--calls 200]
+
+import argparse
+import itertools
+import json
+import logging
+import random
+import time
+
+import demo_pb2
+import popup_main
+import popup_pb2
+from outfits import slug
+from session_store import SessionStore
+
+NAMES = ['Hat', 'Beanie', 'Sunglasses', 'Tank Top', 'Jacket', 'Watch', 'Loafers',
+         'Sneakers', 'Mug', 'Candle Holder', 'Salt & Pepper Shakers', 'Bamboo Glass Jar']
+
+def synthetic_reply(num_products, seed=0):
+    rng = random.Random(seed)
+    return demo_pb2.ListProductsResponse(products=[
+        demo_pb2.Product(id='P%06d' % i, name='%s %d' % (rng.choice(NAMES), i),
+                         description='A product.', picture='/static/img/products/p.jpg',
+                         categories=['accessories'])
+        for i in range(num_products)]).SerializeToString()
+
+class FixedCatalog(object):
+    """Hands out the product lists in `replies` in turn."""
+    def __init__(self, replies):
+        self._replies = itertools.cycle(replies)
+
+    def list_products(self, remaining=None):
+        return next(self._replies)
+
+def make_service(replies):
+    service = popup_main.PopupServiceServicer()
+    service.catalog = FixedCatalog(replies)
+    # sessions are measured separately, as "repeat session"
+    service.sessions = SessionStore(max_entries=0)
+    return service
+
+def per_request(service):
+    products = service.catalog.list_products()
+    buckets = service.categorize_products(products)
+    return [random.choice(items) for items in buckets.values() if items]
+
+def outfit(service):
+    return service._current_outfits(None).pick()
+
+def dict_reply(service, request, context=None):
+    """GetPopupMessage as it was before replies were pre-rendered."""
+    tracer = popup_main.trace.get_tracer(__name__)
+    with tracer.start_as_current_span("get_popup_message") as span:
+        session_id = request.session_id or "unknown"
+        span.set_attribute("session.id", session_id)
+        popup_main.logger.info(f"Popup message requested for session: {session_id}")
+        outfits = service._current_outfits(context)
+        recommended = [{"id": product_id, "name": name, "slug": slug(name)}
+                       for product_id, name in (random.choice(items) for items in outfits.items)]
+        data = {"items": recommended}
+        popup_main.logger.info(f"Returning outfit recommendation for session: {session_id}")
+        return popup_pb2.PopupReply(message=json.dumps(data)).SerializeToString()
+
+def json_items(data):
+    return json.loads(popup_pb2.PopupReply.FromString(data).message)['items']
+
+def typed_items(data):
+    return [(item.id, item.name, item.slug) for item in popup_pb2.PopupReply.FromString(data).items]
+
+def time_calls(fn, calls):
+    # the first call builds the buckets once
+    fn()
+    started = time.process_time()
+    for _ in range(calls):
+        fn()
+    return (time.process_time() - started) / calls
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    # keep per-request log lines out of the measurement
+    logging.getLogger('popupservice').setLevel(logging.WARNING)
+    reply = synthetic_reply(args.products)
+    parse = lambda: demo_pb2.ListProductsResponse.FromString(reply).products
+    same = make_service([parse()])
+    fresh = make_service([parse() for _ in range(4)])
+
+    results = [
+        ('per request', time_calls(lambda: per_request(same), args.calls)),
+        ('same snapshot', time_calls(lambda: outfit(same), args.calls)),
+        ('fresh reply', time_calls(lambda: outfit(fresh), args.calls)),
+    ]
+    print("{} products, {} calls".format(args.products, args.calls))
+    for name, seconds in results:
+        print("{:14s} {:10.1f} us/call".format(name, seconds * 1e6))
+
+    request = popup_pb2.PopupRequest(session_id='bench')
+    replies = [
+        ('dicts + dumps', time_calls(lambda: dict_reply(same, request), args.calls * 10)),
+        ('pre-rendered', time_calls(lambda: same.GetPopupMessage(request, None), args.calls * 10)),
+    ]
+    sessions, same.sessions = same.sessions, SessionStore()
+    replies.append(('repeat session', time_calls(lambda: same.GetPopupMessage(request, None), args.calls * 10)))
+    same.sessions = sessions
+    print()
+    for name, seconds in replies:
+        print("{:14s} {:10.1f} us/call".format(name, seconds * 1e6))
+    print("CPU per reply reduced by {:.0%}".format(1 - replies[1][1] / replies[0][1]))
+
+    items_request = popup_pb2.PopupRequest(session_id='bench', items_only=True)
+    forms = [
+        ('message only', lambda: dict_reply(same, request), json_items),
+        ('message+items', lambda: same.GetPopupMessage(request, None), typed_items),
+        ('items only', lambda: same.GetPopupMessage(items_request, None), typed_items),
+    ]
+    print()
+    print("{:14s} {:>8s} {:>10s} {:>10s}".format('', 'bytes', 'server us', 'client us'))
+    for name, serve, read in forms:
+        data = serve()
+        print("{:14s} {:8d} {:10.1f} {:10.1f}".format(
+            name, len(data), time_calls(serve, args.calls * 10) * 1e6,
+            time_calls(lambda: read(data), args.calls * 10) * 1e6))
@@ -0,0 +1,423 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Product catalog client with deadlines, retries and hedging.
+#
+# This module is shared by popupservice and recommendationservice and
+# copied into each of them; keep the copies identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+#
+# Every call gets a deadline: CATALOG_TIMEOUT_SECONDS, or the remaining
+# time of the inbound RPC it serves if that is shorter. Attempts that fail
+# with UNAVAILABLE are retried by a client interceptor, with the backoff
+# and retry throttling of gRPC's retryPolicy so that retries cannot
+# amplify an outage. It retries here rather than in gRPC core, which
+# does not tell the caller how many attempts a call took, so that the
+# retries can be counted. gRPC Python does not implement the service
+# config's hedgingPolicy either, so ListProducts is hedged here: when no
+# response has arrived after CATALOG_HEDGING_DELAY_MS, another call is
+# sent and the first response wins. The threaded client does not retry
+# hedged calls, whose attempts cannot block; the next hedge replaces one
+# that fails with UNAVAILABLE.
+#
+# A circuit breaker (circuit_breaker.py) guards every call. While it is
+# open, list_products raises CircuitOpenError at once and the caller
+# serves its cached snapshot or a static fallback. A call that runs out
+# of the inbound RPC's time, rather than its own, does not count against
+# the catalog.
+#
+#   CATALOG_TIMEOUT_SECONDS    deadline of a catalog call (default 3)
+#   CATALOG_MAX_ATTEMPTS       attempts per call including retries, for
+#                              UNAVAILABLE errors (default 3; 1 disables)
+#   CATALOG_HEDGING_DELAY_MS   delay before a hedged call (default 0: no
+#                              hedging)
+#   CATALOG_MAX_HEDGES         extra calls a hedged call may send (default 1)
+#   CATALOG_BREAKER_WINDOW     calls the breaker judges the catalog by
+#                              (default 20; 0 disables the breaker)
+#   CATALOG_BREAKER_MIN_CALLS  calls needed before it can open (default 5)
+#   CATALOG_BREAKER_FAILURE_RATE    share of failed calls that opens it
+#                                   (default 0.5)
+#   CATALOG_BREAKER_SLOW_CALL_MS    a call slower than this is slow
+#                                   (default 1000)
+#   CATALOG_BREAKER_SLOW_CALL_RATE  share of slow calls that opens it
+#                                   (default 0.5)
+#   CATALOG_BREAKER_OPEN_SECONDS    time open before probing (default 5)
+#   CATALOG_BREAKER_PROBES     probe calls that must succeed to close it
+#                              (default 1)
+
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+
+import grpc
+
+import demo_pb2
+import demo_pb2_grpc
+import metrics
+from circuit_breaker import CircuitBreaker
+
+# Errors that count against the catalog. Others, like CANCELLED or
+# INVALID_ARGUMENT, say nothing about its health.
+BREAKER_FAILURES = frozenset([
+  grpc.StatusCode.UNAVAILABLE,
+  grpc.StatusCode.DEADLINE_EXCEEDED,
+  grpc.StatusCode.RESOURCE_EXHAUSTED,
+  grpc.StatusCode.INTERNAL,
+  grpc.StatusCode.UNKNOWN,
+])
+
+SERVICE = 'hipstershop.ProductCatalogService'
+LIST_PRODUCTS = '/hipstershop.ProductCatalogService/ListProducts'
+
+HEDGES = metrics.REGISTRY.counter(
+  'catalog_hedges_total', 'Hedged product catalog calls sent.', ('grpc_method',))
+HEDGES_WON = metrics.REGISTRY.counter(
+  'catalog_hedges_won_total', 'Hedged product catalog calls that returned first.',
+  ('grpc_method',))
+
+RETRIES = metrics.REGISTRY.counter(
+  'catalog_retries_total', 'Product catalog call attempts retried after UNAVAILABLE.',
+  ('grpc_method',))
+
+# The backoff of gRPC's retryPolicy: the nth retry waits a random time of
+# up to INITIAL_BACKOFF * BACKOFF_MULTIPLIER ** (n - 1), and MAX_BACKOFF.
+INITIAL_BACKOFF = 0.05
+MAX_BACKOFF = 1.0
+BACKOFF_MULTIPLIER = 2
+
+def remaining_time(context):
+  """Returns the seconds left before the deadline of the inbound RPC
+  `context`, or None."""
+  if context is None:
+    return None
+  return context.time_remaining()
+
+def _backoff(retry):
+  return random.uniform(0, min(INITIAL_BACKOFF * BACKOFF_MULTIPLIER ** (retry - 1), MAX_BACKOFF))
+
+def _method_name(method):
+  if isinstance(method, bytes):
+    # grpc.aio passes the method name as bytes
+    return method.decode('utf-8')
+  return method
+
+class RetryThrottle(object):
+  """The retryThrottling of gRPC's service config: every attempt that
+  fails with a retryable status takes a token and every successful call
+  gives back `token_ratio`. Retries stop while no more than half of
+  `max_tokens` are left, that is while more than half of the recent
+  calls fail."""
+
+  def __init__(self, max_tokens=10, token_ratio=0.1):
+    self.max_tokens = max_tokens
+    self.token_ratio = token_ratio
+    self._tokens = float(max_tokens)
+    self._lock = threading.Lock()
+
+  def failure(self):
+    """Records a failed attempt; returns whether it may be retried."""
+    with self._lock:
+      self._tokens = max(0.0, self._tokens - 1)
+      return self._tokens > self.max_tokens / 2
+
+  def success(self):
+    with self._lock:
+      self._tokens = min(self.max_tokens, self._tokens + self.token_ratio)
+
+class _CallDetails(grpc.ClientCallDetails):
+  def __init__(self, method, timeout, metadata, credentials, wait_for_ready, compression):
+    self.method = method
+    self.timeout = timeout
+    self.metadata = metadata
+    self.credentials = credentials
+    self.wait_for_ready = wait_for_ready
+    self.compression = compression
+
+class _Retries(object):
+  """Decides whether an attempt of a call with `timeout` is retried."""
+
+  def __init__(self, max_attempts, throttle, timeout):
+    self.max_attempts = max_attempts
+    self.throttle = throttle
+    self.deadline = None if timeout is None else time.monotonic() + timeout
+    self.attempts = 0
+
+  def timeout(self):
+    """Returns the timeout of the next attempt."""
+    self.attempts += 1
+    if self.deadline is None:
+      return None
+    return max(0.0, self.deadline - time.monotonic())
+
+  def backoff(self, code, method):
+    """Returns the seconds to wait before the next attempt of a call whose
+    last attempt ended with `code`, or None to give up."""
+    if code == grpc.StatusCode.OK:
+      self.throttle.success()
+      return None
+    if code != grpc.StatusCode.UNAVAILABLE:
+      return None
+    # the throttle counts every failed attempt, the last one too
+    if not self.throttle.failure() or self.attempts >= self.max_attempts:
+      return None
+    backoff = _backoff(self.attempts)
+    if self.deadline is not None and time.monotonic() + backoff >= self.deadline:
+      return None
+    RETRIES.labels(_method_name(method)).inc()
+    return backoff
+
+class RetryInterceptor(grpc.UnaryUnaryClientInterceptor):
+  """Retries unary calls that fail with UNAVAILABLE, up to `max_attempts`
+  attempts within the call's deadline, and counts the retries in
+  catalog_retries_total.
+
+  It waits for every attempt, so it is for blocking calls only: a
+  .future() call through it would block until its last attempt ended.
+  """
+
+  def __init__(self, max_attempts, throttle=None):
+    self.max_attempts = max_attempts
+    self.throttle = throttle if throttle is not None else RetryThrottle()
+
+  def intercept_unary_unary(self, continuation, client_call_details, request):
+    details = client_call_details
+    retries = _Retries(self.max_attempts, self.throttle, details.timeout)
+    while True:
+      call = continuation(
+        _CallDetails(details.method, retries.timeout(), details.metadata, details.credentials,
+                     details.wait_for_ready, details.compression),
+        request)
+      backoff = retries.backoff(call.code(), details.method)
+      if backoff is None:
+        return call
+      time.sleep(backoff)
+
+class AsyncRetryInterceptor(grpc.aio.UnaryUnaryClientInterceptor):
+  """RetryInterceptor for grpc.aio channels, where every call can be
+  retried."""
+
+  def __init__(self, max_attempts, throttle=None):
+    self.max_attempts = max_attempts
+    self.throttle = throttle if throttle is not None else RetryThrottle()
+
+  async def intercept_unary_unary(self, continuation, client_call_details, request):
+    details = client_call_details
+    retries = _Retries(self.max_attempts, self.throttle, details.timeout)
+    while True:
+      call = await continuation(
+        grpc.aio.ClientCallDetails(details.method, retries.timeout(), details.metadata,
+                                   details.credentials, details.wait_for_ready),
+        request)
+      backoff = retries.backoff(await call.code(), details.method)
+      if backoff is None:
+        return call
+      await asyncio.sleep(backoff)
+
+class _Settings(object):
+  def __init__(self, timeout=None, max_attempts=None, hedging_delay=None, max_hedges=None):
+    env = os.environ.get
+    self.timeout = timeout if timeout is not None else float(env('CATALOG_TIMEOUT_SECONDS', "3"))
+    self.max_attempts = (max_attempts if max_attempts is not None
+                         else int(env('CATALOG_MAX_ATTEMPTS', "3")))
+    self.hedging_delay = (hedging_delay if hedging_delay is not None
+                          else float(env('CATALOG_HEDGING_DELAY_MS', "0")) / 1000)
+    self.max_hedges = max_hedges if max_hedges is not None else int(env('CATALOG_MAX_HEDGES', "1"))
+
+  def timeout_for(self, remaining):
+    if remaining is None:
+      return self.timeout
+    return max(0.0, min(self.timeout, remaining))
+
+  def describe(self):
+    return "timeout={}s max_attempts={} hedging_delay={}s max_hedges={}".format(
+      self.timeout, self.max_attempts, self.hedging_delay, self.max_hedges)
+
+def breaker_from_env(logger=None):
+  env = os.environ.get
+  return CircuitBreaker(
+    'productcatalog',
+    window=int(env('CATALOG_BREAKER_WINDOW', "20")),
+    min_calls=int(env('CATALOG_BREAKER_MIN_CALLS', "5")),
+    failure_rate=float(env('CATALOG_BREAKER_FAILURE_RATE', "0.5")),
+    slow_call_seconds=float(env('CATALOG_BREAKER_SLOW_CALL_MS', "1000")) / 1000,
+    slow_call_rate=float(env('CATALOG_BREAKER_SLOW_CALL_RATE', "0.5")),
+    open_seconds=float(env('CATALOG_BREAKER_OPEN_SECONDS', "5")),
+    probes=int(env('CATALOG_BREAKER_PROBES', "1")),
+    logger=logger)
+
+def _breaker_failure(err, inbound_deadline):
+  """Returns whether the error `err` counts against the catalog, or None
+  if it says nothing about it. `inbound_deadline` tells if the call ran
+  under the inbound RPC's deadline rather than its own."""
+  if not isinstance(err, grpc.RpcError):
+    return None
+  if err.code() == grpc.StatusCode.DEADLINE_EXCEEDED and inbound_deadline:
+    # the caller ran out of time, maybe waiting on something else
+    return None
+  return err.code() in BREAKER_FAILURES
+
+class CatalogClient(object):
+  """Calls the product catalog at `target` from a threaded server.
+
+  `breaker` defaults to one configured from the CATALOG_BREAKER_*
+  variables.
+  """
+
+  def __init__(self, target, logger=None, breaker=None, **settings):
+    self.settings = _Settings(**settings)
+    self.breaker = breaker if breaker is not None else breaker_from_env(logger)
+    self.channel = grpc.intercept_channel(
+      grpc.insecure_channel(target), metrics.ClientMetricsInterceptor())
+    # retries go around the metrics interceptor, which records each attempt
+    self.stub = demo_pb2_grpc.ProductCatalogServiceStub(grpc.intercept_channel(
+      self.channel, RetryInterceptor(self.settings.max_attempts)))
+    self._hedging_stub = demo_pb2_grpc.ProductCatalogServiceStub(self.channel)
+    if logger is not None:
+      logger.info("product catalog client: " + self.settings.describe())
+
+  def list_products(self, remaining=None):
+    """Returns the products; `remaining` is the time left of the inbound
+    RPC this call serves, if any. Raises CircuitOpenError while the
+    breaker is open."""
+    timeout = self.settings.timeout_for(remaining)
+    permit = self.breaker.acquire()
+    started = time.monotonic()
+    failed = None
+    try:
+      if self.settings.hedging_delay <= 0 or self.settings.max_hedges <= 0:
+        products = self.stub.ListProducts(demo_pb2.Empty(), timeout=timeout).products
+      else:
+        products = self._hedged(self._hedging_stub.ListProducts, demo_pb2.Empty(), timeout,
+                                LIST_PRODUCTS).products
+      failed = False
+      return products
+    except Exception as err:
+      failed = _breaker_failure(err, timeout < self.settings.timeout)
+      raise
+    finally:
+      self.breaker.record(permit, time.monotonic() - started, failed)
+
+  def _hedged(self, method, request, timeout, name):
+    deadline = time.monotonic() + timeout
+    completed = queue.SimpleQueue()
+    calls = []
+    def send():
+      call = method.future(request, timeout=max(0.0, deadline - time.monotonic()))
+      calls.append(call)
+      call.add_done_callback(completed.put)
+    send()
+    failed = 0
+    try:
+      while True:
+        wait = None
+        if len(calls) <= self.settings.max_hedges:
+          wait = self.settings.hedging_delay
+        try:
+          call = completed.get(timeout=wait)
+        except queue.Empty:
+          HEDGES.labels(name).inc()
+          send()
+          continue
+        if call.code() == grpc.StatusCode.OK:
+          if call is not calls[0]:
+            HEDGES_WON.labels(name).inc()
+          return call.result()
+        failed += 1
+        # only UNAVAILABLE is worth another call; others are final
+        if call.code() != grpc.StatusCode.UNAVAILABLE or failed == 1 + self.settings.max_hedges:
+          return call.result()
+        if failed == len(calls):
+          HEDGES.labels(name).inc()
+          send()
+    finally:
+      for call in calls:
+        call.cancel()
+
+class AsyncCatalogClient(CatalogClient):
+  """Calls the product catalog at `target` from a grpc.aio server."""
+
+  def __init__(self, target, logger=None, breaker=None, **settings):
+    self.settings = _Settings(**settings)
+    self.breaker = breaker if breaker is not None else breaker_from_env(logger)
+    # the first interceptor is the outermost
+    self.channel = grpc.aio.insecure_channel(target, interceptors=[
+      AsyncRetryInterceptor(self.settings.max_attempts),
+      metrics.AsyncClientMetricsInterceptor()])
+    self.stub = demo_pb2_grpc.ProductCatalogServiceStub(self.channel)
+    if logger is not None:
+      logger.info("product catalog client: " + self.settings.describe())
+
+  async def list_products(self, remaining=None):
+    timeout = self.settings.timeout_for(remaining)
+    permit = self.breaker.acquire()
+    started = time.monotonic()
+    failed = None
+    try:
+      if self.settings.hedging_delay <= 0 or self.settings.max_hedges <= 0:
+        reply = await self.stub.ListProducts(demo_pb2.Empty(), timeout=timeout)
+      else:
+        reply = await self._hedged(self.stub.ListProducts, demo_pb2.Empty(), timeout,
+                                   LIST_PRODUCTS)
+      failed = False
+      return reply.products
+    except Exception as err:
+      failed = _breaker_failure(err, timeout < self.settings.timeout)
+      raise
+    finally:
+      self.breaker.record(permit, time.monotonic() - started, failed)
+
+  async def _hedged(self, method, request, timeout, name):
+    deadline = time.monotonic() + timeout
+    pending = []
+    def send():
+      task = asyncio.ensure_future(
+        method(request, timeout=max(0.0, deadline - time.monotonic())))
+      pending.append(task)
+      return task
+    first = send()
+    sent = 1
+    failed = 0
+    try:
+      while True:
+        wait = self.settings.hedging_delay if sent <= self.settings.max_hedges else None
+        done, _ = await asyncio.wait(pending, timeout=wait,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+          HEDGES.labels(name).inc()
+          send()
+          sent += 1
+          continue
+        for task in done:
+          pending.remove(task)
+          error = task.exception()
+          if error is None:
+            if task is not first:
+              HEDGES_WON.labels(name).inc()
+            return task.result()
+          failed += 1
+          if (not isinstance(error, grpc.RpcError) or error.code() != grpc.StatusCode.UNAVAILABLE
+              or failed == 1 + self.settings.max_hedges):
+            raise error
+        if not pending:
+          HEDGES.labels(name).inc()
+          send()
+          sent += 1
+    finally:
+      for task in pending:
+        task.cancel()
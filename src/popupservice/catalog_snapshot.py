@@ -0,0 +1,142 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A product catalog snapshot shared by concurrent popups.
+#
+# Products are served from the last ListProducts reply for `ttl` seconds
+# (CATALOG_REFRESH_INTERVAL_SECONDS, default 30). Once it has expired,
+# popups keep getting it while one background fetch replaces it
+# (stale-while-revalidate), so a burst of popups makes at most one
+# catalog call per refresh interval and none of them waits for it. Only
+# the popups that arrive before the first snapshot wait, all for the same
+# fetch (single flight).
+#
+# A fetch runs under the catalog client's own timeout rather than the
+# deadline of the popup that started it, so the popups that wait longer,
+# or arrive later, still get its result. A fetch that finds the catalog
+# unchanged keeps the list served so far, so callers can tell a new
+# catalog by identity.
+
+import os
+import threading
+import time
+
+def catalog_ttl():
+    return float(os.environ.get('CATALOG_REFRESH_INTERVAL_SECONDS', "30"))
+
+class _Flight(object):
+    __slots__ = ('done', 'products', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.products = None
+        self.error = None
+
+class SnapshotCatalog(object):
+    """Serves list_products of `catalog`, a CatalogClient, from a snapshot
+    refreshed every `ttl` seconds; see above.
+
+    A failed refresh keeps the last snapshot. Before there is one, a fetch
+    error is raised to the popups waiting for that fetch, and a popup that
+    runs out of time while waiting raises TimeoutError.
+    """
+
+    def __init__(self, catalog, ttl=None, clock=time.monotonic):
+        self.catalog = catalog
+        self.ttl = ttl if ttl is not None else catalog_ttl()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._products = None
+        self._fetched_at = None
+        self._flight = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.coalesced = 0
+
+    def list_products(self, remaining=None):
+        """Returns the products; `remaining` is the time left of the inbound
+        RPC, which bounds the wait for the first snapshot."""
+        with self._lock:
+            products = self._fresh()
+            if products is not None:
+                self.hits += 1
+                return products
+            stale = self._products
+            flight = self._flight
+            start = flight is None
+            if start:
+                flight = self._flight = _Flight()
+                self.fetches += 1
+            if stale is not None:
+                self.stale_hits += 1
+            elif not start:
+                self.coalesced += 1
+        if start:
+            threading.Thread(target=self._fetch, args=(flight,), name='catalog-snapshot',
+                             daemon=True).start()
+        if stale is not None:
+            return stale
+        if not flight.done.wait(remaining):
+            raise TimeoutError("timed out waiting for the product catalog")
+        if flight.error is not None:
+            raise flight.error
+        return flight.products
+
+    def _fetch(self, flight):
+        try:
+            products = self.catalog.list_products()
+        except Exception as err:
+            flight.error = err
+            with self._lock:
+                self.fetch_errors += 1
+        else:
+            # An unchanged catalog keeps the list object served so far: the
+            # Outfits rendered for it are keyed by identity.
+            if self._products is not None and products == self._products:
+                products = self._products
+            flight.products = products
+            with self._lock:
+                self._products = products
+                self._fetched_at = self._clock()
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
+
+    def _fresh(self):
+        fetched_at = self._fetched_at
+        if fetched_at is None or self._clock() - fetched_at >= self.ttl:
+            return None
+        return self._products
+
+    def age(self):
+        fetched_at = self._fetched_at
+        if fetched_at is None:
+            return None
+        return self._clock() - fetched_at
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'fetches': self.fetches,
+                'fetch_errors': self.fetch_errors,
+                'coalesced': self.coalesced,
+                'age_seconds': self.age(),
+            }
@@ -0,0 +1,95 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Assigns products to outfit categories by the keywords in their names.
+#
+# The rules are an ordered mapping of category to keywords, compiled into
+# a single regular expression with one named group per category. A
+# keyword only matches a whole word, optionally in the plural, so "top"
+# matches "Tank Top" and "Tops" but not "Laptop". When a name matches
+# several categories, the one listed first wins.
+#
+# CATEGORY_RULES_FILE names a JSON file with rules that replace the
+# built-in ones, e.g. {"headwear": ["hat", "cap"], "shoes": ["boots"]}.
+
+import json
+import os
+import re
+from types import MappingProxyType
+
+def load_rules(path):
+    """Reads category rules from the JSON file at `path`."""
+    with open(path) as f:
+        rules = json.load(f)
+    if not isinstance(rules, dict) or not rules:
+        raise ValueError(f"{path}: expected an object of category to keywords")
+    for category, keywords in rules.items():
+        if (not isinstance(keywords, list) or not keywords
+                or not all(isinstance(k, str) and k.strip() for k in keywords)):
+            raise ValueError(f"{path}: keywords of {category!r} must be a non-empty list of words")
+    return rules
+
+class CategoryMatcher(object):
+    """Compiled category rules; see above."""
+
+    def __init__(self, rules):
+        self.categories = tuple(rules)
+        self._priority = {}
+        groups = []
+        for n, (category, keywords) in enumerate(rules.items()):
+            group = f"c{n}"
+            self._priority[group] = (n, category)
+            # longest first, so a keyword that prefixes another cannot
+            # shadow it
+            words = sorted({k.strip().lower() for k in keywords}, key=len, reverse=True)
+            groups.append(f"(?P<{group}>{'|'.join(re.escape(w) for w in words)})")
+        # not next to a word character: unlike \b, this also works for
+        # keywords that start or end with punctuation, like "c++"
+        self._pattern = re.compile(r"(?<!\w)(?:" + "|".join(groups) + r")s?(?!\w)")
+
+    def category(self, name):
+        """Returns the category of a product called `name`, or None."""
+        name = name.lower()
+        match = self._pattern.search(name)
+        if match is None:
+            return None
+        best = self._priority[match.lastgroup]
+        # only a later match of an earlier category can change the answer
+        if best[0]:
+            for match in self._pattern.finditer(name, match.end()):
+                best = min(best, self._priority[match.lastgroup])
+        return best[1]
+
+    def buckets(self, products):
+        """Returns a read-only mapping of every category to a tuple of the
+        (id, name) of its products, in catalog order."""
+        buckets = {category: [] for category in self.categories}
+        for product in products:
+            category = self.category(product.name)
+            if category is not None:
+                buckets[category].append((product.id, product.name))
+        return MappingProxyType({c: tuple(items) for c, items in buckets.items()})
+
+def matcher_from_env(default_rules, logger=None):
+    """Returns a CategoryMatcher for CATEGORY_RULES_FILE, or for
+    `default_rules` when it is not set."""
+    path = os.getenv("CATEGORY_RULES_FILE")
+    if not path:
+        return CategoryMatcher(default_rules)
+    rules = load_rules(path)
+    if logger is not None:
+        logger.info(f"Loaded category rules for {', '.join(rules)} from {path}")
+    return CategoryMatcher(rules)
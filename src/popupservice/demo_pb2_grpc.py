@@ -205,6 +205,16 @@ class RecommendationServiceStub(object):
                 request_serializer=demo__pb2.ListRecommendationsRequest.SerializeToString,
                 response_deserializer=demo__pb2.ListRecommendationsResponse.FromString,
                 _registered_method=True)
+        self.ListRecommendationsBatch = channel.unary_unary(
+                '/hipstershop.RecommendationService/ListRecommendationsBatch',
+                request_serializer=demo__pb2.ListRecommendationsBatchRequest.SerializeToString,
+                response_deserializer=demo__pb2.ListRecommendationsBatchResponse.FromString,
+                _registered_method=True)
+        self.StreamRecommendations = channel.stream_stream(
+                '/hipstershop.RecommendationService/StreamRecommendations',
+                request_serializer=demo__pb2.ListRecommendationsRequest.SerializeToString,
+                response_deserializer=demo__pb2.ListRecommendationsResponse.FromString,
+                _registered_method=True)
 
 
 class RecommendationServiceServicer(object):
@@ -218,6 +228,21 @@ class RecommendationServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListRecommendationsBatch(self, request, context):
+        """Answers many requests from a single catalog snapshot.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamRecommendations(self, request_iterator, context):
+        """Answers each request on the stream as it arrives, in order, from the
+        catalog snapshot current when the stream was opened.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_RecommendationServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -226,6 +251,16 @@ def add_RecommendationServiceServicer_to_server(servicer, server):
                     request_deserializer=demo__pb2.ListRecommendationsRequest.FromString,
                     response_serializer=demo__pb2.ListRecommendationsResponse.SerializeToString,
             ),
+            'ListRecommendationsBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListRecommendationsBatch,
+                    request_deserializer=demo__pb2.ListRecommendationsBatchRequest.FromString,
+                    response_serializer=demo__pb2.ListRecommendationsBatchResponse.SerializeToString,
+            ),
+            'StreamRecommendations': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamRecommendations,
+                    request_deserializer=demo__pb2.ListRecommendationsRequest.FromString,
+                    response_serializer=demo__pb2.ListRecommendationsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'hipstershop.RecommendationService', rpc_method_handlers)
@@ -266,6 +301,60 @@ class RecommendationService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def ListRecommendationsBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/hipstershop.RecommendationService/ListRecommendationsBatch',
+            demo__pb2.ListRecommendationsBatchRequest.SerializeToString,
+            demo__pb2.ListRecommendationsBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamRecommendations(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/hipstershop.RecommendationService/StreamRecommendations',
+            demo__pb2.ListRecommendationsRequest.SerializeToString,
+            demo__pb2.ListRecommendationsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
 
 class ProductCatalogServiceStub(object):
     """---------------Product Catalog----------------
@@ -293,6 +382,11 @@ class ProductCatalogServiceStub(object):
                 request_serializer=demo__pb2.SearchProductsRequest.SerializeToString,
                 response_deserializer=demo__pb2.SearchProductsResponse.FromString,
                 _registered_method=True)
+        self.WatchProducts = channel.unary_stream(
+                '/hipstershop.ProductCatalogService/WatchProducts',
+                request_serializer=demo__pb2.WatchProductsRequest.SerializeToString,
+                response_deserializer=demo__pb2.ProductsUpdate.FromString,
+                _registered_method=True)
 
 
 class ProductCatalogServiceServicer(object):
@@ -318,6 +412,15 @@ class ProductCatalogServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchProducts(self, request, context):
+        """Streams changes to the catalog: first the difference between the
+        catalog version the client knows and the current one, then one
+        update per change.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ProductCatalogServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -336,6 +439,11 @@ def add_ProductCatalogServiceServicer_to_server(servicer, server):
                     request_deserializer=demo__pb2.SearchProductsRequest.FromString,
                     response_serializer=demo__pb2.SearchProductsResponse.SerializeToString,
             ),
+            'WatchProducts': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchProducts,
+                    request_deserializer=demo__pb2.WatchProductsRequest.FromString,
+                    response_serializer=demo__pb2.ProductsUpdate.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'hipstershop.ProductCatalogService', rpc_method_handlers)
@@ -430,6 +538,33 @@ class ProductCatalogService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def WatchProducts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/hipstershop.ProductCatalogService/WatchProducts',
+            demo__pb2.WatchProductsRequest.SerializeToString,
+            demo__pb2.ProductsUpdate.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
 
 class ShippingServiceStub(object):
     """---------------Shipping Service----------
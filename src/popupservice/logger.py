@@ -0,0 +1,168 @@
+#!/usr/bin/python
+#
+# Copyright 2018 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Logging for the Python services, as one JSON object per line on stdout.
+#
+# This module is shared by emailservice, popupservice and
+# recommendationservice and copied into each of them; keep the copies
+# identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+#
+# Records are handed to a background thread through a queue; the message
+# is formatted and written there, so a log call does not block on stdout.
+# Messages are formatted lazily: pass arguments, as in
+# logger.info("got %s", value), rather than a formatted string.
+#
+#   LOG_SAMPLE_RATES  comma-separated logger=rate pairs, e.g.
+#                     "recommendationservice-requests=0.01": only that
+#                     fraction of the logger's records below WARNING is kept
+
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from json.encoder import encode_basestring_ascii
+
+# Optional fields, added after the message when the record has them.
+_OPTIONAL_FIELDS = (('trace_id', ',"trace_id":'), ('span_id', ',"span_id":'))
+
+class JsonFormatter(logging.Formatter):
+  """Formats a record as {"timestamp", "severity", "name", "message"[,
+  "trace_id", "span_id"][, "exc_info"]}.
+
+  The object is written with pre-built keys in a fixed order and
+  json-escaped strings, without building a dict per record. Strings are
+  escaped to ASCII, so the output is valid JSON whatever the message
+  contains.
+  """
+
+  def format(self, record):
+    try:
+      message = record.getMessage()
+    except Exception:
+      # bad arguments must not lose the record
+      message = '{!r} % {!r}'.format(record.msg, record.args)
+    out = ('{"timestamp":' + repr(record.created) +
+           ',"severity":' + encode_basestring_ascii(record.levelname) +
+           ',"name":' + encode_basestring_ascii(record.name) +
+           ',"message":' + encode_basestring_ascii(message))
+    for attr, key in _OPTIONAL_FIELDS:
+      value = record.__dict__.get(attr)
+      if value is not None:
+        out += key + encode_basestring_ascii(str(value))
+    if record.exc_info:
+      if not record.exc_text:
+        record.exc_text = self.formatException(record.exc_info)
+    if record.exc_text:
+      out += ',"exc_info":' + encode_basestring_ascii(record.exc_text)
+    if record.stack_info:
+      out += ',"stack_info":' + encode_basestring_ascii(self.formatStack(record.stack_info))
+    return out + '}'
+
+class TraceContextFilter(logging.Filter):
+  """Adds the trace_id and span_id of the current OpenTelemetry span.
+
+  It runs on the logging thread, where the span is current. OpenTelemetry
+  is only consulted once something else has imported it, so a service
+  with tracing disabled does not pay for it.
+  """
+
+  def filter(self, record):
+    trace = sys.modules.get('opentelemetry.trace')
+    if trace is not None:
+      try:
+        context = trace.get_current_span().get_span_context()
+        if context.is_valid:
+          record.trace_id = format(context.trace_id, '032x')
+          record.span_id = format(context.span_id, '016x')
+      except Exception:
+        # never lose a record over its trace context
+        pass
+    return True
+
+class SamplingFilter(logging.Filter):
+  """Keeps a `rate` fraction of the records below WARNING, and all others."""
+
+  def __init__(self, rate, random=random.random):
+    super(SamplingFilter, self).__init__()
+    self.rate = rate
+    self._random = random
+
+  def filter(self, record):
+    return record.levelno >= logging.WARNING or self._random() < self.rate
+
+class _QueueHandler(logging.handlers.QueueHandler):
+  def prepare(self, record):
+    # Unlike QueueHandler, do not format the message here; the listener
+    # does. Arguments must therefore not be mutated after the call.
+    return record
+
+  def close(self):
+    # logging.shutdown(), run at exit, drains the queue
+    _stop_listener()
+    super(_QueueHandler, self).close()
+
+_handler = None
+_listener = None
+
+def _start_listener():
+  global _listener
+  stream = logging.StreamHandler(sys.stdout)
+  stream.setFormatter(JsonFormatter())
+  _handler.queue = queue.SimpleQueue()
+  _listener = logging.handlers.QueueListener(_handler.queue, stream)
+  _listener.start()
+
+def _stop_listener():
+  global _listener
+  if _listener is not None:
+    _listener.stop()
+    _listener = None
+
+def _process_handler():
+  global _handler
+  if _handler is None:
+    _handler = _QueueHandler(None)
+    _handler.addFilter(TraceContextFilter())
+    _start_listener()
+    # the listener thread does not survive fork(); give each child its own
+    os.register_at_fork(after_in_child=_start_listener)
+  return _handler
+
+def sample_rates():
+  rates = {}
+  for item in os.environ.get('LOG_SAMPLE_RATES', '').split(','):
+    if item.strip():
+      name, _, rate = item.partition('=')
+      rates[name.strip()] = float(rate)
+  return rates
+
+def getJSONLogger(name):
+  logger = logging.getLogger(name)
+  if logger.handlers:
+    # already configured by another module of this service
+    return logger
+  logger.addHandler(_process_handler())
+  logger.setLevel(logging.INFO)
+  logger.propagate = False
+  rate = sample_rates().get(name, 1.0)
+  if rate <= 0:
+    logger.setLevel(logging.WARNING)
+  elif rate < 1:
+    logger.addFilter(SamplingFilter(rate))
+  return logger
@@ -0,0 +1,121 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Pre-rendered popup replies.
+#
+# The JSON and the serialized OutfitItem of every product in the category
+# buckets of a catalog snapshot are rendered once, when the snapshot is
+# first seen. A popup reply is then put together by concatenating the
+# fragments of the items picked, and the serialized PopupReply of each
+# outfit is cached, so repeated outfits cost a dictionary lookup. The
+# bytes are exactly what json.dumps and PopupReply.SerializeToString
+# produce for the same outfit.
+
+import json
+import random
+
+# Served when no complete outfit can be made from the catalog.
+FALLBACK_OUTFIT = (
+    {'id': 'OLJCESPC7Z', 'name': 'Sunglasses', 'slug': 'sunglasses'},
+    {'id': '2ZYFJ3GM2N', 'name': 'Tank Top', 'slug': 'tank-top'},
+    {'id': '66VCHSJNUP', 'name': 'Loafers', 'slug': 'loafers'},
+)
+
+def encode_varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def slug(name):
+    return name.lower().replace(" ", "-")
+
+def render_item(product_id, name):
+    """Returns the JSON of one outfit item."""
+    return json.dumps({"id": product_id, "name": name, "slug": slug(name)}).encode()
+
+def render_message(fragments):
+    """Returns the JSON popup message of the items rendered in `fragments`."""
+    return b'{"items": [' + b', '.join(fragments) + b']}'
+
+def _string_field(tag, value):
+    # proto3 leaves empty strings out
+    if not value:
+        return b''
+    return tag + encode_varint(len(value)) + value
+
+def encode_item(product_id, name):
+    """Returns one outfit item as field 2 of PopupReply, an OutfitItem."""
+    item = (_string_field(b'\x0a', product_id.encode())
+            + _string_field(b'\x12', name.encode())
+            + _string_field(b'\x1a', slug(name).encode()))
+    return b'\x12' + encode_varint(len(item)) + item
+
+def serialize_reply(message, items=b''):
+    """Returns a PopupReply of the JSON `message` and the encoded `items`."""
+    return _string_field(b'\x0a', message) + items
+
+def _fallback_reply(message):
+    items = b''.join(encode_item(item['id'], item['name']) for item in FALLBACK_OUTFIT)
+    if message:
+        message = render_message(json.dumps(item).encode() for item in FALLBACK_OUTFIT)
+    return serialize_reply(message or b'', items)
+
+FALLBACK_REPLY = _fallback_reply(message=True)
+# for clients that asked for items only
+FALLBACK_ITEMS_REPLY = _fallback_reply(message=False)
+
+class Outfits(object):
+    """The outfits that can be made from the category buckets of one
+    catalog snapshot.
+
+    `complete` is False when some category has no products. The serialized
+    replies of up to `max_cached` distinct outfits are kept, of each form.
+    """
+
+    def __init__(self, buckets, max_cached=10000):
+        self.buckets = buckets
+        self.items = tuple(items for items in buckets.values() if items)
+        self.fragments = tuple(tuple(render_item(*item) for item in items) for items in self.items)
+        self.encoded = tuple(tuple(encode_item(*item) for item in items) for items in self.items)
+        self.complete = len(self.items) == len(buckets)
+        self._sizes = tuple(len(items) for items in self.items)
+        self.max_cached = max_cached
+        self._replies = {}
+        self._item_replies = {}
+
+    def pick(self, rng=random):
+        """Returns a random outfit: the index of one item per category."""
+        draw = rng.random
+        return tuple([int(draw() * size) for size in self._sizes])
+
+    def reply(self, picks, message=True):
+        """Returns the serialized PopupReply of the outfit `picks`; its
+        JSON message is left empty unless `message` is set."""
+        replies = self._replies if message else self._item_replies
+        reply = replies.get(picks)
+        if reply is None:
+            items = b''.join(encoded[i] for encoded, i in zip(self.encoded, picks))
+            if message:
+                reply = serialize_reply(render_message(
+                    fragments[i] for fragments, i in zip(self.fragments, picks)), items)
+            else:
+                reply = items
+            if len(replies) < self.max_cached:
+                replies[picks] = reply
+        return reply
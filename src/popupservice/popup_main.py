@@ -1,132 +1,212 @@
-from concurrent import futures
+import contextlib
 import os
 import grpc
-import time
-import json
-import random
-import logging
-import sys
 
+import launcher
+import metrics
+import server_config
+from catalog_client import CatalogClient, remaining_time
+from catalog_snapshot import SnapshotCatalog
+from catalog_watch import CatalogWatcher, watch_enabled
+from category_matcher import matcher_from_env
+from circuit_breaker import CircuitOpenError
+from outfits import FALLBACK_ITEMS_REPLY, FALLBACK_REPLY, Outfits
+from session_store import session_store_from_env
 import popup_pb2
 import popup_pb2_grpc
-import demo_pb2
-import demo_pb2_grpc
 
 from grpc_health.v1 import health_pb2, health_pb2_grpc
 from grpc_health.v1.health import HealthServicer
 
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.grpc import GrpcInstrumentorServer
 from opentelemetry.sdk.resources import Resource
 
+from logger import getJSONLogger
 
+logger = getJSONLogger('popupservice')
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='{"timestamp": "%(asctime)s", "severity": "%(levelname)s", "message": "%(message)s", "service": "popupservice"}',
-    stream=sys.stdout
-)
-logger = logging.getLogger(__name__)
+# Replaced by the SDK tracer once init_tracing has enabled tracing. Until
+# then span() skips spans altogether.
+tracer = trace.get_tracer(__name__)
+tracing_enabled = False
+_NO_SPAN = contextlib.nullcontext(trace.INVALID_SPAN)
+
+def span(name):
+    """Returns a context manager that starts the span `name`, or does
+    nothing while tracing is off."""
+    if not tracing_enabled:
+        return _NO_SPAN
+    return tracer.start_as_current_span(name)
 
 
 CATEGORY_KEYWORDS = {
-    "headwear": ['hat', 'cap', 'beanie', 'helmet', 'headband', 'visor', 'glasses'],
+    "headwear": ['hat', 'cap', 'beanie', 'helmet', 'headband', 'visor', 'glasses', 'sunglasses'],
     "tops": ['shirt', 'tank', 'blouse', 'sweater', 'jacket', 'hoodie', 'top', 'tee', 'watch'],
     "shoes": ['shoes', 'boots', 'sneakers', 'loafers', 'sandals', 'slippers', 'heels']
 }
 
+def _serialize_reply(reply):
+    # Replies are usually pre-rendered; see outfits.py.
+    if isinstance(reply, bytes):
+        return reply
+    return reply.SerializeToString()
+
+def add_PopupServiceServicer_to_server(servicer, server):
+    """Like popup_pb2_grpc.add_PopupServiceServicer_to_server, but lets
+    handlers return serialized replies."""
+    rpc_method_handlers = {
+        'GetPopupMessage': grpc.unary_unary_rpc_method_handler(
+            servicer.GetPopupMessage,
+            request_deserializer=popup_pb2.PopupRequest.FromString,
+            response_serializer=_serialize_reply),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        'popup.PopupService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('popup.PopupService', rpc_method_handlers)
+
 class PopupServiceServicer(popup_pb2_grpc.PopupServiceServicer):
+    """GetPopupMessage returns serialized replies, so the servicer must be
+    registered with add_PopupServiceServicer_to_server above."""
+
     def __init__(self):
         catalog_addr = os.getenv("PRODUCT_CATALOG_SERVICE_ADDR", "productcatalogservice:3550")
         logger.info(f"Connecting to product catalog service at {catalog_addr}")
 
-        self.catalog_channel = grpc.insecure_channel(catalog_addr)
-        self.catalog_stub = demo_pb2_grpc.ProductCatalogServiceStub(self.catalog_channel)
+        # deadlines, retries, hedging and the circuit breaker of catalog
+        # calls are configured there
+        self.catalog = CatalogClient(catalog_addr, logger)
+        if watch_enabled():
+            # answer from a local copy kept current by WatchProducts
+            self.catalog = CatalogWatcher(self.catalog, logger)
+            self.catalog.start()
+        else:
+            # one ListProducts per refresh interval, shared by concurrent popups
+            self.catalog = SnapshotCatalog(self.catalog)
+        # the last product list the catalog returned, served while the
+        # circuit breaker is open
+        self.last_products = None
+        # (products, Outfits) of the last product list categorized
+        self._outfits = None
+        # keywords match whole words only; see category_matcher.py.
+        # CATEGORY_RULES_FILE can replace CATEGORY_KEYWORDS
+        self.matcher = matcher_from_env(CATEGORY_KEYWORDS, logger)
+        # the outfit served to each session, so its repeat popups show the
+        # same one; see session_store.py
+        self.sessions = session_store_from_env()
+        metrics.REGISTRY.callback_gauge(
+            'popup_session_store_entries', 'Sessions remembered by the popup session store.',
+            lambda: len(self.sessions))
+        metrics.REGISTRY.callback_gauge(
+            'popup_session_store_bytes', 'Estimated memory held by the popup session store.',
+            lambda: self.sessions.bytes)
 
     def categorize_products(self, products):
-        categories_dict = {cat: [] for cat in CATEGORY_KEYWORDS.keys()}
-
-        for product in products:
-            product_name_lower = product.name.lower()
-            for category, keywords in CATEGORY_KEYWORDS.items():
-                if any(keyword in product_name_lower for keyword in keywords):
-                    categories_dict[category].append((product.id, product.name))
-                    break
-
-        return categories_dict
-
-    def select_random_items(self, categories_dict, max_items=3):
-            recommended = []
-
-            for cat in ["headwear", "tops", "shoes"]:
-                items = categories_dict.get(cat, [])
-                if items:
-                    product_id, product_name = random.choice(items)
-                    recommended.append({
-                        "id": product_id,
-                        "name": product_name,
-                        "slug": product_name.lower().replace(" ", "-")
-                    })
-
-            return recommended
-
-
-
-    def MakeOutfitRecommendation(self):
-        tracer = trace.get_tracer(__name__)
-        with tracer.start_as_current_span("make_outfit_recommendation"):
+        # read-only: the buckets are shared by every request on this snapshot
+        return self.matcher.buckets(products)
+
+    def category_buckets(self, products):
+        return self.outfits_for(products).buckets
+
+    def outfits_for(self, products):
+        """Returns the Outfits of `products`, categorizing and rendering
+        them only when the product list differs from the last one."""
+        current = self._outfits
+        # SnapshotCatalog and CatalogWatcher hand out the same list object
+        # until the catalog changes, so identity is enough and a popup never
+        # compares whole product lists
+        if current is not None and current[0] is products:
+            return current[1]
+        outfits = Outfits(self.categorize_products(products))
+        self._outfits = (products, outfits)
+        logger.info("Categorized products - " + ", ".join(f"{cat}: {len(items)}" for cat, items in outfits.buckets.items()))
+        return outfits
+
+    def _current_outfits(self, context):
+        """Returns the Outfits of the current catalog, or None when the
+        fallback outfit should be served."""
+        with span("make_outfit_recommendation"):
             try:
                 logger.debug("Fetching products from catalog service")
-                products_response = self.catalog_stub.ListProducts(demo_pb2.Empty())
-                categories_dict = self.categorize_products(products_response.products)
-                recommended = self.select_random_items(categories_dict, max_items=3)
-
+                # bounded by the deadline of the inbound RPC, if it is shorter
+                products = self._list_products(context)
+                outfits = self.outfits_for(products)
 
-                logger.info("Categorized products - " + ", ".join(f"{cat}: {len(items)}" for cat, items in categories_dict.items()))
-
-                if len(recommended) == len(CATEGORY_KEYWORDS):
-                    logger.info(f"Successfully created outfit recommendation with {len(recommended)} items")
-                    return recommended
+                if outfits.complete:
+                    logger.info(f"Successfully created outfit recommendation with {len(outfits.items)} items")
+                    return outfits
                 else:
-                    logger.warning(f"Could only find {len(recommended)} items, using fallback")
-                    return self._get_fallback_outfit()
+                    logger.warning(f"Could only find {len(outfits.items)} items, using fallback")
+                    return None
 
+            except CircuitOpenError:
+                logger.debug("Product catalog circuit is open, using fallback")
+                return None
             except grpc.RpcError as e:
                 logger.error(f"gRPC error while fetching products: {e.code()} - {e.details()}")
-                return self._get_fallback_outfit()
+                return None
             except Exception as e:
-                logger.error(f"Unexpected error in MakeOutfitRecommendation: {str(e)}")
-                return self._get_fallback_outfit()
-
-    def _get_fallback_outfit(self):
-        return [
-            {'id': 'OLJCESPC7Z', 'name': 'Sunglasses', 'slug': 'sunglasses'},
-            {'id': '2ZYFJ3GM2N', 'name': 'Tank Top', 'slug': 'tank-top'},
-            {'id': '66VCHSJNUP', 'name': 'Loafers', 'slug': 'loafers'}
-        ]
+                logger.error(f"Unexpected error while making an outfit: {str(e)}")
+                return None
+
+    def _list_products(self, context):
+        try:
+            products = self.catalog.list_products(remaining_time(context))
+        except CircuitOpenError:
+            if self.last_products is None:
+                raise
+            return self.last_products
+        self.last_products = products
+        return products
 
     def GetPopupMessage(self, request, context):
-        tracer = trace.get_tracer(__name__)
-        with tracer.start_as_current_span("get_popup_message") as span:
+        with span("get_popup_message") as current:
             session_id = request.session_id or "unknown"
-            span.set_attribute("session.id", session_id)
+            current.set_attribute("session.id", session_id)
             logger.info(f"Popup message requested for session: {session_id}")
 
             try:
-                recommended = self.MakeOutfitRecommendation()
-                data = {"items": recommended}
+                outfits = self._current_outfits(context)
                 logger.info(f"Returning outfit recommendation for session: {session_id}")
-                return popup_pb2.PopupReply(message=json.dumps(data))
+                if outfits is None:
+                    return FALLBACK_ITEMS_REPLY if request.items_only else FALLBACK_REPLY
+                # assembled from the items rendered for this catalog snapshot
+                picks = self._session_outfit(request.session_id, outfits)
+                return outfits.reply(picks, message=not request.items_only)
             except Exception as e:
                 logger.error(f"Error in GetPopupMessage: {str(e)}")
-                data = {"items": self._get_fallback_outfit()}
-                return popup_pb2.PopupReply(message=json.dumps(data))
+                return FALLBACK_ITEMS_REPLY if request.items_only else FALLBACK_REPLY
+
+
+    def _session_outfit(self, session_id, outfits):
+        """Returns the outfit this session was last served for the same
+        catalog snapshot, or a new random one."""
+        if session_id:
+            picks = self.sessions.get(session_id, outfits)
+            if picks is not None:
+                return picks
+        picks = outfits.pick()
+        if session_id:
+            self.sessions.put(session_id, outfits, picks)
+        return picks
+
+
+def trace_sample_ratio():
+    """TRACE_SAMPLE_RATIO, the share of traces started here that are
+    recorded (default 1)."""
+    ratio = float(os.getenv("TRACE_SAMPLE_RATIO", "1"))
+    if not 0.0 <= ratio <= 1.0:
+        raise ValueError(f"TRACE_SAMPLE_RATIO must be between 0 and 1, got {ratio}")
+    return ratio
 
 
 def init_tracing():
+    global tracer, tracing_enabled
     if os.getenv("ENABLE_TRACING") != "1":
         logger.info("Tracing disabled")
         return
@@ -135,7 +215,11 @@ def init_tracing():
     jaeger_endpoint = os.getenv("JAEGER_OTLP_ENDPOINT", "jaeger:4317")
 
     resource = Resource.create({"service.name": "popupservice"})
-    trace.set_tracer_provider(TracerProvider(resource=resource))
+    # head sampling: a popup whose caller sent a sampling decision keeps
+    # it, others are recorded at the configured ratio
+    ratio = trace_sample_ratio()
+    sampler = ParentBased(TraceIdRatioBased(ratio))
+    trace.set_tracer_provider(TracerProvider(resource=resource, sampler=sampler))
 
     otlp_exporter = OTLPSpanExporter(
         endpoint=jaeger_endpoint,
@@ -145,7 +229,9 @@ def init_tracing():
     span_processor = BatchSpanProcessor(otlp_exporter)
     trace.get_tracer_provider().add_span_processor(span_processor)
 
-    logger.info(f"Tracing configured with OTLP endpoint at {jaeger_endpoint}")
+    tracer = trace.get_tracer(__name__)
+    tracing_enabled = True
+    logger.info(f"Tracing configured with OTLP endpoint at {jaeger_endpoint}, sampling {ratio:.0%} of traces")
 
 
 def serve():
@@ -157,8 +243,8 @@ def serve():
         from opentelemetry.instrumentation.grpc import GrpcInstrumentorClient
         GrpcInstrumentorClient().instrument()
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
-    popup_pb2_grpc.add_PopupServiceServicer_to_server(PopupServiceServicer(), server)
+    server = server_config.create_server(logger, default_max_workers=4)
+    add_PopupServiceServicer_to_server(PopupServiceServicer(), server)
 
     health_servicer = HealthServicer()
     health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
@@ -169,13 +255,10 @@ def serve():
     server.start()
     logger.info(f"popupservice listening on port {port}")
 
-    try:
-        while True:
-            time.sleep(60)
-    except KeyboardInterrupt:
-        logger.info("Shutting down popupservice")
-        server.stop(0)
+    launcher.wait_for_termination(server, logger)
+    logger.info("Shut down popupservice")
 
 
 if __name__ == "__main__":
-    serve()
+    # tracing, channels and the server are set up per worker process
+    launcher.run(serve, logger)
@@ -0,0 +1,166 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Remembers the popup outfit served to each session, so repeat popups of
+# a session show the same one.
+#
+#   POPUP_SESSION_CACHE_SIZE   sessions remembered (default 10000; 0
+#                              disables the store)
+#   POPUP_SESSION_TTL_SECONDS  how long a session's outfit is kept
+#                              (default 300)
+#   POPUP_SESSION_SHARDS       independently locked shards, picked by
+#                              session hash (default 1)
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Bytes an entry costs besides its key and value: the OrderedDict slot
+# and linked-list node, and the (expires, version, value) tuple.
+ENTRY_OVERHEAD = 200
+
+def _entry_size(key, value):
+    return sys.getsizeof(key) + sys.getsizeof(value) + ENTRY_OVERHEAD
+
+class _Shard(object):
+    # The counters are per shard so that they are only ever updated under
+    # the shard's lock; SessionStore sums them.
+    __slots__ = ('entries', 'lock', 'bytes', 'hits', 'misses', 'evictions',
+                 'expirations')
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+class SessionStore(object):
+    """A bounded LRU store of per-session values with a per-entry TTL.
+
+    Each value is stored with the `version` it was computed for, e.g. the
+    catalog snapshot, and is only returned for that version. Sessions are
+    spread over `shards` shards by hash, each holding up to
+    max_entries / shards sessions under its own lock. `bytes` is an
+    estimate of the memory held, counting every value in full even when
+    several sessions share it.
+    """
+
+    def __init__(self, max_entries=10000, ttl=300.0, shards=1, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._shards = tuple(_Shard() for _ in range(max(1, shards)))
+        self._shard_entries = -(-max_entries // len(self._shards))
+
+    def _shard(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key, version):
+        if not self.max_entries:
+            return None
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                shard.misses += 1
+                return None
+            expires, entry_version, value = entry
+            expired = expires < self._clock()
+            if expired or entry_version is not version:
+                if expired:
+                    shard.expirations += 1
+                self._remove(shard, key, value)
+                shard.misses += 1
+                return None
+            shard.entries.move_to_end(key)
+            shard.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        if not self.max_entries:
+            return
+        shard = self._shard(key)
+        now = self._clock()
+        with shard.lock:
+            old = shard.entries.pop(key, None)
+            if old is not None:
+                shard.bytes -= _entry_size(key, old[2])
+            shard.entries[key] = (now + self.ttl, version, value)
+            shard.bytes += _entry_size(key, value)
+            # drop the least recently used entries while over capacity, and
+            # expired ones from the head as they are found
+            while shard.entries:
+                oldest, (expires, _, oldest_value) = next(iter(shard.entries.items()))
+                if expires < now:
+                    shard.expirations += 1
+                elif len(shard.entries) > self._shard_entries:
+                    shard.evictions += 1
+                else:
+                    break
+                self._remove(shard, oldest, oldest_value)
+
+    def _remove(self, shard, key, value):
+        del shard.entries[key]
+        shard.bytes -= _entry_size(key, value)
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+    @property
+    def bytes(self):
+        return sum(shard.bytes for shard in self._shards)
+
+    @property
+    def hits(self):
+        return sum(shard.hits for shard in self._shards)
+
+    @property
+    def misses(self):
+        return sum(shard.misses for shard in self._shards)
+
+    @property
+    def evictions(self):
+        return sum(shard.evictions for shard in self._shards)
+
+    @property
+    def expirations(self):
+        return sum(shard.expirations for shard in self._shards)
+
+    def stats(self):
+        hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'size': len(self),
+            'bytes': self.bytes,
+            'shards': len(self._shards),
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+def session_store_from_env():
+    env = os.environ.get
+    return SessionStore(
+        max_entries=int(env('POPUP_SESSION_CACHE_SIZE', "10000")),
+        ttl=float(env('POPUP_SESSION_TTL_SECONDS', "300")),
+        shards=int(env('POPUP_SESSION_SHARDS', "1")))
@@ -0,0 +1,206 @@
+import threading
+import time
+import unittest
+
+from catalog_client import CatalogClient
+from catalog_snapshot import SnapshotCatalog
+from fake_catalog import start_fake_catalog, synthetic_products
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowCatalog(object):
+    """Answers list_products after `delay` seconds, or raises `error`"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.remaining = []
+
+    def list_products(self, remaining=None):
+        self.calls += 1
+        self.remaining.append(remaining)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return ('products', self.calls)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('timed out')
+        time.sleep(0.005)
+
+
+def concurrently(fn, n):
+    """Calls fn from n threads at once; returns the results or errors"""
+    results = [None] * n
+    start = threading.Barrier(n)
+
+    def run(i):
+        start.wait()
+        try:
+            results[i] = fn()
+        except Exception as err:
+            results[i] = err
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSnapshotCatalog(unittest.TestCase):
+    """Test the TTL snapshot"""
+
+    def test_serves_snapshot_until_it_expires(self):
+        """Test that one fetch serves every call within the TTL"""
+        clock = FakeClock()
+        catalog = SlowCatalog()
+        snapshot = SnapshotCatalog(catalog, ttl=30, clock=clock)
+        first = snapshot.list_products()
+        clock.now = 29
+        self.assertIs(snapshot.list_products(), first)
+        self.assertEqual(catalog.calls, 1)
+        clock.now = 30
+        self.assertIs(snapshot.list_products(), first)
+        wait_for(lambda: snapshot.age() == 0)
+        self.assertEqual(snapshot.list_products(), ('products', 2))
+        self.assertEqual(snapshot.stats()['fetches'], 2)
+        self.assertEqual(snapshot.stats()['hits'], 2)
+        self.assertEqual(snapshot.stats()['stale_hits'], 1)
+
+    def test_stale_snapshot_is_served_while_refreshing(self):
+        """Test that no popup waits for a refresh once there is a snapshot"""
+        clock = FakeClock()
+        catalog = SlowCatalog(delay=0.2)
+        snapshot = SnapshotCatalog(catalog, ttl=30, clock=clock)
+        first = snapshot.list_products()
+        clock.now = 31
+        started = time.monotonic()
+        for _ in range(10):
+            self.assertIs(snapshot.list_products(remaining=0.01), first)
+        self.assertLess(time.monotonic() - started, 0.1)
+        wait_for(lambda: snapshot.age() == 0)
+        self.assertEqual(catalog.calls, 2)
+        self.assertEqual(snapshot.stats()['stale_hits'], 10)
+
+    def test_unchanged_catalog_keeps_the_product_list(self):
+        """Test that a refresh returning an equal list keeps the one served"""
+        clock = FakeClock()
+        catalog = SlowCatalog()
+        catalog.list_products = lambda remaining=None: ['hat', 'shirt']
+        snapshot = SnapshotCatalog(catalog, ttl=30, clock=clock)
+        first = snapshot.list_products()
+        clock.now = 31
+        snapshot.list_products()
+        wait_for(lambda: snapshot.age() == 0)
+        self.assertIs(snapshot.list_products(), first)
+
+    def test_failed_refresh_keeps_the_snapshot(self):
+        """Test that a failed refresh leaves the last snapshot in place"""
+        clock = FakeClock()
+        catalog = SlowCatalog()
+        snapshot = SnapshotCatalog(catalog, ttl=30, clock=clock)
+        first = snapshot.list_products()
+        catalog.error = RuntimeError('catalog down')
+        clock.now = 31
+        self.assertIs(snapshot.list_products(), first)
+        wait_for(lambda: snapshot.stats()['fetch_errors'] == 1)
+        self.assertIs(snapshot.list_products(), first)
+
+    def test_errors_are_not_cached(self):
+        """Test that a failed fetch is retried by the next popup"""
+        catalog = SlowCatalog(error=RuntimeError('catalog down'))
+        snapshot = SnapshotCatalog(catalog, ttl=30)
+        with self.assertRaises(RuntimeError):
+            snapshot.list_products()
+        catalog.error = None
+        self.assertEqual(snapshot.list_products(), ('products', 2))
+
+    def test_waiters_share_the_fetch_error(self):
+        """Test that popups waiting on a failed fetch get its error"""
+        catalog = SlowCatalog(delay=0.2, error=RuntimeError('catalog down'))
+        snapshot = SnapshotCatalog(catalog, ttl=30)
+        results = concurrently(snapshot.list_products, 8)
+        self.assertEqual(catalog.calls, 1)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    def test_waiter_times_out(self):
+        """Test that a popup waits no longer than its own deadline"""
+        catalog = SlowCatalog(delay=0.5)
+        snapshot = SnapshotCatalog(catalog, ttl=30)
+        leader = threading.Thread(target=snapshot.list_products)
+        leader.start()
+        time.sleep(0.05)
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            snapshot.list_products(remaining=0.05)
+        self.assertLess(time.monotonic() - started, 0.3)
+        leader.join()
+
+    def test_fetch_outlives_the_deadline_of_its_popup(self):
+        """Test that the fetch runs under the client's timeout, not the
+        deadline of the popup that started it"""
+        catalog = SlowCatalog(delay=0.2)
+        snapshot = SnapshotCatalog(catalog, ttl=30)
+        with self.assertRaises(TimeoutError):
+            snapshot.list_products(remaining=0.05)
+        self.assertEqual(snapshot.list_products(remaining=1), ('products', 1))
+        self.assertEqual(catalog.calls, 1)
+        self.assertEqual(catalog.remaining, [None])
+
+
+class TestSnapshotCatalogConcurrency(unittest.TestCase):
+    """Test coalescing against a local stand-in catalog"""
+
+    def serve(self, latency):
+        server, catalog, port = start_fake_catalog(synthetic_products(50), latency=latency)
+        self.addCleanup(server.stop, None)
+        return catalog, CatalogClient('localhost:%d' % port)
+
+    def test_burst_makes_one_catalog_call(self):
+        """Test that a burst of popups waits on a single ListProducts"""
+        catalog, client = self.serve(latency=0.2)
+        snapshot = SnapshotCatalog(client, ttl=30)
+        results = concurrently(snapshot.list_products, 32)
+        self.assertEqual(catalog.list_calls, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(len(results[0]), 50)
+        self.assertEqual(snapshot.stats()['coalesced'], 31)
+
+    def test_flood_makes_one_catalog_call_per_interval(self):
+        """Test a steady flood of popups across several refresh intervals"""
+        catalog, client = self.serve(latency=0.01)
+        snapshot = SnapshotCatalog(client, ttl=0.2)
+        stop = time.monotonic() + 1.0
+        calls = []
+
+        def flood():
+            while time.monotonic() < stop:
+                snapshot.list_products()
+                calls.append(1)
+                # a popup RPC waits on I/O; threads that never did would
+                # keep the background refresh from the GIL
+                time.sleep(0.001)
+
+        concurrently(flood, 8)
+        self.assertGreater(len(calls), 100)
+        # 1s / 0.2s intervals, plus the first fetch
+        self.assertLessEqual(catalog.list_calls, 6)
+        self.assertGreaterEqual(catalog.list_calls, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from category_matcher import CategoryMatcher, load_rules, matcher_from_env
+
+RULES = {
+    "headwear": ['hat', 'cap', 'beanie', 'glasses', 'sunglasses'],
+    "tops": ['shirt', 'tank', 'top', 'tee', 'watch'],
+    "shoes": ['shoes', 'boots', 'loafers', 'sandals'],
+}
+
+
+class TestCategoryMatcher(unittest.TestCase):
+    """Test keyword matching of product names"""
+
+    def setUp(self):
+        self.matcher = CategoryMatcher(RULES)
+
+    def test_catalog_products(self):
+        """Test the names in productcatalogservice's products.json"""
+        expected = {
+            'Sunglasses': 'headwear', 'Tank Top': 'tops', 'Watch': 'tops',
+            'Loafers': 'shoes', 'Hairdryer': None, 'Candle Holder': None,
+            'Salt & Pepper Shakers': None, 'Bamboo Glass Jar': None, 'Mug': None,
+        }
+        for name, category in expected.items():
+            self.assertEqual(self.matcher.category(name), category, name)
+
+    def test_whole_words_only(self):
+        """Test that keywords do not match inside other words"""
+        for name in ['Laptop', 'Stopwatch', 'Chat Mug', 'Capstone', 'Teepee', 'Whatnot']:
+            self.assertIsNone(self.matcher.category(name), name)
+
+    def test_case_and_plurals(self):
+        """Test that matching ignores case and allows a plural s"""
+        self.assertEqual(self.matcher.category('RED HATS'), 'headwear')
+        self.assertEqual(self.matcher.category('Two Tops'), 'tops')
+        self.assertEqual(self.matcher.category('Reading Glasses'), 'headwear')
+
+    def test_first_category_wins(self):
+        """Test that a name matching several categories gets the first one"""
+        self.assertEqual(self.matcher.category('Boots and Hat'), 'headwear')
+        self.assertEqual(self.matcher.category('T-Shirt Shoes'), 'tops')
+
+    def test_multi_word_and_special_keywords(self):
+        """Test keywords with spaces and regex characters"""
+        matcher = CategoryMatcher({"tops": ['tank top', 't-shirt'], "misc": ['c++']})
+        self.assertEqual(matcher.category('Blue Tank Top'), 'tops')
+        self.assertEqual(matcher.category('Tank'), None)
+        self.assertEqual(matcher.category('Plain T-Shirt'), 'tops')
+        self.assertEqual(matcher.category('c++ mug'), 'misc')
+
+    def test_buckets(self):
+        """Test that buckets keep every category and catalog order"""
+        products = [SimpleNamespace(id=str(n), name=name)
+                    for n, name in enumerate(['Cap', 'Laptop', 'Tee', 'Hat'])]
+        buckets = self.matcher.buckets(products)
+        self.assertEqual(list(buckets), ['headwear', 'tops', 'shoes'])
+        self.assertEqual(buckets['headwear'], (('0', 'Cap'), ('3', 'Hat')))
+        self.assertEqual(buckets['tops'], (('2', 'Tee'),))
+        self.assertEqual(buckets['shoes'], ())
+
+
+class TestCategoryRulesFile(unittest.TestCase):
+    """Test loading category rules from a config file"""
+
+    def write(self, rules):
+        f = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        self.addCleanup(os.unlink, f.name)
+        with f:
+            json.dump(rules, f)
+        return f.name
+
+    def test_rules_file_replaces_defaults(self):
+        """Test that CATEGORY_RULES_FILE replaces the built-in rules"""
+        path = self.write({"bags": ['tote', 'backpack'], "headwear": ['hat']})
+        with patch.dict(os.environ, {'CATEGORY_RULES_FILE': path}):
+            matcher = matcher_from_env(RULES)
+        self.assertEqual(matcher.categories, ('bags', 'headwear'))
+        self.assertEqual(matcher.category('Canvas Tote'), 'bags')
+        self.assertIsNone(matcher.category('Tank Top'))
+
+    def test_defaults_without_rules_file(self):
+        """Test that the built-in rules apply when no file is set"""
+        with patch.dict(os.environ, {}, clear=True):
+            matcher = matcher_from_env(RULES)
+        self.assertEqual(matcher.categories, tuple(RULES))
+
+    def test_invalid_rules(self):
+        """Test that malformed rules files are rejected"""
+        for rules in [[], {}, {"tops": []}, {"tops": 'shirt'}, {"tops": ['']}]:
+            with self.assertRaises(ValueError):
+                load_rules(self.write(rules))
+
+
+class TestCategoryMatcherThroughput(unittest.TestCase):
+    """Test that matching stays fast on a large catalog"""
+
+    def test_throughput(self):
+        """Test that 100k product names are categorized well within a second"""
+        words = ['Blue', 'Laptop', 'Hat', 'Jar', 'Vintage', 'Loafers', 'Candle', 'Top']
+        products = [SimpleNamespace(id=str(n), name=f"{words[n % 8]} {words[n * 7 % 8]} {n}")
+                    for n in range(100000)]
+        matcher = CategoryMatcher(RULES)
+        started = time.perf_counter()
+        buckets = matcher.buckets(products)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(sum(len(items) for items in buckets.values()), 75000)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
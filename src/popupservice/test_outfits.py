@@ -0,0 +1,81 @@
+import json
+import random
+import unittest
+
+import popup_pb2
+from outfits import FALLBACK_ITEMS_REPLY, FALLBACK_OUTFIT, FALLBACK_REPLY, Outfits, render_item
+
+
+def proto_reply(items, message=True):
+    """A reply built from dicts with json.dumps and PopupReply"""
+    reply = popup_pb2.PopupReply(items=[popup_pb2.OutfitItem(**item) for item in items])
+    if message:
+        reply.message = json.dumps({"items": items})
+    return reply.SerializeToString()
+
+
+BUCKETS = {
+    "headwear": (("OLJCESPC7Z", "Sunglasses"), ("H2", "Café Hat")),
+    "tops": (("66VCHSJNUP", "Tank Top"),),
+    "shoes": (("L9ECAV7KIM", "Loafers"), ("S2", 'Quoted "Boots"'), ("S3", "Sandals")),
+}
+
+
+class TestOutfits(unittest.TestCase):
+    """Test that pre-rendered replies match the ones built per request"""
+
+    def test_replies_match_json_dumps(self):
+        """Test every outfit against json.dumps and PopupReply"""
+        outfits = Outfits(BUCKETS)
+        for h in range(2):
+            for s in range(3):
+                items = [{"id": i, "name": n, "slug": n.lower().replace(" ", "-")}
+                         for i, n in (BUCKETS["headwear"][h], BUCKETS["tops"][0], BUCKETS["shoes"][s])]
+                self.assertEqual(outfits.reply((h, 0, s)), proto_reply(items))
+                self.assertEqual(outfits.reply((h, 0, s), message=False),
+                                 proto_reply(items, message=False))
+
+    def test_fallback_reply(self):
+        """Test the pre-rendered fallback reply"""
+        self.assertEqual(FALLBACK_REPLY, proto_reply(list(FALLBACK_OUTFIT)))
+        self.assertEqual(FALLBACK_ITEMS_REPLY, proto_reply(list(FALLBACK_OUTFIT), message=False))
+
+    def test_long_message_varint(self):
+        """Test a message longer than 127 bytes, which needs a 2-byte length"""
+        outfits = Outfits({"tops": (("X", "Shirt " * 50),)})
+        reply = popup_pb2.PopupReply.FromString(outfits.reply((0,)))
+        self.assertEqual(json.loads(reply.message)["items"][0]["name"], "Shirt " * 50)
+        self.assertEqual(reply.items[0].name, "Shirt " * 50)
+
+    def test_replies_are_cached_up_to_a_limit(self):
+        """Test that only max_cached outfits are kept"""
+        outfits = Outfits(BUCKETS, max_cached=2)
+        first = outfits.reply((0, 0, 0))
+        self.assertIs(outfits.reply((0, 0, 0)), first)
+        outfits.reply((0, 0, 1))
+        outfits.reply((0, 0, 2))
+        self.assertEqual(len(outfits._replies), 2)
+        self.assertEqual(outfits.reply((0, 0, 2)), outfits.reply((0, 0, 2)))
+
+    def test_incomplete_buckets(self):
+        """Test that empty categories are skipped and flagged"""
+        outfits = Outfits({"headwear": (), "tops": (("T", "Tee"),)})
+        self.assertFalse(outfits.complete)
+        self.assertEqual(outfits.pick(), (0,))
+        self.assertTrue(Outfits(BUCKETS).complete)
+
+    def test_pick(self):
+        """Test that picks stay within every category"""
+        outfits = Outfits(BUCKETS)
+        rng = random.Random(1)
+        picks = {outfits.pick(rng) for _ in range(200)}
+        self.assertEqual(len(picks), 6)
+
+    def test_render_item(self):
+        """Test the JSON of one item"""
+        self.assertEqual(json.loads(render_item("X", "Tank Top")),
+                         {"id": "X", "name": "Tank Top", "slug": "tank-top"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,14 @@
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 import json
+from types import SimpleNamespace
 import sys
 import os
+import time
+
+# popup_main is imported against mocks; the real modules are put back
+# afterwards so that other test modules get them
+_real_modules = dict(sys.modules)
 
 mock_grpc = MagicMock()
 mock_grpc.insecure_channel = MagicMock(return_value=MagicMock())
@@ -29,6 +35,7 @@ sys.modules['opentelemetry.trace'] = MagicMock()
 sys.modules['opentelemetry.sdk'] = MagicMock()
 sys.modules['opentelemetry.sdk.trace'] = MagicMock()
 sys.modules['opentelemetry.sdk.trace.export'] = MagicMock()
+sys.modules['opentelemetry.sdk.trace.sampling'] = MagicMock()
 sys.modules['opentelemetry.exporter'] = MagicMock()
 sys.modules['opentelemetry.exporter.otlp'] = MagicMock()
 sys.modules['opentelemetry.exporter.otlp.proto'] = MagicMock()
@@ -40,89 +47,216 @@ sys.modules['opentelemetry.sdk.resources'] = MagicMock()
 
 import popup_main
 
+for _name in list(sys.modules):
+    if _name not in _real_modules and _name != 'popup_main':
+        del sys.modules[_name]
+sys.modules.update(_real_modules)
 
-class TestPopupServiceFunctions(unittest.TestCase):
-    """Test standalone functions without needing to instantiate the service"""
+import popup_pb2
+from outfits import FALLBACK_OUTFIT
 
-    def test_get_fallback_outfit(self):
-        """Test that fallback outfit returns expected items"""
-        service = object.__new__(popup_main.PopupServiceServicer)
-        result = service._get_fallback_outfit()
-        
-        self.assertEqual(len(result), 3)
-        self.assertEqual(result[0]['id'], 'OLJCESPC7Z')
-        self.assertEqual(result[0]['name'], 'Sunglasses')
-        self.assertEqual(result[0]['slug'], 'sunglasses')
-        self.assertEqual(result[1]['id'], '2ZYFJ3GM2N')
-        self.assertEqual(result[1]['name'], 'Tank Top')
-        self.assertEqual(result[2]['id'], '66VCHSJNUP')
-
-    def test_select_random_items_with_empty_dict(self):
-        """Test select_random_items with empty categories"""
-        service = object.__new__(popup_main.PopupServiceServicer)
-        categories = {}
-        result = service.select_random_items(categories, max_items=3)
-        
-        self.assertEqual(len(result), 0)
-        self.assertIsInstance(result, list)
-
-    def test_select_random_items_with_single_category(self):
-        """Test select_random_items with one category"""
-        service = object.__new__(popup_main.PopupServiceServicer)
-        categories = {
-            "headwear": [("ID1", "Hat"), ("ID2", "Cap")]
-        }
-        result = service.select_random_items(categories, max_items=3)
-        
-        # The function picks one item from headwear category
-        self.assertEqual(len(result), 1)
-        self.assertIn('id', result[0])
-        self.assertIn('name', result[0])
-        self.assertIn('slug', result[0])
-        # Should be either Hat or Cap
-        self.assertIn(result[0]['id'], ['ID1', 'ID2'])
-
-    def test_select_random_items_with_multiple_categories(self):
-        """Test select_random_items with multiple categories"""
-        service = object.__new__(popup_main.PopupServiceServicer)
-        categories = {
-            "headwear": [("ID1", "Hat"), ("ID2", "Cap")],
-            "tops": [("ID3", "Shirt"), ("ID4", "Jacket")],
-            "shoes": [("ID5", "Sneakers")]
-        }
-        result = service.select_random_items(categories, max_items=3)
-        
-        # The function picks one item from each of the 3 categories
-        self.assertEqual(len(result), 3)
-        
-        for item in result:
-            self.assertIsInstance(item, dict)
-            self.assertIn('id', item)
-            self.assertIn('name', item)
-            self.assertIn('slug', item)
-            self.assertNotIn(' ', item['slug'])
-
-    def test_select_random_items_with_empty_category(self):
-        """Test select_random_items when one category is empty"""
-        service = object.__new__(popup_main.PopupServiceServicer)
-        categories = {
-            "headwear": [("ID1", "Hat")],
-            "tops": [],  # Empty category
-            "shoes": [("ID5", "Sneakers")]
-        }
-        
-        result = service.select_random_items(categories, max_items=3)
-        
-        # Should only return items from non-empty categories (headwear and shoes)
-        self.assertEqual(len(result), 2)
-        item_ids = [item['id'] for item in result]
-        self.assertIn('ID1', item_ids)
-        self.assertIn('ID5', item_ids)
+
+def make_service(catalog=None, **env):
+    """Returns a servicer configured from `env` alone, answering from
+    `catalog` instead of a product catalog connection."""
+    with patch.object(popup_main, 'CatalogClient'), patch.dict(os.environ, env, clear=True):
+        service = popup_main.PopupServiceServicer()
+    if catalog is not None:
+        service.catalog = catalog
+    return service
+
+
+class TestPopupServiceServicer(unittest.TestCase):
+    """Test the servicer configuration"""
+
+    def test_configured_per_instance(self):
+        """Test that the matcher and session store come from the environment"""
+        service = make_service(POPUP_SESSION_CACHE_SIZE='5')
+        self.assertEqual(service.matcher.categories, tuple(popup_main.CATEGORY_KEYWORDS))
+        self.assertEqual(service.sessions.max_entries, 5)
+        self.assertIsInstance(service.catalog, popup_main.SnapshotCatalog)
+        other = make_service(POPUP_SESSION_CACHE_SIZE='0')
+        self.assertIsNot(other.sessions, service.sessions)
+        self.assertEqual(other.sessions.max_entries, 0)
+        self.assertNotIn('sessions', vars(popup_main.PopupServiceServicer))
+        self.assertNotIn('matcher', vars(popup_main.PopupServiceServicer))
+
+
+class TestCategoryBuckets(unittest.TestCase):
+    """Test that category buckets are computed once per product list"""
+
+    def products(self, *names):
+        return [SimpleNamespace(id=name.upper(), name=name) for name in names]
+
+    def test_buckets(self):
+        """Test that products land in the first matching category"""
+        service = make_service()
+        buckets = service.category_buckets(self.products('Blue Hat', 'Tank Top', 'Boots', 'Mug'))
+        self.assertEqual(buckets['headwear'], (('BLUE HAT', 'Blue Hat'),))
+        self.assertEqual(buckets['tops'], (('TANK TOP', 'Tank Top'),))
+        self.assertEqual(buckets['shoes'], (('BOOTS', 'Boots'),))
+        with self.assertRaises(TypeError):
+            buckets['tops'] = ()
+
+    def test_buckets_are_reused_for_the_same_products(self):
+        """Test that the same product list is not categorized again"""
+        service = make_service()
+        products = self.products('Hat', 'Shirt')
+        first = service.category_buckets(products)
+        with patch.object(service, 'categorize_products') as categorize:
+            self.assertIs(service.category_buckets(products), first)
+            categorize.assert_not_called()
+
+    def test_outfits_survive_unchanged_refreshes(self):
+        """Test that refreshes returning an unchanged catalog keep the
+        Outfits, and popups never compare product lists"""
+        comparisons = []
+
+        class Products(list):
+            def __eq__(self, other):
+                comparisons.append(1)
+                return list.__eq__(self, other)
+
+        names = ['Hat', 'Shirt', 'Boots']
+        client = Mock()
+        client.list_products.side_effect = lambda remaining=None: Products(self.products(*names))
+        clock = Mock(return_value=0.0)
+        service = make_service(popup_main.SnapshotCatalog(client, ttl=30, clock=clock))
+        with patch.object(service, 'categorize_products',
+                          wraps=service.categorize_products) as categorize:
+            first = service._current_outfits(None)
+            for refresh in range(1, 4):
+                clock.return_value = 31.0 * refresh
+                # served stale while the refresh runs in the background
+                service._current_outfits(None)
+                deadline = time.monotonic() + 2
+                while service.catalog.age() != 0:
+                    self.assertLess(time.monotonic(), deadline)
+                    time.sleep(0.005)
+                for _ in range(10):
+                    self.assertIs(service._current_outfits(None), first)
+        self.assertEqual(client.list_products.call_count, 4)
+        self.assertEqual(categorize.call_count, 1)
+        # one comparison per refresh, none per popup
+        self.assertEqual(len(comparisons), 3)
+
+    def test_buckets_follow_catalog_changes(self):
+        """Test that a changed product list is categorized again"""
+        service = make_service()
+        service.category_buckets(self.products('Hat', 'Shirt'))
+        buckets = service.category_buckets(self.products('Hat', 'Boots'))
+        self.assertEqual(buckets['tops'], ())
+        self.assertEqual(len(buckets['shoes']), 1)
+
+
+class TestCircuitOpen(unittest.TestCase):
+    """Test serving while the product catalog circuit breaker is open"""
+
+    def make_service(self):
+        catalog = Mock()
+        catalog.list_products.side_effect = popup_main.CircuitOpenError("open")
+        return make_service(catalog)
+
+    def items(self, service):
+        request = popup_pb2.PopupRequest(session_id='s1', items_only=True)
+        reply = popup_pb2.PopupReply.FromString(service.GetPopupMessage(request, None))
+        return [item.id for item in reply.items]
+
+    def test_open_circuit_without_products_uses_fallback(self):
+        """Test that the static fallback is served before any catalog reply"""
+        service = self.make_service()
+        self.assertEqual(self.items(service), [item['id'] for item in FALLBACK_OUTFIT])
+
+    def test_open_circuit_uses_last_products(self):
+        """Test that the last catalog reply is served while the circuit is open"""
+        service = self.make_service()
+        product = lambda pid, name: SimpleNamespace(id=pid, name=name)
+        service.last_products = [product('H', 'Blue Hat'), product('T', 'Red Shirt'),
+                                 product('S', 'Running Shoes')]
+        self.assertEqual(self.items(service), ['H', 'T', 'S'])
+
+
+class TestGetPopupMessage(unittest.TestCase):
+    """Test the pre-rendered popup replies"""
+
+    def make_service(self, products=None, error=None):
+        catalog = Mock()
+        catalog.list_products.return_value = products
+        catalog.list_products.side_effect = error
+        return make_service(catalog)
+
+    def message(self, reply):
+        reply = popup_pb2.PopupReply.FromString(reply)
+        # the JSON message and the typed items hold the same outfit
+        data = json.loads(reply.message)
+        self.assertEqual([{'id': i.id, 'name': i.name, 'slug': i.slug} for i in reply.items],
+                         data['items'])
+        return data
+
+    def test_reply_from_catalog(self):
+        """Test that the reply holds one product of every category"""
+        products = [SimpleNamespace(id='H', name='Hat'), SimpleNamespace(id='T', name='Tank Top'),
+                    SimpleNamespace(id='S', name='Boots')]
+        service = self.make_service(products)
+        reply = service.GetPopupMessage(popup_pb2.PopupRequest(session_id='s1'), None)
+        self.assertEqual(self.message(reply)['items'], [
+            {'id': 'H', 'name': 'Hat', 'slug': 'hat'},
+            {'id': 'T', 'name': 'Tank Top', 'slug': 'tank-top'},
+            {'id': 'S', 'name': 'Boots', 'slug': 'boots'}])
+
+    def test_fallback_reply(self):
+        """Test that catalog errors get the fallback outfit"""
+        service = self.make_service(error=RuntimeError('catalog down'))
+        reply = service.GetPopupMessage(popup_pb2.PopupRequest(session_id='s1'), None)
+        self.assertEqual(self.message(reply)['items'], list(FALLBACK_OUTFIT))
+
+    def test_items_only(self):
+        """Test that clients reading items can leave the JSON message out"""
+        products = [SimpleNamespace(id='H', name='Hat'), SimpleNamespace(id='T', name='Tank Top'),
+                    SimpleNamespace(id='S', name='Boots')]
+        service = self.make_service(products)
+        request = popup_pb2.PopupRequest(session_id='s1', items_only=True)
+        reply = popup_pb2.PopupReply.FromString(service.GetPopupMessage(request, None))
+        self.assertEqual(reply.message, '')
+        self.assertEqual([item.id for item in reply.items], ['H', 'T', 'S'])
+        service = self.make_service(error=RuntimeError('catalog down'))
+        reply = popup_pb2.PopupReply.FromString(service.GetPopupMessage(request, None))
+        self.assertEqual(reply.message, '')
+        self.assertEqual([item.id for item in reply.items],
+                         [item['id'] for item in FALLBACK_OUTFIT])
+
+    def test_session_sees_the_same_outfit(self):
+        """Test that repeat popups of a session get the reply it was first served"""
+        products = [SimpleNamespace(id=f'H{i}', name='Hat') for i in range(50)] + [
+            SimpleNamespace(id='T', name='Tank Top'), SimpleNamespace(id='S', name='Boots')]
+        service = self.make_service(products)
+        first = service.GetPopupMessage(popup_pb2.PopupRequest(session_id='s1'), None)
+        for _ in range(20):
+            self.assertIs(service.GetPopupMessage(popup_pb2.PopupRequest(session_id='s1'), None), first)
+        self.assertEqual(service.sessions.hits, 20)
+
+    def test_anonymous_and_fallback_replies_are_not_stored(self):
+        """Test that only catalog replies of identified sessions are stored"""
+        products = [SimpleNamespace(id='H', name='Hat'), SimpleNamespace(id='T', name='Tank Top'),
+                    SimpleNamespace(id='S', name='Boots')]
+        service = self.make_service(products)
+        service.GetPopupMessage(popup_pb2.PopupRequest(session_id=''), None)
+        self.assertEqual(len(service.sessions), 0)
+        service = self.make_service(error=RuntimeError('catalog down'))
+        service.GetPopupMessage(popup_pb2.PopupRequest(session_id='s1'), None)
+        self.assertEqual(len(service.sessions), 0)
 
 
 class TestInitTracing(unittest.TestCase):
     """Test cases for init_tracing function"""
 
+    def setUp(self):
+        # init_tracing replaces these module globals
+        tracer, enabled = popup_main.tracer, popup_main.tracing_enabled
+        def restore():
+            popup_main.tracer, popup_main.tracing_enabled = tracer, enabled
+        self.addCleanup(restore)
+
     @patch.dict(os.environ, {'ENABLE_TRACING': '0'})
     @patch('popup_main.logger')
     def test_init_tracing_disabled(self, mock_logger):
@@ -144,6 +278,42 @@ class TestInitTracing(unittest.TestCase):
         mock_exporter.assert_called_once()
         mock_processor.assert_called_once()
 
+    def test_spans_skipped_while_tracing_is_off(self):
+        """Test that no span is started before tracing is enabled"""
+        with patch.object(popup_main, 'tracer') as tracer:
+            with popup_main.span('get_popup_message') as current:
+                current.set_attribute('session.id', 's1')
+        tracer.start_as_current_span.assert_not_called()
+
+    @patch.dict(os.environ, {'ENABLE_TRACING': '1', 'TRACE_SAMPLE_RATIO': '0.1'})
+    @patch('popup_main.trace')
+    @patch('popup_main.TracerProvider')
+    @patch('popup_main.ParentBased')
+    @patch('popup_main.TraceIdRatioBased')
+    @patch('popup_main.OTLPSpanExporter')
+    @patch('popup_main.BatchSpanProcessor')
+    @patch('popup_main.Resource')
+    def test_init_tracing_samples_by_ratio(self, mock_resource, mock_processor, mock_exporter,
+                                           mock_ratio, mock_parent, mock_provider, mock_trace):
+        """Test that spans are started, at the configured sampling ratio, once tracing is on"""
+        popup_main.init_tracing()
+        mock_ratio.assert_called_once_with(0.1)
+        mock_parent.assert_called_once_with(mock_ratio.return_value)
+        self.assertIs(mock_provider.call_args.kwargs['sampler'], mock_parent.return_value)
+        popup_main.span('get_popup_message')
+        mock_trace.get_tracer.return_value.start_as_current_span.assert_called_once_with(
+            'get_popup_message')
+
+    def test_trace_sample_ratio(self):
+        """Test TRACE_SAMPLE_RATIO parsing"""
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(popup_main.trace_sample_ratio(), 1.0)
+        with patch.dict(os.environ, {'TRACE_SAMPLE_RATIO': '0.25'}):
+            self.assertEqual(popup_main.trace_sample_ratio(), 0.25)
+        with patch.dict(os.environ, {'TRACE_SAMPLE_RATIO': '2'}):
+            with self.assertRaises(ValueError):
+                popup_main.trace_sample_ratio()
+
 
 class TestCategoryKeywords(unittest.TestCase):
     """Test category keywords constant"""
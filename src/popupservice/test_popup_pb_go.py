@@ -0,0 +1,64 @@
+import os
+import re
+import unittest
+
+from google.protobuf import descriptor_pb2
+
+import popup_pb2
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# the Go popup client, generated from popup.proto by ../frontend/genproto.sh
+GO_FILES = [
+    os.path.join(HERE, 'popup.pb.go'),
+    os.path.join(HERE, 'github.com', 'your', 'module', 'src', 'popupservice', 'popup.pb.go'),
+    os.path.join(HERE, '..', 'frontend', 'popupservice', 'popup.pb.go'),
+]
+
+_ESCAPES = {'a': 7, 'b': 8, 'f': 12, 'n': 10, 'r': 13, 't': 9, 'v': 11, '\\': 92, '"': 34}
+
+
+def go_raw_descriptor(path):
+    """Returns the bytes of file_popup_proto_rawDesc in the Go file at `path`"""
+    with open(path) as f:
+        source = f.read()
+    literal = re.search(r'const file_popup_proto_rawDesc = ((?:\s*"(?:[^"\\]|\\.)*"\s*\+?)+)', source)
+    data = bytearray()
+    for chunk in re.findall(r'"((?:[^"\\]|\\.)*)"', literal.group(1)):
+        i = 0
+        while i < len(chunk):
+            if chunk[i] != '\\':
+                data += chunk[i].encode()
+                i += 1
+            elif chunk[i + 1] == 'x':
+                data.append(int(chunk[i + 2:i + 4], 16))
+                i += 4
+            else:
+                data.append(_ESCAPES[chunk[i + 1]])
+                i += 2
+    return bytes(data)
+
+
+class TestGoPopupClient(unittest.TestCase):
+    """Test that the Go popup client matches popup.proto and popup_pb2"""
+
+    def test_go_descriptor_matches_python(self):
+        """Test that every copy of popup.pb.go embeds the descriptor of popup.proto"""
+        expected = descriptor_pb2.FileDescriptorProto()
+        popup_pb2.DESCRIPTOR.CopyToProto(expected)
+        found = [path for path in GO_FILES if os.path.exists(path)]
+        self.assertTrue(found)
+        for path in found:
+            with self.subTest(path=path):
+                go = descriptor_pb2.FileDescriptorProto.FromString(go_raw_descriptor(path))
+                # protoc-gen-go also records json names and empty method options
+                for message in go.message_type:
+                    for field in message.field:
+                        field.ClearField('json_name')
+                for service in go.service:
+                    for method in service.method:
+                        method.ClearField('options')
+                self.assertEqual(go, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
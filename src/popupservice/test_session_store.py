@@ -0,0 +1,126 @@
+import threading
+import unittest
+
+from session_store import ENTRY_OVERHEAD, SessionStore, _entry_size
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionStore(unittest.TestCase):
+    """Test the per-session reply store"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.version = object()
+
+    def make_store(self, **kwargs):
+        kwargs.setdefault('clock', self.clock)
+        return SessionStore(**kwargs)
+
+    def test_hit_after_put(self):
+        """Test that a stored value is returned for its session"""
+        store = self.make_store()
+        self.assertIsNone(store.get('s1', self.version))
+        store.put('s1', self.version, b'reply')
+        self.assertEqual(store.get('s1', self.version), b'reply')
+        self.assertIsNone(store.get('s2', self.version))
+        self.assertEqual((store.hits, store.misses), (1, 2))
+
+    def test_entries_expire(self):
+        """Test that a value is dropped once its TTL has passed"""
+        store = self.make_store(ttl=10)
+        store.put('s1', self.version, b'reply')
+        self.clock.now = 10
+        self.assertEqual(store.get('s1', self.version), b'reply')
+        self.clock.now = 10.5
+        self.assertIsNone(store.get('s1', self.version))
+        self.assertEqual((len(store), store.bytes, store.expirations), (0, 0, 1))
+
+    def test_put_drops_expired_entries(self):
+        """Test that idle expired sessions are dropped by later puts"""
+        store = self.make_store(ttl=10)
+        store.put('old', self.version, b'reply')
+        self.clock.now = 11
+        store.put('new', self.version, b'reply')
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.expirations, 1)
+
+    def test_other_version_misses(self):
+        """Test that a value is not served for another catalog snapshot"""
+        store = self.make_store()
+        store.put('s1', self.version, b'reply')
+        self.assertIsNone(store.get('s1', object()))
+        self.assertEqual(len(store), 0)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the store holds at most max_entries sessions"""
+        store = self.make_store(max_entries=2)
+        store.put('a', self.version, b'a')
+        store.put('b', self.version, b'b')
+        store.get('a', self.version)
+        store.put('c', self.version, b'c')
+        self.assertEqual(len(store), 2)
+        self.assertIsNone(store.get('b', self.version))
+        self.assertEqual(store.get('a', self.version), b'a')
+        self.assertEqual(store.evictions, 1)
+
+    def test_disabled(self):
+        """Test that a store of size 0 remembers nothing"""
+        store = self.make_store(max_entries=0)
+        store.put('s1', self.version, b'reply')
+        self.assertIsNone(store.get('s1', self.version))
+        self.assertEqual(len(store), 0)
+
+    def test_bytes_follow_entries(self):
+        """Test that the memory estimate grows and shrinks with the entries"""
+        store = self.make_store(max_entries=1)
+        store.put('s1', self.version, b'x' * 1000)
+        self.assertGreater(store.bytes, 1000 + ENTRY_OVERHEAD)
+        single = store.bytes
+        store.put('s1', self.version, b'x' * 1000)
+        self.assertEqual(store.bytes, single)
+        store.put('s2', self.version, b'')
+        self.assertLess(store.bytes, single)
+
+    def test_shards_split_the_bound(self):
+        """Test that sessions are spread over shards within the bound"""
+        store = self.make_store(max_entries=400, shards=4)
+        for i in range(1000):
+            store.put(f"session-{i}", self.version, b'reply')
+        self.assertLessEqual(len(store), 400)
+        self.assertEqual(store.stats()['shards'], 4)
+        for shard in store._shards:
+            self.assertEqual(len(shard.entries), 100)
+
+    def test_concurrent_puts(self):
+        """Test that concurrent sessions keep the entries and bytes consistent"""
+        store = self.make_store(max_entries=500, shards=4)
+        start = threading.Barrier(8)
+
+        def run(n):
+            start.wait()
+            for i in range(2000):
+                key = f"s{(n * 2000 + i) % 700}"
+                if store.get(key, self.version) is None:
+                    store.put(key, self.version, b'reply')
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(len(store), 500)
+        self.assertEqual(store.hits + store.misses, 8 * 2000)
+        self.assertEqual(store.bytes, sum(
+            _entry_size(key, entry[2]) for shard in store._shards
+            for key, entry in shard.entries.items()))
+
+
+if __name__ == '__main__':
+    unittest.main()
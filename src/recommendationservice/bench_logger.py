@@ -0,0 +1,96 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Formats the same records with logger.JsonFormatter and with the
+# formatters it replaced, and reports records per second and how many
+# outputs are not valid JSON.
+#
+# The python-json-logger based formatter needs that package, which the
+# services no longer depend on: pip install python-json-logger
+#
+#   python bench_logger.py [--records 100000]
+
+import argparse
+import json
+import logging
+import time
+
+from logger import JsonFormatter
+
+def legacy_formatters():
+  formatters = {
+    # popupservice's logging.basicConfig format
+    'popup format string': logging.Formatter(
+      '{"timestamp": "%(asctime)s", "severity": "%(levelname)s", "message": "%(message)s", "service": "popupservice"}'),
+  }
+  try:
+    from pythonjsonlogger import jsonlogger
+  except ImportError:
+    print("python-json-logger is not installed, skipping its formatter")
+    return formatters
+
+  # the formatter of the previous emailservice and recommendationservice logger.py
+  class CustomJsonFormatter(jsonlogger.JsonFormatter):
+    def add_fields(self, log_record, record, message_dict):
+      super(CustomJsonFormatter, self).add_fields(log_record, record, message_dict)
+      if not log_record.get('timestamp'):
+        log_record['timestamp'] = record.created
+      if log_record.get('severity'):
+        log_record['severity'] = log_record['severity'].upper()
+      else:
+        log_record['severity'] = record.levelname
+  formatters['python-json-logger'] = CustomJsonFormatter('%(timestamp)s %(severity)s %(name)s %(message)s')
+  return formatters
+
+def make_records(n):
+  messages = [
+    ("[Recv ListRecommendations] product_ids=%s", (['OLJCESPC7Z', '66VCHSJNUP', '1YMWWN1N4O', 'L9ECAV7KIM', '2ZYFJ3GM2N'],)),
+    ("A request to send order confirmation email to %s has been received.", ('someone@example.com',)),
+    ('Popup message requested for session: %s', ('a "quoted"\nsession',)),
+  ]
+  records = []
+  for i in range(n):
+    msg, args = messages[i % len(messages)]
+    record = logging.LogRecord('recommendationservice-requests', logging.INFO, __file__, 1, msg, args, None)
+    if i % 2:
+      record.trace_id = '0af7651916cd43dd8448eb211c80319c'
+      record.span_id = 'b7ad6b7169203331'
+    records.append(record)
+  return records
+
+def run(formatter, records):
+  started = time.perf_counter()
+  outputs = [formatter.format(record) for record in records]
+  elapsed = time.perf_counter() - started
+  invalid = 0
+  for out in outputs:
+    try:
+      json.loads(out)
+    except ValueError:
+      invalid += 1
+  return len(records) / elapsed, invalid
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--records', type=int, default=100000)
+  args = parser.parse_args()
+
+  records = make_records(args.records)
+  formatters = legacy_formatters()
+  formatters['logger.JsonFormatter'] = JsonFormatter()
+  for name, formatter in formatters.items():
+    rate, invalid = run(formatter, records)
+    print("{:>22}: {:9.0f} records/s  invalid JSON {}/{}".format(name, rate, invalid, len(records)))
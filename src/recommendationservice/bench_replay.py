@@ -0,0 +1,126 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Replays a recorded request log against RecommendationService in-process
+# and reports throughput and latency percentiles.
+#
+# Record a log by running the server with RECOMMENDATION_REQUEST_LOG set,
+# or write a synthetic one with --generate. With --seed the servicer's
+# generators are seeded, so two runs with the same log, seed and thread
+# count return the same recommendations.
+#
+#   python bench_replay.py --generate 20000 requests.jsonl
+#   python bench_replay.py requests.jsonl [--threads 10] [--seed 1] [--no-cache]
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+
+import demo_pb2
+from catalog_cache import CatalogCache
+from fake_catalog import synthetic_products
+from random_source import RandomSource, SEED_METADATA_KEY
+from recommendation_server import RecommendationService
+from request_log import read_request_log
+from result_cache import ResultCache
+
+class ReplayContext(object):
+  """The part of grpc.ServicerContext the servicer reads."""
+  def __init__(self, seed):
+    self._metadata = ((SEED_METADATA_KEY, seed),) if seed is not None else ()
+
+  def invocation_metadata(self):
+    return self._metadata
+
+  def time_remaining(self):
+    return None
+
+def load_products(path, num_products):
+  if path is None:
+    return synthetic_products(num_products)
+  # productcatalogservice's products.json format
+  with open(path) as f:
+    return [demo_pb2.Product(id=p['id'], name=p['name'], categories=p.get('categories', []))
+            for p in json.load(f)['products']]
+
+def generate(path, num_requests, products, num_users=500, seed=0):
+  rng = random.Random(seed)
+  with open(path, 'w') as f:
+    for _ in range(num_requests):
+      cart = rng.sample(products, min(len(products), rng.randint(0, 4)))
+      f.write(json.dumps({'user_id': 'user-%d' % rng.randrange(num_users),
+                          'product_ids': [p.id for p in cart]}) + '\n')
+
+def percentile(sorted_values, p):
+  return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+def replay(service, entries, num_threads):
+  latencies = [[] for _ in range(num_threads)]
+  def worker(n):
+    out = latencies[n]
+    for request, seed in entries[n::num_threads]:
+      context = ReplayContext(seed)
+      started = time.perf_counter()
+      service.ListRecommendations(request, context)
+      out.append(time.perf_counter() - started)
+  threads = [threading.Thread(target=worker, args=(n,)) for n in range(num_threads)]
+  started = time.perf_counter()
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  elapsed = time.perf_counter() - started
+  return sorted(l for per_thread in latencies for l in per_thread), elapsed
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument('log')
+  parser.add_argument('--generate', type=int, metavar='N',
+                      help='write N synthetic requests to LOG and exit')
+  parser.add_argument('--catalog', help='products.json to use as the catalog')
+  parser.add_argument('--products', type=int, default=1000,
+                      help='size of the synthetic catalog when --catalog is not set')
+  parser.add_argument('--threads', type=int, default=10)
+  parser.add_argument('--seed')
+  parser.add_argument('--no-cache', action='store_true')
+  parser.add_argument('--repeat', type=int, default=1)
+  args = parser.parse_args()
+
+  products = load_products(args.catalog, args.products)
+  if args.generate:
+    generate(args.log, args.generate, products)
+    print("wrote {} requests to {}".format(args.generate, args.log))
+    raise SystemExit(0)
+
+  # keep per-request log lines out of the measurement
+  logging.getLogger('recommendationservice-requests').setLevel(logging.WARNING)
+  catalog = CatalogCache(lambda timeout: products, ttl=float('inf'))
+  catalog.refresh()
+  service = RecommendationService(
+    catalog,
+    results=ResultCache(max_entries=0 if args.no_cache else 10000),
+    random_source=RandomSource(args.seed))
+  entries = list(read_request_log(args.log)) * args.repeat
+
+  latencies, elapsed = replay(service, entries, args.threads)
+  print("{} requests, {} threads, cache {}: {:.0f} req/s".format(
+    len(latencies), args.threads, 'off' if args.no_cache else 'on', len(latencies) / elapsed))
+  print("latency p50 {:.1f} us  p90 {:.1f} us  p99 {:.1f} us  max {:.1f} us".format(
+    percentile(latencies, 0.50) * 1e6, percentile(latencies, 0.90) * 1e6,
+    percentile(latencies, 0.99) * 1e6, latencies[-1] * 1e6))
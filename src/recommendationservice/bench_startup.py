@@ -0,0 +1,120 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Measures cold start of recommendation_server.py from the outside.
+#
+# Starts a local stand-in product catalog, then `runs` times launches the
+# server, polls its health check until SERVING and sends one
+# ListRecommendations. Reports the median time from process spawn to
+# SERVING and to the first response, next to the server's own
+# "startup timing" log line (module import, first SERVING health check,
+# first request, measured from the start of the module import).
+#
+#   python bench_startup.py [--runs 5] [--mode sync] [--env ENABLE_TRACING=1]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import grpc
+
+import demo_pb2
+import demo_pb2_grpc
+from fake_catalog import start_fake_catalog, synthetic_products
+from grpc_health.v1 import health_pb2
+from grpc_health.v1 import health_pb2_grpc
+from loadtest_server_modes import free_port
+
+def read_report(stream, found):
+  for line in stream:
+    try:
+      message = json.loads(line).get('message', '')
+    except ValueError:
+      continue
+    if message.startswith('startup timing: '):
+      found.update(item.split('=') for item in message[len('startup timing: '):].split())
+
+def run_once(env, timeout=30):
+  port = free_port()
+  target = 'localhost:%d' % port
+  spawned = time.monotonic()
+  server = subprocess.Popen([sys.executable, 'recommendation_server.py'],
+                            env=dict(env, PORT=str(port)),
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+  report = {}
+  reader = threading.Thread(target=read_report, args=(server.stdout, report))
+  reader.start()
+  try:
+    # poll without the default ~1s reconnect backoff, which would hide the
+    # actual startup time
+    with grpc.insecure_channel(target, options=[('grpc.initial_reconnect_backoff_ms', 10),
+                                                ('grpc.min_reconnect_backoff_ms', 10),
+                                                ('grpc.max_reconnect_backoff_ms', 10)]) as channel:
+      health = health_pb2_grpc.HealthStub(channel)
+      deadline = spawned + timeout
+      while True:
+        try:
+          if health.Check(health_pb2.HealthCheckRequest(), timeout=1).status == \
+              health_pb2.HealthCheckResponse.SERVING:
+            break
+        except grpc.RpcError:
+          if time.monotonic() > deadline:
+            raise RuntimeError('server at {} did not become ready'.format(target))
+          time.sleep(0.01)
+      serving = time.monotonic() - spawned
+      demo_pb2_grpc.RecommendationServiceStub(channel).ListRecommendations(
+        demo_pb2.ListRecommendationsRequest(user_id='startup', product_ids=['0']))
+      first_response = time.monotonic() - spawned
+  finally:
+    server.terminate()
+    server.wait()
+    reader.join()
+  return serving, first_response, report
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--runs', type=int, default=5)
+  parser.add_argument('--mode', default='sync')
+  parser.add_argument('--env', action='append', default=[],
+                      help='extra NAME=VALUE for the server, e.g. ENABLE_TRACING=1')
+  args = parser.parse_args()
+
+  catalog_server, _, catalog_port = start_fake_catalog(synthetic_products(1000))
+  env = dict(os.environ,
+             GRPC_SERVER_MODE=args.mode,
+             PRODUCT_CATALOG_SERVICE_ADDR='localhost:%d' % catalog_port,
+             DISABLE_PROFILER='1')
+  env.pop('ENABLE_TRACING', None)
+  env.update(item.split('=', 1) for item in args.env)
+  try:
+    results = [run_once(env) for _ in range(args.runs)]
+  finally:
+    catalog_server.stop(0)
+
+  print("{} runs, mode {}, extra env {}".format(args.runs, args.mode, args.env or 'none'))
+  print("spawn to SERVING:        median {:7.1f} ms".format(
+    statistics.median(r[0] for r in results) * 1e3))
+  print("spawn to first response: median {:7.1f} ms".format(
+    statistics.median(r[1] for r in results) * 1e3))
+  for key in ('imports_ms', 'first_serving_health_ms', 'first_request_ms'):
+    values = [float(r[2][key]) for r in results if key in r[2]]
+    if values:
+      print("server {:24} median {:7.1f} ms".format(key + ':', statistics.median(values)))
@@ -0,0 +1,367 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import hashlib
+import threading
+import time
+
+from logger import getJSONLogger
+logger = getJSONLogger('recommendationservice-server')
+
+class CatalogSnapshot(object):
+  """An immutable view of the product catalog at one point in time.
+
+  `version` is a digest of the catalog contents, so two fetches of an
+  unchanged catalog produce the same version. The indexes below are built
+  once here so requests never have to walk the whole catalog:
+
+    product_ids     distinct product ids, in catalog order
+    positions       product id -> index into `product_ids`
+    categories      index -> frozenset of that product's categories
+    category_index  category -> tuple of indexes of products in it
+  """
+  __slots__ = ('version', 'products', 'product_ids', 'positions',
+               'categories', 'category_index')
+
+  def __init__(self, products):
+    self.products = tuple(products)
+    by_id = {}
+    for product in self.products:
+      by_id.setdefault(product.id, product)
+    self.product_ids = tuple(by_id)
+    self.positions = {pid: i for i, pid in enumerate(self.product_ids)}
+    self.categories = tuple(frozenset(by_id[pid].categories) for pid in self.product_ids)
+    category_index = {}
+    for i, categories in enumerate(self.categories):
+      for category in categories:
+        category_index.setdefault(category, []).append(i)
+    self.category_index = {c: tuple(members) for c, members in category_index.items()}
+    digest = hashlib.sha1()
+    for product in self.products:
+      digest.update(product.SerializeToString(deterministic=True))
+    self.version = digest.hexdigest()[:16]
+
+  def __len__(self):
+    return len(self.products)
+
+class _Load(object):
+  """The fetch of a first snapshot, which concurrent misses wait for."""
+  __slots__ = ('done', 'snapshot', 'error')
+
+  def __init__(self):
+    self.done = threading.Event()
+    self.snapshot = None
+    self.error = None
+
+class CatalogCache(object):
+  """Keeps the latest product catalog snapshot in process.
+
+  A background thread re-fetches the catalog shortly before the snapshot
+  is `ttl` seconds old, ahead by as long as the last fetch took. Readers
+  always get the snapshot currently held (stale-while-revalidate): an
+  expired snapshot is still served while a refresh runs, and a failed
+  refresh keeps the last good snapshot. Only reads made while nothing has
+  been loaded yet block on the catalog, and they all wait for the same
+  fetch; one that runs out of time while waiting raises TimeoutError.
+
+  `fetch(timeout)` returns the products. `timeout` is the time left to the
+  reader that is waiting for the fetch, or None for background refreshes.
+  With the `breaker` that guards `fetch`, reads of an expired snapshot do
+  not start refreshes while the breaker is open; the periodic refresh
+  still runs and may become its probe.
+  """
+
+  def __init__(self, fetch, ttl=30.0, clock=time.monotonic, breaker=None):
+    self._fetch = fetch
+    self._ttl = ttl
+    self._clock = clock
+    self._breaker = breaker
+    self._snapshot = None
+    self._fetched_at = None
+    self._fetch_seconds = 0.0
+    self._lock = threading.Lock()
+    self._refreshing = False
+    self._loading = None
+    self._stop = threading.Event()
+    self._thread = None
+    self.hits = 0
+    self.stale_hits = 0
+    self.misses = 0
+    self.coalesced = 0
+    self.refreshes = 0
+    self.refresh_errors = 0
+
+  def get(self, timeout=None):
+    """Returns the current snapshot. `timeout` bounds the fetch when
+    nothing is loaded yet."""
+    snapshot = self._peek()
+    if snapshot is None:
+      return self._load(timeout)
+    return snapshot
+
+  def _load(self, timeout):
+    with self._lock:
+      # another reader may have loaded the catalog meanwhile
+      if self._snapshot is not None:
+        return self._snapshot
+      load = self._loading
+      leader = load is None
+      if leader:
+        load = self._loading = _Load()
+      else:
+        self.coalesced += 1
+    if not leader:
+      if not load.done.wait(timeout):
+        raise TimeoutError("timed out waiting for the product catalog")
+      if load.error is not None:
+        raise load.error
+      return load.snapshot
+    try:
+      load.snapshot = self.refresh(timeout)
+      return load.snapshot
+    except BaseException as err:
+      load.error = err
+      raise
+    finally:
+      with self._lock:
+        self._loading = None
+      load.done.set()
+
+  def refresh(self, timeout=None):
+    """Fetches the catalog now and installs it as the current snapshot.
+
+    Raises the fetch error only when there is no previous snapshot to fall
+    back to.
+    """
+    started = self._clock()
+    try:
+      products = self._fetch(timeout)
+    except Exception as err:
+      if not self._fetch_failed(err):
+        raise
+      return self._snapshot
+    self._fetch_seconds = self._clock() - started
+    return self.install(products)
+
+  def install(self, products):
+    snapshot = CatalogSnapshot(products)
+    with self._lock:
+      current = self._snapshot
+      changed = current is None or current.version != snapshot.version
+      if changed:
+        self._snapshot = snapshot
+      else:
+        # Unchanged catalog: keep the existing snapshot, only reset its age.
+        snapshot = current
+      self._fetched_at = self._clock()
+      self.refreshes += 1
+    if changed:
+      logger.info("catalog snapshot loaded: version={} products={}".format(
+        snapshot.version, len(snapshot)))
+    return snapshot
+
+  def _peek(self):
+    """Returns the current snapshot, or None when nothing is loaded yet,
+    and starts a background refresh if it has expired."""
+    with self._lock:
+      snapshot = self._snapshot
+      if snapshot is None:
+        self.misses += 1
+        return None
+      if self._clock() - self._fetched_at <= self._ttl:
+        self.hits += 1
+        return snapshot
+      self.stale_hits += 1
+    if self._breaker is not None and not self._breaker.ready():
+      return snapshot
+    if self._claim_refresh():
+      self._spawn_refresh()
+    return snapshot
+
+  def _fetch_failed(self, err):
+    """Records a failed fetch. Returns False if there is no snapshot to
+    fall back to."""
+    with self._lock:
+      self.refresh_errors += 1
+    if self._snapshot is None:
+      return False
+    logger.warning("catalog refresh failed, serving snapshot {} from {:.1f}s ago: {}".format(
+      self._snapshot.version, self.age(), err))
+    return True
+
+  def _claim_refresh(self):
+    """Returns True if no other refresh is in flight, and the caller must
+    call _refresh_done once its own finishes."""
+    with self._lock:
+      refreshing, self._refreshing = self._refreshing, True
+    return not refreshing
+
+  def _refresh_done(self):
+    with self._lock:
+      self._refreshing = False
+
+  def _spawn_refresh(self):
+    def run():
+      try:
+        self.refresh()
+      finally:
+        self._refresh_done()
+    threading.Thread(target=run, name='catalog-refresh', daemon=True).start()
+
+  def age(self):
+    if self._fetched_at is None:
+      return None
+    return self._clock() - self._fetched_at
+
+  def stats(self):
+    with self._lock:
+      snapshot = self._snapshot
+      stats = {
+        'hits': self.hits,
+        'stale_hits': self.stale_hits,
+        'misses': self.misses,
+        'coalesced': self.coalesced,
+        'refreshes': self.refreshes,
+        'refresh_errors': self.refresh_errors,
+      }
+    stats['age_seconds'] = self.age()
+    stats['version'] = snapshot.version if snapshot is not None else None
+    stats['products'] = len(snapshot) if snapshot is not None else 0
+    return stats
+
+  def start(self):
+    """Loads the catalog and keeps it fresh from a daemon thread."""
+    try:
+      self.refresh()
+    except Exception as err:
+      logger.warning("initial catalog load failed, will retry: {}".format(err))
+    self._thread = threading.Thread(target=self._run, name='catalog-refresh', daemon=True)
+    self._thread.start()
+
+  def stop(self):
+    self._stop.set()
+
+  def _next_refresh(self):
+    """Seconds until the periodic refresh should start so that it lands
+    before the snapshot expires, or a full `ttl` when the snapshot has
+    already expired because a refresh failed or a reader's is in flight."""
+    age = self.age()
+    if age is None or age >= self._ttl:
+      return self._ttl
+    margin = min(self._fetch_seconds, self._ttl / 2)
+    return max(0.0, self._ttl - age - margin)
+
+  def _run(self):
+    while not self._stop.wait(self._next_refresh()):
+      if not self._claim_refresh():
+        continue
+      try:
+        self.refresh()
+      except Exception as err:
+        logger.warning("catalog refresh failed: {}".format(err))
+      finally:
+        self._refresh_done()
+      logger.info("catalog cache stats: {}".format(self.stats()))
+
+class AsyncCatalogCache(CatalogCache):
+  """CatalogCache for grpc.aio servers.
+
+  `fetch` is a coroutine function, and `get`, `refresh` and `start` are
+  coroutines. Background refreshes run as tasks on the event loop instead
+  of threads.
+  """
+
+  def __init__(self, fetch, ttl=30.0, clock=time.monotonic, breaker=None):
+    super(AsyncCatalogCache, self).__init__(fetch, ttl, clock, breaker)
+    self._tasks = set()
+
+  async def get(self, timeout=None):
+    snapshot = self._peek()
+    if snapshot is None:
+      return await self._load(timeout)
+    return snapshot
+
+  async def _load(self, timeout):
+    if self._snapshot is not None:
+      return self._snapshot
+    load = self._loading
+    if load is None:
+      load = self._loading = asyncio.ensure_future(self.refresh(timeout))
+      load.add_done_callback(self._load_done)
+    else:
+      with self._lock:
+        self.coalesced += 1
+    # shielded, so that a reader that gives up does not cancel the fetch
+    # the others wait for
+    return await asyncio.wait_for(asyncio.shield(load), timeout)
+
+  def _load_done(self, load):
+    self._loading = None
+    if not load.cancelled():
+      # retrieved, so that a load every reader gave up on is not reported
+      # as an unhandled error
+      load.exception()
+
+  async def refresh(self, timeout=None):
+    started = self._clock()
+    try:
+      products = await self._fetch(timeout)
+    except Exception as err:
+      if not self._fetch_failed(err):
+        raise
+      return self._snapshot
+    self._fetch_seconds = self._clock() - started
+    return self.install(products)
+
+  def _spawn_refresh(self):
+    self._track(asyncio.ensure_future(self._refresh_once()))
+
+  async def _refresh_once(self):
+    try:
+      await self.refresh()
+    finally:
+      self._refresh_done()
+
+  def _track(self, task):
+    # The event loop only keeps weak references to tasks.
+    self._tasks.add(task)
+    task.add_done_callback(self._tasks.discard)
+
+  async def start(self):
+    """Loads the catalog and keeps it fresh from a task on the running loop."""
+    try:
+      await self.refresh()
+    except Exception as err:
+      logger.warning("initial catalog load failed, will retry: {}".format(err))
+    self._track(asyncio.ensure_future(self._run()))
+
+  def stop(self):
+    for task in list(self._tasks):
+      task.cancel()
+
+  async def _run(self):
+    while True:
+      await asyncio.sleep(self._next_refresh())
+      if not self._claim_refresh():
+        continue
+      try:
+        await self.refresh()
+      except Exception as err:
+        logger.warning("catalog refresh failed: {}".format(err))
+      finally:
+        self._refresh_done()
+      logger.info("catalog cache stats: {}".format(self.stats()))
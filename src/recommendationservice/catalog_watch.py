@@ -0,0 +1,177 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Keeps a local copy of the product catalog from its WatchProducts stream.
+#
+# This module is shared by popupservice and recommendationservice and
+# copied into each of them; keep the copies identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+#
+# Instead of re-pulling the whole catalog, the watcher applies the
+# added, updated and removed products the catalog streams to it. When
+# the stream is unavailable, e.g. because the catalog does not implement
+# WatchProducts, it polls ListProducts every CATALOG_POLL_SECONDS and
+# tries the stream again after each poll.
+#
+#   CATALOG_WATCH          1 to watch the catalog instead of polling it
+#                          (default off)
+#   CATALOG_POLL_SECONDS   poll interval while the stream is unavailable
+#                          (default 30)
+
+import os
+import threading
+
+import grpc
+
+import demo_pb2
+from circuit_breaker import CircuitOpenError
+
+def watch_enabled():
+  return os.environ.get('CATALOG_WATCH') == '1'
+
+class CatalogWatcher(object):
+  """Maintains the product list of the catalog that `client`, a
+  CatalogClient, talks to.
+
+  list_products() has the signature of CatalogClient.list_products, so a
+  watcher can stand in for its client. Once loaded, it returns the same
+  tuple until the catalog changes. `on_change(products)` is called
+  from the watcher thread after each change.
+  """
+
+  def __init__(self, client, logger=None, poll_interval=None, reconnect_delay=1.0):
+    self.client = client
+    self.poll_interval = (poll_interval if poll_interval is not None
+                          else float(os.environ.get('CATALOG_POLL_SECONDS', "30")))
+    self.reconnect_delay = reconnect_delay
+    self.version = None
+    self.mode = None
+    self.updates = 0
+    self.polls = 0
+    self.stream_errors = 0
+    self._logger = logger
+    self._on_change = None
+    self._by_id = {}
+    self._products = ()
+    self._loaded = threading.Event()
+    self._stop = threading.Event()
+    self._lock = threading.Lock()
+    self._call = None
+    self._thread = None
+
+  def list_products(self, remaining=None):
+    """Returns the products of the local copy. Until the first update or
+    poll arrives, asks the catalog directly."""
+    if self._loaded.is_set():
+      return self._products
+    return self.client.list_products(remaining)
+
+  def start(self, on_change=None):
+    self._on_change = on_change
+    self._thread = threading.Thread(target=self._run, name='catalog-watch', daemon=True)
+    self._thread.start()
+
+  def stop(self):
+    self._stop.set()
+    call = self._call
+    if call is not None:
+      call.cancel()
+
+  def wait_loaded(self, timeout=None):
+    return self._loaded.wait(timeout)
+
+  def stats(self):
+    return {
+      'mode': self.mode,
+      'version': self.version,
+      'products': len(self._products),
+      'updates': self.updates,
+      'polls': self.polls,
+      'stream_errors': self.stream_errors,
+    }
+
+  def _run(self):
+    while not self._stop.is_set():
+      try:
+        self._watch()
+      except grpc.RpcError as err:
+        if self._stop.is_set():
+          return
+        self._stream_failed(err)
+        self._poll()
+        self._stop.wait(self.poll_interval)
+      else:
+        # the catalog ended the stream, e.g. while shutting down
+        self._stop.wait(self.reconnect_delay)
+
+  def _watch(self):
+    request = demo_pb2.WatchProductsRequest(known_version=self.version or '')
+    self._call = self.client.stub.WatchProducts(request)
+    if self._stop.is_set():
+      self._call.cancel()
+    for update in self._call:
+      self._set_mode('watch')
+      self._apply(update)
+
+  def _apply(self, update):
+    with self._lock:
+      by_id = {} if update.reset else dict(self._by_id)
+      for product in update.added:
+        by_id[product.id] = product
+      for product in update.updated:
+        by_id[product.id] = product
+      for product_id in update.removed_ids:
+        by_id.pop(product_id, None)
+      self._by_id = by_id
+      self.version = update.version
+      self.updates += 1
+    self._changed(tuple(by_id.values()))
+
+  def _poll(self):
+    try:
+      products = self.client.list_products()
+    except (grpc.RpcError, CircuitOpenError) as err:
+      if self._logger is not None:
+        self._logger.warning("catalog poll failed: {}".format(err))
+      return
+    with self._lock:
+      self._by_id = {product.id: product for product in products}
+      # a polled catalog has no version; the next stream starts over
+      self.version = None
+      self.polls += 1
+    products = tuple(self._by_id.values())
+    if products == self._products:
+      # unchanged: callers may tell a new catalog by identity
+      products = self._products
+    self._changed(products)
+
+  def _changed(self, products):
+    self._products = products
+    self._loaded.set()
+    if self._on_change is not None:
+      self._on_change(products)
+
+  def _stream_failed(self, err):
+    self.stream_errors += 1
+    if self.mode != 'poll' and self._logger is not None:
+      self._logger.warning("catalog watch unavailable, polling every {}s: {}".format(
+        self.poll_interval, err.code()))
+    self._set_mode('poll')
+
+  def _set_mode(self, mode):
+    if mode != self.mode and mode == 'watch' and self._logger is not None:
+      self._logger.info("watching the product catalog for changes")
+    self.mode = mode
@@ -0,0 +1,187 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Circuit breaker for calls to a downstream service.
+#
+# This module is shared by popupservice and recommendationservice and
+# copied into each of them; keep the copies identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+#
+# The breaker watches the outcome of the last `window` calls. Once at
+# least `min_calls` of them are in, it opens when the share of failed
+# calls reaches `failure_rate`, or the share of calls slower than
+# `slow_call_seconds` reaches `slow_call_rate`. While open, calls are
+# rejected at once with CircuitOpenError so callers can serve a cached
+# or static answer instead of waiting on a doomed RPC. After
+# `open_seconds` the breaker half-opens and lets `probes` calls through:
+# if they all succeed quickly it closes again, otherwise it re-opens.
+
+import collections
+import threading
+import time
+
+import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+STATE = metrics.REGISTRY.gauge(
+  'circuit_breaker_state', 'Circuit breaker state: 0 closed, 1 half-open, 2 open.',
+  ('breaker',))
+REJECTED = metrics.REGISTRY.counter(
+  'circuit_breaker_rejected_total', 'Calls rejected by an open circuit breaker.',
+  ('breaker',))
+
+class CircuitOpenError(Exception):
+  """Raised instead of making a call while the breaker is open."""
+
+class CircuitBreaker(object):
+  """Trips on the error rate or latency of recent calls; see above.
+
+  Callers wrap each call in acquire() and record():
+
+    permit = breaker.acquire()      # raises CircuitOpenError
+    ...make the call...
+    breaker.record(permit, duration, failed)
+
+  `failed` is None for outcomes that say nothing about the downstream
+  service, such as a call cancelled by its caller. A `window` of 0 never
+  opens.
+  """
+
+  def __init__(self, name, window=20, min_calls=5, failure_rate=0.5,
+               slow_call_seconds=1.0, slow_call_rate=0.5, open_seconds=5.0,
+               probes=1, logger=None, clock=time.monotonic):
+    self.name = name
+    self.min_calls = min_calls
+    self.failure_rate = failure_rate
+    self.slow_call_seconds = slow_call_seconds
+    self.slow_call_rate = slow_call_rate
+    self.open_seconds = open_seconds
+    self.probes = probes
+    self._logger = logger
+    self._clock = clock
+    self._lock = threading.Lock()
+    # outcomes of recent calls: (failed, slow)
+    self._window = collections.deque(maxlen=window)
+    self._failed = 0
+    self._slow = 0
+    self._state = CLOSED
+    # bumped on every state change; permits from an older generation
+    # are not counted
+    self._generation = 1
+    self._opened_at = None
+    self._probes_in_flight = 0
+    self._probes_passed = 0
+    self._state_gauge = STATE.labels(name)
+    self._rejected = REJECTED.labels(name)
+    self._state_gauge.set(_STATE_VALUES[CLOSED])
+
+  @property
+  def state(self):
+    with self._lock:
+      self._expire_open()
+      return self._state
+
+  def ready(self):
+    """Returns True if a call made now would be let through."""
+    with self._lock:
+      self._expire_open()
+      if self._state == OPEN:
+        return False
+      return self._state == CLOSED or self._probes_in_flight < self.probes
+
+  def acquire(self):
+    """Returns a permit for one call, or raises CircuitOpenError."""
+    with self._lock:
+      self._expire_open()
+      if self._state == CLOSED:
+        return self._generation
+      if self._state == HALF_OPEN and self._probes_in_flight < self.probes:
+        self._probes_in_flight += 1
+        return self._generation
+      self._rejected.inc()
+      raise CircuitOpenError("circuit breaker {} is open".format(self.name))
+
+  def record(self, permit, duration, failed):
+    """Records the outcome of the call made with `permit`."""
+    slow = not failed and duration >= self.slow_call_seconds
+    with self._lock:
+      if permit != self._generation:
+        return
+      if self._state == HALF_OPEN:
+        self._probes_in_flight -= 1
+        if failed is None:
+          return
+        if failed or slow:
+          self._transition(OPEN, "probe {}".format("failed" if failed else "was slow"))
+          return
+        self._probes_passed += 1
+        if self._probes_passed >= self.probes:
+          self._transition(CLOSED, "probes succeeded")
+        return
+      if failed is None or not self._window.maxlen:
+        return
+      self._add(bool(failed), slow)
+      calls = len(self._window)
+      if calls < self.min_calls:
+        return
+      if self._failed >= self.failure_rate * calls:
+        self._transition(OPEN, "{} of the last {} calls failed".format(self._failed, calls))
+      elif self._slow >= self.slow_call_rate * calls:
+        self._transition(OPEN, "{} of the last {} calls took over {}s".format(
+          self._slow, calls, self.slow_call_seconds))
+
+  def _add(self, failed, slow):
+    if len(self._window) == self._window.maxlen:
+      old_failed, old_slow = self._window[0]
+      self._failed -= old_failed
+      self._slow -= old_slow
+    self._window.append((failed, slow))
+    self._failed += failed
+    self._slow += slow
+
+  def _expire_open(self):
+    if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+      self._transition(HALF_OPEN, "probing after {}s".format(self.open_seconds))
+
+  def _transition(self, state, reason):
+    self._state = state
+    self._generation += 1
+    self._probes_in_flight = 0
+    self._probes_passed = 0
+    if state == OPEN:
+      self._opened_at = self._clock()
+    if state == CLOSED:
+      self._window.clear()
+      self._failed = self._slow = 0
+    self._state_gauge.set(_STATE_VALUES[state])
+    if self._logger is not None:
+      log = self._logger.warning if state == OPEN else self._logger.info
+      log("circuit breaker {} {}: {}".format(self.name, state, reason))
+
+  def stats(self):
+    with self._lock:
+      return {
+        'state': self._state,
+        'calls': len(self._window),
+        'failed': self._failed,
+        'slow': self._slow,
+        'rejected': self._rejected.value,
+      }
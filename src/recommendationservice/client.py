@@ -23,11 +23,13 @@ from logger import getJSONLogger
 logger = getJSONLogger('recommendationservice-server')
 
 if __name__ == "__main__":
+    # usage: python client.py [port] [single|batch|stream]
     # get port
     if len(sys.argv) > 1:
         port = sys.argv[1]
     else:
         port = "8080"
+    mode = sys.argv[2] if len(sys.argv) > 2 else "single"
 
     # set up server stub
     channel = grpc.insecure_channel('localhost:'+port)
@@ -35,5 +37,17 @@ if __name__ == "__main__":
     # form request
     request = demo_pb2.ListRecommendationsRequest(user_id="test", product_ids=["test"])
     # make call to server
-    response = stub.ListRecommendations(request)
-    logger.info(response)
+    if mode == "batch":
+        requests = [demo_pb2.ListRecommendationsRequest(user_id="test-%d" % i, product_ids=["test"])
+                    for i in range(5)]
+        response = stub.ListRecommendationsBatch(
+            demo_pb2.ListRecommendationsBatchRequest(requests=requests))
+        logger.info(response)
+    elif mode == "stream":
+        requests = (demo_pb2.ListRecommendationsRequest(user_id="test-%d" % i, product_ids=["test"])
+                    for i in range(5))
+        for response in stub.StreamRecommendations(requests):
+            logger.info(response)
+    else:
+        response = stub.ListRecommendations(request)
+        logger.info(response)
@@ -13,7 +13,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
 """Client and server classes corresponding to protobuf-defined services."""
 import grpc
@@ -170,6 +170,16 @@ class RecommendationServiceStub(object):
                 request_serializer=demo__pb2.ListRecommendationsRequest.SerializeToString,
                 response_deserializer=demo__pb2.ListRecommendationsResponse.FromString,
                 )
+        self.ListRecommendationsBatch = channel.unary_unary(
+                '/hipstershop.RecommendationService/ListRecommendationsBatch',
+                request_serializer=demo__pb2.ListRecommendationsBatchRequest.SerializeToString,
+                response_deserializer=demo__pb2.ListRecommendationsBatchResponse.FromString,
+                )
+        self.StreamRecommendations = channel.stream_stream(
+                '/hipstershop.RecommendationService/StreamRecommendations',
+                request_serializer=demo__pb2.ListRecommendationsRequest.SerializeToString,
+                response_deserializer=demo__pb2.ListRecommendationsResponse.FromString,
+                )
 
 
 class RecommendationServiceServicer(object):
@@ -183,6 +193,21 @@ class RecommendationServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListRecommendationsBatch(self, request, context):
+        """Answers many requests from a single catalog snapshot.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamRecommendations(self, request_iterator, context):
+        """Answers each request on the stream as it arrives, in order, from the
+        catalog snapshot current when the stream was opened.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_RecommendationServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -191,6 +216,16 @@ def add_RecommendationServiceServicer_to_server(servicer, server):
                     request_deserializer=demo__pb2.ListRecommendationsRequest.FromString,
                     response_serializer=demo__pb2.ListRecommendationsResponse.SerializeToString,
             ),
+            'ListRecommendationsBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListRecommendationsBatch,
+                    request_deserializer=demo__pb2.ListRecommendationsBatchRequest.FromString,
+                    response_serializer=demo__pb2.ListRecommendationsBatchResponse.SerializeToString,
+            ),
+            'StreamRecommendations': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamRecommendations,
+                    request_deserializer=demo__pb2.ListRecommendationsRequest.FromString,
+                    response_serializer=demo__pb2.ListRecommendationsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'hipstershop.RecommendationService', rpc_method_handlers)
@@ -220,6 +255,40 @@ class RecommendationService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def ListRecommendationsBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/hipstershop.RecommendationService/ListRecommendationsBatch',
+            demo__pb2.ListRecommendationsBatchRequest.SerializeToString,
+            demo__pb2.ListRecommendationsBatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamRecommendations(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/hipstershop.RecommendationService/StreamRecommendations',
+            demo__pb2.ListRecommendationsRequest.SerializeToString,
+            demo__pb2.ListRecommendationsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
 
 class ProductCatalogServiceStub(object):
     """---------------Product Catalog----------------
@@ -247,6 +316,11 @@ class ProductCatalogServiceStub(object):
                 request_serializer=demo__pb2.SearchProductsRequest.SerializeToString,
                 response_deserializer=demo__pb2.SearchProductsResponse.FromString,
                 )
+        self.WatchProducts = channel.unary_stream(
+                '/hipstershop.ProductCatalogService/WatchProducts',
+                request_serializer=demo__pb2.WatchProductsRequest.SerializeToString,
+                response_deserializer=demo__pb2.ProductsUpdate.FromString,
+                )
 
 
 class ProductCatalogServiceServicer(object):
@@ -272,6 +346,15 @@ class ProductCatalogServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchProducts(self, request, context):
+        """Streams changes to the catalog: first the difference between the
+        catalog version the client knows and the current one, then one
+        update per change.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ProductCatalogServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -290,6 +373,11 @@ def add_ProductCatalogServiceServicer_to_server(servicer, server):
                     request_deserializer=demo__pb2.SearchProductsRequest.FromString,
                     response_serializer=demo__pb2.SearchProductsResponse.SerializeToString,
             ),
+            'WatchProducts': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchProducts,
+                    request_deserializer=demo__pb2.WatchProductsRequest.FromString,
+                    response_serializer=demo__pb2.ProductsUpdate.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'hipstershop.ProductCatalogService', rpc_method_handlers)
@@ -353,6 +441,23 @@ class ProductCatalogService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def WatchProducts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/hipstershop.ProductCatalogService/WatchProducts',
+            demo__pb2.WatchProductsRequest.SerializeToString,
+            demo__pb2.ProductsUpdate.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
 
 class ShippingServiceStub(object):
     """---------------Shipping Service----------
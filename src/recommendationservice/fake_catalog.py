@@ -0,0 +1,127 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A local stand-in for productcatalogservice, used by tests and load tests.
+#
+# This module is shared by popupservice and recommendationservice and
+# copied into each of them; keep the copies identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+#
+#   python fake_catalog.py [port] [num_products]
+
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+import demo_pb2
+import demo_pb2_grpc
+
+def synthetic_products(num_products, num_categories=50):
+  return [demo_pb2.Product(
+            id='P%06d' % i,
+            name='Product %d' % i,
+            categories=['C%d' % (i % num_categories), 'C%d' % (i % 7)])
+          for i in range(num_products)]
+
+def diff_products(old, new):
+  """Returns the (added, updated, removed ids) that turn product list
+  `old` into `new`."""
+  before = {p.id: p for p in old}
+  after = {p.id: p for p in new}
+  added = [p for pid, p in after.items() if pid not in before]
+  updated = [p for pid, p in after.items() if pid in before and before[pid] != p]
+  removed = [pid for pid in before if pid not in after]
+  return added, updated, removed
+
+class FakeProductCatalog(demo_pb2_grpc.ProductCatalogServiceServicer):
+  """Serves `products`. set_products() changes the catalog and bumps its
+  version, which WatchProducts streams to watchers; with `watch` False it
+  answers WatchProducts with UNIMPLEMENTED, like an older catalog."""
+
+  def __init__(self, products, latency=0.0, watch=True):
+    self.products = list(products)
+    self.latency = latency
+    self.watch = watch
+    self.version = 1
+    self.list_calls = 0
+    self.watch_calls = 0
+    self._changed = threading.Condition()
+    self._drops = 0
+
+  def set_products(self, products):
+    with self._changed:
+      self.products = list(products)
+      self.version += 1
+      self._changed.notify_all()
+
+  def drop_watchers(self):
+    """Ends every open WatchProducts stream with UNAVAILABLE."""
+    with self._changed:
+      self._drops += 1
+      self._changed.notify_all()
+
+  def ListProducts(self, request, context):
+    with self._changed:
+      self.list_calls += 1
+    if self.latency:
+      time.sleep(self.latency)
+    return demo_pb2.ListProductsResponse(products=self.products)
+
+  def GetProduct(self, request, context):
+    for product in self.products:
+      if product.id == request.id:
+        return product
+    context.abort(grpc.StatusCode.NOT_FOUND, 'no product with ID ' + request.id)
+
+  def WatchProducts(self, request, context):
+    if not self.watch:
+      context.abort(grpc.StatusCode.UNIMPLEMENTED, 'WatchProducts is not implemented')
+    self.watch_calls += 1
+    with self._changed:
+      products, version, drops = self.products, self.version, self._drops
+    if request.known_version != str(version):
+      yield demo_pb2.ProductsUpdate(version=str(version), reset=True, added=products)
+    while context.is_active():
+      with self._changed:
+        self._changed.wait_for(
+          lambda: self.version != version or self._drops != drops, timeout=0.1)
+        if self._drops != drops:
+          context.abort(grpc.StatusCode.UNAVAILABLE, 'catalog restarting')
+        if self.version == version:
+          continue
+        old, products, version = products, self.products, self.version
+      added, updated, removed = diff_products(old, products)
+      yield demo_pb2.ProductsUpdate(version=str(version), added=added, updated=updated,
+                                    removed_ids=removed)
+
+def start_fake_catalog(products, port=0, latency=0.0, max_workers=10, watch=True):
+  """Starts a FakeProductCatalog on localhost. Returns (server, catalog, port)."""
+  catalog = FakeProductCatalog(products, latency, watch)
+  server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+  demo_pb2_grpc.add_ProductCatalogServiceServicer_to_server(catalog, server)
+  port = server.add_insecure_port('localhost:%d' % port)
+  server.start()
+  return server, catalog, port
+
+if __name__ == "__main__":
+  port = int(sys.argv[1]) if len(sys.argv) > 1 else 3550
+  num_products = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+  server, _, port = start_fake_catalog(synthetic_products(num_products), port)
+  print("fake product catalog with {} products listening on port {}".format(num_products, port))
+  server.wait_for_termination()
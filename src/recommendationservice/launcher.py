@@ -0,0 +1,172 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Multi-process launcher for the Python gRPC services.
+#
+# This module is shared by emailservice, popupservice and
+# recommendationservice. Each service is built from its own directory, so
+# it is copied into each of them; keep the copies identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+#
+# GRPC_WORKERS selects the number of server processes: a number, or "auto"
+# for one per CPU of the container's cgroup CPU quota. Every worker binds
+# the same port with SO_REUSEPORT and the kernel spreads connections over
+# them. Worker processes must not create gRPC channels or servers before
+# the fork, so all per-process setup belongs in the `serve` callable.
+
+import asyncio
+import logging
+import math
+import os
+import signal
+
+# Lets every worker bind the same port; the kernel balances between them.
+REUSEPORT_OPTION = ('grpc.so_reuseport', 1)
+
+def shutdown_grace():
+  return float(os.environ.get('GRPC_SHUTDOWN_GRACE_SECONDS', "3"))
+
+def cgroup_cpu_limit():
+  """Returns the CPU quota of this container in CPUs, or None if unlimited."""
+  try:
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    with open('/sys/fs/cgroup/cpu.max') as f:
+      quota, period = f.read().split()[:2]
+    if quota == 'max':
+      return None
+    return int(quota) / int(period)
+  except (OSError, ValueError):
+    pass
+  try:
+    # cgroup v1: a quota of -1 means unlimited
+    with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+      quota = int(f.read())
+    with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+      period = int(f.read())
+    if quota <= 0:
+      return None
+    return quota / period
+  except (OSError, ValueError):
+    return None
+
+def available_cpus():
+  try:
+    cpus = len(os.sched_getaffinity(0))
+  except AttributeError:
+    cpus = os.cpu_count() or 1
+  limit = cgroup_cpu_limit()
+  if limit is not None:
+    cpus = min(cpus, math.ceil(limit))
+  return max(1, cpus)
+
+def worker_count():
+  workers = os.environ.get('GRPC_WORKERS', "1")
+  if workers == "auto":
+    return available_cpus()
+  return max(1, int(workers))
+
+def run(serve, logger, num_workers=None):
+  """Runs `serve()` in `num_workers` processes (default: worker_count()).
+
+  With a single worker `serve()` runs in this process. Otherwise the
+  parent forks the workers, forwards SIGTERM and SIGINT to them so they
+  can drain, and exits once all of them have exited. If a worker dies on
+  its own the others are stopped too, so the pod restarts as a whole.
+  """
+  if num_workers is None:
+    num_workers = worker_count()
+  if num_workers <= 1:
+    serve()
+    return
+
+  logger.info("starting {} worker processes".format(num_workers))
+  children = set()
+  stopping = []
+  def forward(signum, frame):
+    stopping.append(signum)
+    for pid in children:
+      try:
+        os.kill(pid, signum)
+      except ProcessLookupError:
+        pass
+  signals = {signal.SIGTERM, signal.SIGINT}
+  previous = {signum: signal.signal(signum, forward) for signum in signals}
+  # A signal that arrives while the workers are forked waits until all of
+  # them exist, so that it reaches every one of them.
+  signal.pthread_sigmask(signal.SIG_BLOCK, signals)
+  try:
+    for index in range(num_workers):
+      pid = os.fork()
+      if pid == 0:
+        # the worker installs its own handlers in `serve`
+        for signum, handler in previous.items():
+          signal.signal(signum, handler)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, signals)
+        os.environ['GRPC_WORKER_INDEX'] = str(index)
+        code = 0
+        try:
+          serve()
+        except BaseException as err:
+          logger.error("worker {} exited with error: {}".format(index, err))
+          code = 1
+        finally:
+          # os._exit skips atexit; flush buffered and queued log records first
+          logging.shutdown()
+          os._exit(code)
+      children.add(pid)
+  finally:
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, signals)
+
+  exit_code = 0
+  while children:
+    try:
+      pid, status = os.wait()
+    except ChildProcessError:
+      break
+    children.discard(pid)
+    code = os.waitstatus_to_exitcode(status)
+    if not stopping:
+      logger.error("worker process {} exited unexpectedly with code {}, stopping".format(pid, code))
+      exit_code = 1
+      forward(signal.SIGTERM, None)
+  logger.info("all worker processes exited")
+  if exit_code:
+    raise SystemExit(exit_code)
+
+def wait_for_termination(server, logger, grace=None):
+  """Blocks until `server` stops. SIGTERM and SIGINT stop it gracefully,
+  letting in-flight RPCs finish for up to `grace` seconds."""
+  if grace is None:
+    grace = shutdown_grace()
+  def stop(signum, frame):
+    logger.info("received signal {}, draining for up to {}s".format(signum, grace))
+    server.stop(grace)
+  signal.signal(signal.SIGTERM, stop)
+  signal.signal(signal.SIGINT, stop)
+  server.wait_for_termination()
+
+async def wait_for_termination_aio(server, logger, grace=None):
+  """grpc.aio counterpart of wait_for_termination()."""
+  if grace is None:
+    grace = shutdown_grace()
+  loop = asyncio.get_running_loop()
+  stopping = []
+  def stop(signum):
+    logger.info("received signal {}, draining for up to {}s".format(signum, grace))
+    stopping.append(loop.create_task(server.stop(grace)))
+  for signum in (signal.SIGTERM, signal.SIGINT):
+    loop.add_signal_handler(signum, stop, signum)
+  await server.wait_for_termination()
@@ -0,0 +1,137 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Compares the threaded and grpc.aio server modes of recommendation_server.py.
+#
+# Starts a local stand-in product catalog, then for each GRPC_SERVER_MODE
+# runs the server in a subprocess and drives it with `concurrency`
+# concurrent ListRecommendations calls for `duration` seconds. Server
+# settings such as GRPC_MAX_CONCURRENT_RPCS are passed through from the
+# environment; RPCs shed over that limit are counted as errors.
+#
+#   python loadtest_server_modes.py [--concurrency 64] [--duration 10]
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import grpc
+
+import demo_pb2
+import demo_pb2_grpc
+from fake_catalog import start_fake_catalog, synthetic_products
+from grpc_health.v1 import health_pb2
+from grpc_health.v1 import health_pb2_grpc
+
+def free_port():
+  with socket.socket() as sock:
+    sock.bind(('localhost', 0))
+    return sock.getsockname()[1]
+
+def percentile(sorted_values, p):
+  if not sorted_values:
+    return float('nan')
+  return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+async def wait_for_serving(target, timeout=30):
+  deadline = time.monotonic() + timeout
+  async with grpc.aio.insecure_channel(target) as channel:
+    stub = health_pb2_grpc.HealthStub(channel)
+    while time.monotonic() < deadline:
+      try:
+        response = await stub.Check(health_pb2.HealthCheckRequest(), timeout=1)
+        if response.status == health_pb2.HealthCheckResponse.SERVING:
+          return
+      except grpc.RpcError:
+        pass
+      await asyncio.sleep(0.2)
+  raise RuntimeError('server at {} did not become ready'.format(target))
+
+async def drive(target, concurrency, duration, product_ids):
+  latencies = []
+  errors = 0
+  async with grpc.aio.insecure_channel(target) as channel:
+    stub = demo_pb2_grpc.RecommendationServiceStub(channel)
+    deadline = time.monotonic() + duration
+    async def worker(n):
+      nonlocal errors
+      request = demo_pb2.ListRecommendationsRequest(
+        user_id='loadtest-%d' % n, product_ids=product_ids[n % len(product_ids):][:3])
+      while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+          await stub.ListRecommendations(request)
+          latencies.append(time.perf_counter() - started)
+        except grpc.RpcError:
+          errors += 1
+    started = time.monotonic()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.monotonic() - started
+  return latencies, errors, elapsed
+
+def run_mode(mode, catalog_port, args, product_ids):
+  port = free_port()
+  env = dict(os.environ,
+             GRPC_SERVER_MODE=mode,
+             PORT=str(port),
+             PRODUCT_CATALOG_SERVICE_ADDR='localhost:%d' % catalog_port,
+             CATALOG_REFRESH_INTERVAL_SECONDS=str(args.catalog_ttl),
+             DISABLE_PROFILER='1')
+  env.pop('ENABLE_TRACING', None)
+  server = subprocess.Popen([sys.executable, 'recommendation_server.py'], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+  try:
+    target = 'localhost:%d' % port
+    asyncio.run(wait_for_serving(target))
+    latencies, errors, elapsed = asyncio.run(
+      drive(target, args.concurrency, args.duration, product_ids))
+  finally:
+    server.terminate()
+    server.wait()
+  latencies.sort()
+  print("{:>5}: {:8.0f} req/s  p50 {:7.2f} ms  p90 {:7.2f} ms  p99 {:7.2f} ms  errors {}".format(
+    mode, len(latencies) / elapsed,
+    percentile(latencies, 0.50) * 1e3,
+    percentile(latencies, 0.90) * 1e3,
+    percentile(latencies, 0.99) * 1e3,
+    errors))
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--concurrency', type=int, default=64)
+  parser.add_argument('--duration', type=float, default=10)
+  parser.add_argument('--products', type=int, default=1000)
+  parser.add_argument('--catalog-latency', type=float, default=0.05,
+                      help='seconds the stand-in catalog sleeps per ListProducts')
+  parser.add_argument('--catalog-ttl', type=float, default=1,
+                      help='CATALOG_REFRESH_INTERVAL_SECONDS passed to the server')
+  parser.add_argument('--modes', default='sync,aio')
+  args = parser.parse_args()
+
+  products = synthetic_products(args.products)
+  catalog_server, _, catalog_port = start_fake_catalog(
+    products, latency=args.catalog_latency)
+  print("concurrency {}, {}s per mode, {} products, catalog latency {}s".format(
+    args.concurrency, args.duration, args.products, args.catalog_latency))
+  try:
+    for mode in args.modes.split(','):
+      run_mode(mode, catalog_port, args, [p.id for p in products])
+  finally:
+    catalog_server.stop(0)
@@ -0,0 +1,419 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A small metrics registry with a Prometheus text format /metrics
+# endpoint, and gRPC interceptors that record RPC metrics into it.
+#
+# This module is shared by emailservice, popupservice and
+# recommendationservice and copied into each of them; keep the copies
+# identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+#
+#   METRICS_PORT  port of the /metrics endpoint; unset disables it. With
+#                 GRPC_WORKERS > 1, worker n serves on METRICS_PORT + n.
+
+import bisect
+import http.server
+import os
+import threading
+import time
+
+import grpc
+
+# Seconds; from sub-millisecond cache hits to requests stuck on deadlines.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+  return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+def _format_labels(names, values, extra=''):
+  pairs = ['{}="{}"'.format(n, _escape(v)) for n, v in zip(names, values)]
+  if extra:
+    pairs.append(extra)
+  return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+  if value == float('inf'):
+    return '+Inf'
+  return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Value(object):
+  def __init__(self):
+    self.value = 0
+    self._lock = threading.Lock()
+
+  def inc(self, amount=1):
+    with self._lock:
+      self.value += amount
+
+  def dec(self, amount=1):
+    with self._lock:
+      self.value -= amount
+
+  def set(self, value):
+    self.value = value
+
+class _Metric(object):
+  kind = None
+
+  def __init__(self, name, documentation, labelnames=()):
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+    self._children = {}
+    self._lock = threading.Lock()
+
+  def labels(self, *values):
+    """Returns the child for these label values, creating it on first use.
+    Callers on hot paths should keep the child rather than look it up."""
+    child = self._children.get(values)
+    if child is None:
+      if len(values) != len(self.labelnames):
+        raise ValueError('{} takes labels {}'.format(self.name, self.labelnames))
+      with self._lock:
+        child = self._children.setdefault(values, self._new_child())
+    return child
+
+  def _new_child(self):
+    # a single value; histograms keep buckets instead
+    return _Value()
+
+  def collect(self):
+    yield '# HELP {} {}'.format(self.name, self.documentation)
+    yield '# TYPE {} {}'.format(self.name, self.kind)
+    for values, child in list(self._children.items()):
+      for line in self._samples(values, child):
+        yield line
+
+class Counter(_Metric):
+  kind = 'counter'
+
+  def inc(self, amount=1):
+    self.labels().inc(amount)
+
+  def _samples(self, values, child):
+    yield '{}{} {}'.format(self.name, _format_labels(self.labelnames, values),
+                           _format_value(child.value))
+
+class Gauge(Counter):
+  kind = 'gauge'
+
+  def set(self, value):
+    self.labels().set(value)
+
+class CallbackGauge(_Metric):
+  """A gauge whose value is read from `function` at collection time. A
+  value of None omits the sample."""
+  kind = 'gauge'
+
+  def __init__(self, name, documentation, function):
+    super(CallbackGauge, self).__init__(name, documentation)
+    self.function = function
+
+  def collect(self):
+    yield '# HELP {} {}'.format(self.name, self.documentation)
+    yield '# TYPE {} {}'.format(self.name, self.kind)
+    value = self.function()
+    if value is not None:
+      yield '{} {}'.format(self.name, _format_value(value))
+
+class CallbackCounter(CallbackGauge):
+  """A counter whose value is read from `function` at collection time."""
+  kind = 'counter'
+
+class _HistogramValue(object):
+  def __init__(self, bounds):
+    self._bounds = bounds
+    self.counts = [0] * (len(bounds) + 1)
+    self.sum = 0.0
+    self._lock = threading.Lock()
+
+  def observe(self, value):
+    index = bisect.bisect_left(self._bounds, value)
+    with self._lock:
+      self.counts[index] += 1
+      self.sum += value
+
+class Histogram(_Metric):
+  kind = 'histogram'
+
+  def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    super(Histogram, self).__init__(name, documentation, labelnames)
+    self.buckets = tuple(sorted(buckets))
+
+  def _new_child(self):
+    return _HistogramValue(self.buckets)
+
+  def observe(self, value):
+    self.labels().observe(value)
+
+  def _samples(self, values, child):
+    with child._lock:
+      counts, total = list(child.counts), child.sum
+    cumulative = 0
+    for bound, count in zip(self.buckets + (float('inf'),), counts):
+      cumulative += count
+      yield '{}_bucket{} {}'.format(
+        self.name,
+        _format_labels(self.labelnames, values, 'le="{}"'.format(_format_value(bound))),
+        cumulative)
+    labels = _format_labels(self.labelnames, values)
+    yield '{}_sum{} {}'.format(self.name, labels, repr(total))
+    yield '{}_count{} {}'.format(self.name, labels, cumulative)
+
+class Registry(object):
+  def __init__(self):
+    self._metrics = {}
+    self._lock = threading.Lock()
+
+  def _register(self, metric):
+    with self._lock:
+      existing = self._metrics.get(metric.name)
+      if existing is not None:
+        # registering again, e.g. from a second server in one process,
+        # returns the metric that is already collected
+        return existing
+      self._metrics[metric.name] = metric
+      return metric
+
+  def counter(self, name, documentation, labelnames=()):
+    return self._register(Counter(name, documentation, labelnames))
+
+  def gauge(self, name, documentation, labelnames=()):
+    return self._register(Gauge(name, documentation, labelnames))
+
+  def callback_gauge(self, name, documentation, function):
+    """Registers or replaces a gauge computed by `function` on collection."""
+    metric = CallbackGauge(name, documentation, function)
+    with self._lock:
+      self._metrics[name] = metric
+    return metric
+
+  def callback_counter(self, name, documentation, function):
+    """Registers or replaces a counter read from `function` on collection."""
+    metric = CallbackCounter(name, documentation, function)
+    with self._lock:
+      self._metrics[name] = metric
+    return metric
+
+  def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    return self._register(Histogram(name, documentation, labelnames, buckets))
+
+  def expose(self):
+    """Returns all metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in list(self._metrics.values()):
+      lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+# gRPC server metrics, recorded by ServerMetricsInterceptor.
+SERVER_HANDLED = REGISTRY.counter(
+  'grpc_server_handled_total', 'RPCs completed on the server, by method and status code.',
+  ('grpc_method', 'grpc_code'))
+SERVER_LATENCY = REGISTRY.histogram(
+  'grpc_server_handling_seconds', 'Time from receiving an RPC to its completion.',
+  ('grpc_method',))
+SERVER_IN_FLIGHT = REGISTRY.gauge(
+  'grpc_server_in_flight', 'RPCs being handled.', ('grpc_method',))
+
+# gRPC client metrics for downstream calls, recorded by ClientMetricsInterceptor.
+CLIENT_HANDLED = REGISTRY.counter(
+  'grpc_client_handled_total', 'Downstream RPCs completed, by method and status code.',
+  ('grpc_method', 'grpc_code'))
+CLIENT_LATENCY = REGISTRY.histogram(
+  'grpc_client_handling_seconds', 'Latency of downstream RPCs.', ('grpc_method',))
+
+def _code_name(code):
+  return code.name if code is not None else 'OK'
+
+class _RpcTimer(object):
+  """Records one server RPC from construction to finish()."""
+  __slots__ = ('method', 'started')
+
+  def __init__(self, method):
+    self.method = method
+    self.started = time.perf_counter()
+    SERVER_IN_FLIGHT.labels(method).inc()
+
+  def finish(self, code):
+    SERVER_LATENCY.labels(self.method).observe(time.perf_counter() - self.started)
+    SERVER_IN_FLIGHT.labels(self.method).dec()
+    SERVER_HANDLED.labels(self.method, _code_name(code)).inc()
+
+def _context_code(context, failed):
+  code = context.code() if hasattr(context, 'code') else None
+  if code is None and failed:
+    return grpc.StatusCode.UNKNOWN
+  return code
+
+def _wrap_handler(handler, wrap_unary, wrap_stream):
+  if handler is None:
+    return None
+  if handler.unary_unary:
+    return grpc.unary_unary_rpc_method_handler(
+      wrap_unary(handler.unary_unary),
+      request_deserializer=handler.request_deserializer,
+      response_serializer=handler.response_serializer)
+  if handler.stream_unary:
+    return grpc.stream_unary_rpc_method_handler(
+      wrap_unary(handler.stream_unary),
+      request_deserializer=handler.request_deserializer,
+      response_serializer=handler.response_serializer)
+  if handler.unary_stream:
+    return grpc.unary_stream_rpc_method_handler(
+      wrap_stream(handler.unary_stream),
+      request_deserializer=handler.request_deserializer,
+      response_serializer=handler.response_serializer)
+  return grpc.stream_stream_rpc_method_handler(
+    wrap_stream(handler.stream_stream),
+    request_deserializer=handler.request_deserializer,
+    response_serializer=handler.response_serializer)
+
+class ServerMetricsInterceptor(grpc.ServerInterceptor):
+  """Records latency, in-flight count and status of every RPC of a
+  threaded grpc.server. Streaming RPCs are timed until their last
+  response is sent."""
+
+  def intercept_service(self, continuation, handler_call_details):
+    method = handler_call_details.method
+    def wrap_unary(behavior):
+      def timed(request, context):
+        timer = _RpcTimer(method)
+        failed = True
+        try:
+          response = behavior(request, context)
+          failed = False
+          return response
+        finally:
+          timer.finish(_context_code(context, failed))
+      return timed
+    def wrap_stream(behavior):
+      def timed(request, context):
+        timer = _RpcTimer(method)
+        failed = True
+        try:
+          for response in behavior(request, context):
+            yield response
+          failed = False
+        finally:
+          timer.finish(_context_code(context, failed))
+      return timed
+    return _wrap_handler(continuation(handler_call_details), wrap_unary, wrap_stream)
+
+class AsyncServerMetricsInterceptor(grpc.aio.ServerInterceptor):
+  """ServerMetricsInterceptor for grpc.aio servers."""
+
+  async def intercept_service(self, continuation, handler_call_details):
+    method = handler_call_details.method
+    def wrap_unary(behavior):
+      async def timed(request, context):
+        timer = _RpcTimer(method)
+        failed = True
+        try:
+          response = await behavior(request, context)
+          failed = False
+          return response
+        finally:
+          timer.finish(_context_code(context, failed))
+      return timed
+    def wrap_stream(behavior):
+      async def timed(request, context):
+        timer = _RpcTimer(method)
+        failed = True
+        try:
+          async for response in behavior(request, context):
+            yield response
+          failed = False
+        finally:
+          timer.finish(_context_code(context, failed))
+      return timed
+    return _wrap_handler(await continuation(handler_call_details), wrap_unary, wrap_stream)
+
+def _record_client_call(method, started, code):
+  if isinstance(method, bytes):
+    # grpc.aio passes the method name as bytes
+    method = method.decode('utf-8')
+  CLIENT_LATENCY.labels(method).observe(time.perf_counter() - started)
+  CLIENT_HANDLED.labels(method, _code_name(code)).inc()
+
+class ClientMetricsInterceptor(grpc.UnaryUnaryClientInterceptor):
+  """Records latency and status of unary calls on a channel, for use with
+  grpc.intercept_channel."""
+
+  def intercept_unary_unary(self, continuation, client_call_details, request):
+    started = time.perf_counter()
+    call = continuation(client_call_details, request)
+    # runs once the call has completed
+    call.add_done_callback(
+      lambda done: _record_client_call(client_call_details.method, started, done.code()))
+    return call
+
+class AsyncClientMetricsInterceptor(grpc.aio.UnaryUnaryClientInterceptor):
+  """ClientMetricsInterceptor for grpc.aio channels."""
+
+  async def intercept_unary_unary(self, continuation, client_call_details, request):
+    started = time.perf_counter()
+    call = await continuation(client_call_details, request)
+    try:
+      # the caller awaiting the call again gets the same result
+      await call
+    except grpc.RpcError:
+      pass
+    _record_client_call(client_call_details.method, started, await call.code())
+    return call
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+  registry = REGISTRY
+
+  def do_GET(self):
+    if self.path.split('?')[0] != '/metrics':
+      self.send_error(404)
+      return
+    body = self.registry.expose().encode('utf-8')
+    self.send_response(200)
+    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    pass
+
+def start_http_server(port, registry=REGISTRY, addr=''):
+  """Serves `registry` at http://addr:port/metrics from a daemon thread.
+  Returns the server; port 0 picks a free port."""
+  handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+  server = http.server.ThreadingHTTPServer((addr, port), handler)
+  server.daemon_threads = True
+  threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+  return server
+
+_http_server = None
+
+def start_http_server_from_env(logger):
+  """Starts the /metrics endpoint on METRICS_PORT (+ the worker index)
+  once per process; does nothing if METRICS_PORT is not set."""
+  global _http_server
+  port = os.environ.get('METRICS_PORT', '')
+  if port == '' or _http_server is not None:
+    return _http_server
+  port = int(port) + int(os.environ.get('GRPC_WORKER_INDEX', '0'))
+  _http_server = start_http_server(port)
+  logger.info("serving metrics on port {}".format(port))
+  return _http_server
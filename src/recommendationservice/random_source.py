@@ -0,0 +1,65 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import itertools
+import random
+import threading
+
+# Request metadata key that makes a single request deterministic.
+SEED_METADATA_KEY = 'x-recommendation-seed'
+
+def derive_seed(*parts):
+  digest = hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8'))
+  return int.from_bytes(digest.digest()[:8], 'big')
+
+class RandomSource(object):
+  """Hands out random.Random instances instead of the shared module RNG.
+
+  Each handler thread gets its own generator. With a `seed`, generator n
+  (in order of first use) is seeded from (seed, n), so a run with a fixed
+  thread count is reproducible. A request carrying the
+  x-recommendation-seed metadata gets a generator derived from that seed
+  and the request itself, independent of the thread that serves it.
+  """
+
+  def __init__(self, seed=None):
+    self.seed = seed
+    self._local = threading.local()
+    self._counter = itertools.count()
+
+  def current(self):
+    rng = getattr(self._local, 'rng', None)
+    if rng is None:
+      if self.seed is None:
+        rng = random.Random()
+      else:
+        rng = random.Random(derive_seed(self.seed, next(self._counter)))
+      self._local.rng = rng
+    return rng
+
+  def for_request(self, request_seed, request):
+    return random.Random(derive_seed(
+      request_seed, request.user_id, *sorted(request.product_ids)))
+
+def request_seed(context):
+  """Returns the x-recommendation-seed of the call, or None."""
+  if context is None:
+    return None
+  for key, value in context.invocation_metadata() or ():
+    if key == SEED_METADATA_KEY:
+      return value
+  return None
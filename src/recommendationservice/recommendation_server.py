@@ -14,14 +14,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
-import random
 import time
+_started = time.monotonic()
+
+import asyncio
+import os
 import traceback
-from concurrent import futures
 
-import googlecloudprofiler
-from google.auth.exceptions import DefaultCredentialsError
 import grpc
 
 import demo_pb2
@@ -29,60 +28,137 @@ import demo_pb2_grpc
 from grpc_health.v1 import health_pb2
 from grpc_health.v1 import health_pb2_grpc
 
-from opentelemetry import trace
-from opentelemetry.instrumentation.grpc import GrpcInstrumentorClient, GrpcInstrumentorServer
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-
+import launcher
+import metrics
+import profiling
+import server_config
+from catalog_cache import AsyncCatalogCache, CatalogCache
+from catalog_client import AsyncCatalogClient, CatalogClient, remaining_time
+from catalog_watch import CatalogWatcher, watch_enabled
+from recommender import CategoryRecommender
+from random_source import RandomSource, request_seed
+from request_log import RequestRecorder
+from result_cache import ResultCache
+from startup_timing import FIRST_REQUEST, FIRST_SERVING_HEALTH, IMPORTS, StartupTimer
 from logger import getJSONLogger
 logger = getJSONLogger('recommendationservice-server')
+# per-request lines, which can be sampled with LOG_SAMPLE_RATES
+request_logger = getJSONLogger('recommendationservice-requests')
 
-def initStackdriverProfiling():
-  project_id = None
-  try:
-    project_id = os.environ["GCP_PROJECT_ID"]
-  except KeyError:
-    # Environment variable not set
-    pass
+# googlecloudprofiler, google.auth and OpenTelemetry are imported in
+# init_telemetry only when enabled; together they are most of the import
+# time of this module.
+startup = StartupTimer(logger, started=_started)
+startup.mark(IMPORTS)
 
-  for retry in range(1,4):
-    try:
-      if project_id:
-        googlecloudprofiler.start(service='recommendation_server', service_version='1.0.0', verbose=0, project_id=project_id)
-      else:
-        googlecloudprofiler.start(service='recommendation_server', service_version='1.0.0', verbose=0)
-      logger.info("Successfully started Stackdriver Profiler.")
-      return
-    except (BaseException) as exc:
-      logger.info("Unable to start Stackdriver Profiler Python agent. " + str(exc))
-      if (retry < 4):
-        logger.info("Sleeping %d seconds to retry Stackdriver Profiler agent initialization"%(retry*10))
-        time.sleep (1)
-      else:
-        logger.warning("Could not initialize Stackdriver Profiler after retrying, giving up")
-  return
+profiler = profiling.ProfilerAgent('recommendation_server', logger)
+
+def _encode_varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def _serialize_response(response):
+    # Responses may already be serialized, e.g. when served from the cache.
+    if isinstance(response, bytes):
+        return response
+    return response.SerializeToString()
+
+def add_RecommendationServiceServicer_to_server(servicer, server):
+    """Like demo_pb2_grpc.add_RecommendationServiceServicer_to_server, but
+    lets handlers return serialized responses."""
+    rpc_method_handlers = {
+        'ListRecommendations': grpc.unary_unary_rpc_method_handler(
+            servicer.ListRecommendations,
+            request_deserializer=demo_pb2.ListRecommendationsRequest.FromString,
+            response_serializer=_serialize_response),
+        'ListRecommendationsBatch': grpc.unary_unary_rpc_method_handler(
+            servicer.ListRecommendationsBatch,
+            request_deserializer=demo_pb2.ListRecommendationsBatchRequest.FromString,
+            response_serializer=_serialize_response),
+        'StreamRecommendations': grpc.stream_stream_rpc_method_handler(
+            servicer.StreamRecommendations,
+            request_deserializer=demo_pb2.ListRecommendationsRequest.FromString,
+            response_serializer=_serialize_response),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        'hipstershop.RecommendationService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
 
 class RecommendationService(demo_pb2_grpc.RecommendationServiceServicer):
+    """Handlers return serialized responses, so the servicer must be
+    registered with add_RecommendationServiceServicer_to_server above."""
+    max_responses = 5
+
+    def __init__(self, catalog, recommender=None, results=None, random_source=None,
+                 recorder=None, startup=None):
+        self.catalog = catalog
+        self.recommender = recommender or CategoryRecommender()
+        self.results = results if results is not None else ResultCache()
+        self.random = random_source or RandomSource()
+        self.recorder = recorder
+        self.startup = startup
+
     def ListRecommendations(self, request, context):
-        max_responses = 5
-        # fetch list of products from product catalog stub
-        cat_response = product_catalog_stub.ListProducts(demo_pb2.Empty())
-        product_ids = [x.id for x in cat_response.products]
-        filtered_products = list(set(product_ids)-set(request.product_ids))
-        num_products = len(filtered_products)
-        num_return = min(max_responses, num_products)
-        # sample list of indicies to return
-        indices = random.sample(range(num_products), num_return)
-        # fetch product ids from indices
-        prod_list = [filtered_products[i] for i in indices]
-        logger.info("[Recv ListRecommendations] product_ids={}".format(prod_list))
-        # build and return response
-        response = demo_pb2.ListRecommendationsResponse()
-        response.product_ids.extend(prod_list)
+        # read the product list from the local catalog snapshot
+        return self.recommend(self.catalog.get(remaining_time(context)), request,
+                              request_seed(context))
+
+    def ListRecommendationsBatch(self, request, context):
+        # every request in the batch is answered from the same snapshot
+        return self.recommend_batch(self.catalog.get(remaining_time(context)), request,
+                                    request_seed(context))
+
+    def StreamRecommendations(self, request_iterator, context):
+        snapshot = self.catalog.get(remaining_time(context))
+        seed = request_seed(context)
+        for request in request_iterator:
+            yield self.recommend(snapshot, request, seed)
+
+    def recommend_batch(self, snapshot, batch_request, seed=None):
+        # ListRecommendationsBatchResponse is just its serialized responses,
+        # each prefixed with the tag and length of field 1.
+        return b''.join(
+            b'\x0a' + _encode_varint(len(response)) + response
+            for response in (self.recommend(snapshot, request, seed)
+                             for request in batch_request.requests))
+
+    def recommend(self, snapshot, request, seed=None):
+        """Returns the serialized ListRecommendationsResponse for `request`.
+
+        Seeded requests are computed from their own generator and bypass
+        the result cache, so they always replay the same way.
+        """
+        if self.startup is not None:
+            self.startup.mark(FIRST_REQUEST)
+        if self.recorder is not None:
+            self.recorder.record(request, seed)
+        if seed is None:
+            key = (request.user_id, frozenset(request.product_ids))
+            cached = self.results.get(key, snapshot.version)
+            if cached is not None:
+                return cached
+            rng = self.random.current()
+        else:
+            rng = self.random.for_request(seed, request)
+        # rank products by category overlap with the ones in the request
+        prod_list = self.recommender.recommend(
+            snapshot, request.product_ids, self.max_responses, rng)
+        request_logger.info("[Recv ListRecommendations] product_ids=%s", prod_list)
+        # build, cache and return the response
+        response = demo_pb2.ListRecommendationsResponse(product_ids=prod_list).SerializeToString()
+        if seed is None:
+            self.results.put(key, snapshot.version, response)
         return response
 
     def Check(self, request, context):
+        if request.service == profiling.HEALTH_SERVICE:
+            return health_pb2.HealthCheckResponse(status=profiler.health_status())
+        if self.startup is not None:
+            self.startup.mark(FIRST_SERVING_HEALTH)
         return health_pb2.HealthCheckResponse(
             status=health_pb2.HealthCheckResponse.SERVING)
 
@@ -91,63 +167,236 @@ class RecommendationService(demo_pb2_grpc.RecommendationServiceServicer):
             status=health_pb2.HealthCheckResponse.UNIMPLEMENTED)
 
 
-if __name__ == "__main__":
-    logger.info("initializing recommendationservice")
+class AsyncRecommendationService(RecommendationService):
+    """RecommendationService for the grpc.aio server. `catalog` is an
+    AsyncCatalogCache; the recommendation logic is shared."""
+
+    async def ListRecommendations(self, request, context):
+        return self.recommend(await self.catalog.get(remaining_time(context)), request,
+                              request_seed(context))
+
+    async def ListRecommendationsBatch(self, request, context):
+        return self.recommend_batch(await self.catalog.get(remaining_time(context)), request,
+                                    request_seed(context))
+
+    async def StreamRecommendations(self, request_iterator, context):
+        snapshot = await self.catalog.get(remaining_time(context))
+        seed = request_seed(context)
+        async for request in request_iterator:
+            yield self.recommend(snapshot, request, seed)
+
+    async def Check(self, request, context):
+        return RecommendationService.Check(self, request, context)
+
+    async def Watch(self, request, context):
+        await context.write(RecommendationService.Watch(self, request, context))
+
+
+def create_recommender():
+    return CategoryRecommender(
+        max_candidates_per_category=int(os.environ.get('RECOMMENDATION_MAX_CANDIDATES_PER_CATEGORY', "256")))
+
+def create_result_cache():
+    results = ResultCache(
+        max_entries=int(os.environ.get('RECOMMENDATION_CACHE_MAX_ENTRIES', "10000")),
+        ttl=float(os.environ.get('RECOMMENDATION_CACHE_TTL_SECONDS', "30")))
+    register_result_cache_metrics(results)
+    return results
+
+def register_result_cache_metrics(results):
+    metrics.REGISTRY.callback_gauge(
+        'recommendation_result_cache_entries', 'Responses held by the result cache.',
+        lambda: len(results))
+    metrics.REGISTRY.callback_counter(
+        'recommendation_result_cache_hits_total', 'Result cache lookups answered from the cache.',
+        lambda: results.hits)
+    metrics.REGISTRY.callback_counter(
+        'recommendation_result_cache_misses_total', 'Result cache lookups that were computed.',
+        lambda: results.misses)
+    metrics.REGISTRY.callback_counter(
+        'recommendation_result_cache_evictions_total', 'Responses evicted to bound the result cache.',
+        lambda: results.evictions)
+    metrics.REGISTRY.callback_counter(
+        'recommendation_result_cache_invalidations_total',
+        'Times a new catalog version emptied the result cache.',
+        lambda: results.invalidations)
+
+def create_random_source():
+    seed = os.environ.get('RECOMMENDATION_RANDOM_SEED', '')
+    return RandomSource(seed if seed != '' else None)
+
+def create_recorder():
+    path = os.environ.get('RECOMMENDATION_REQUEST_LOG', '')
+    if path == '':
+        return None
+    logger.info("recording requests to " + path)
+    return RequestRecorder(path)
+
+def close_recorder(recorder):
+    # workers leave through os._exit, which does not flush open files
+    if recorder is not None:
+        recorder.close()
+
+def catalog_ttl():
+    return float(os.environ.get('CATALOG_REFRESH_INTERVAL_SECONDS', "30"))
+
+def register_catalog_metrics(catalog):
+    metrics.REGISTRY.callback_gauge(
+        'catalog_snapshot_age_seconds', 'Age of the product catalog snapshot served from.',
+        catalog.age)
+    metrics.REGISTRY.callback_counter(
+        'catalog_cache_hits_total', 'Catalog reads answered from a fresh snapshot.',
+        lambda: catalog.hits)
+    metrics.REGISTRY.callback_counter(
+        'catalog_cache_stale_hits_total',
+        'Catalog reads answered from an expired snapshot while it refreshed.',
+        lambda: catalog.stale_hits)
+    metrics.REGISTRY.callback_counter(
+        'catalog_cache_misses_total', 'Catalog reads made before any snapshot was loaded.',
+        lambda: catalog.misses)
+    metrics.REGISTRY.callback_counter(
+        'catalog_cache_coalesced_total',
+        'Catalog misses that waited for a fetch another read had started.',
+        lambda: catalog.coalesced)
+    metrics.REGISTRY.callback_counter(
+        'catalog_cache_refreshes_total', 'Catalog fetches installed as the snapshot.',
+        lambda: catalog.refreshes)
+    metrics.REGISTRY.callback_counter(
+        'catalog_cache_refresh_errors_total', 'Catalog fetches that failed.',
+        lambda: catalog.refresh_errors)
+
+def serve(port, catalog_addr):
+    # deadlines, retries and hedging of catalog calls are configured there
+    catalog_client = CatalogClient(catalog_addr, logger)
+    fetch = catalog_client.list_products
+    watcher = None
+    if watch_enabled():
+        # refreshes then read the watcher's copy; changes are installed
+        # as they are streamed
+        watcher = CatalogWatcher(catalog_client, logger)
+        fetch = watcher.list_products
+    catalog = CatalogCache(fetch, ttl=catalog_ttl(), breaker=catalog_client.breaker)
+    register_catalog_metrics(catalog)
+    catalog.start()
+    if watcher is not None:
+        watcher.start(catalog.install)
+
+    # create gRPC server
+    server = server_config.create_server(logger, default_max_workers=10)
+
+    # add class to gRPC server
+    recorder = create_recorder()
+    service = RecommendationService(catalog, create_recommender(), create_result_cache(),
+                                    create_random_source(), recorder, startup)
+    add_RecommendationServiceServicer_to_server(service, server)
+    health_pb2_grpc.add_HealthServicer_to_server(service, server)
+
+    # start server
+    logger.info("listening on port: " + port)
+    server.add_insecure_port('[::]:'+port)
+    server.start()
+
+    # keep alive until SIGTERM, then drain
+    try:
+        launcher.wait_for_termination(server, logger)
+    finally:
+        catalog.stop()
+        if watcher is not None:
+            watcher.stop()
+        close_recorder(recorder)
+
+async def serve_aio(port, catalog_addr):
+    if watch_enabled():
+        logger.warning("CATALOG_WATCH is only supported with GRPC_SERVER_MODE=sync, polling")
+    catalog_client = AsyncCatalogClient(catalog_addr, logger)
+    catalog = AsyncCatalogCache(catalog_client.list_products, ttl=catalog_ttl(),
+                                breaker=catalog_client.breaker)
+    register_catalog_metrics(catalog)
+    await catalog.start()
+
+    # in-flight requests are bounded by configuration, not by a thread pool
+    server = server_config.create_aio_server(logger)
+
+    recorder = create_recorder()
+    service = AsyncRecommendationService(catalog, create_recommender(), create_result_cache(),
+                                         create_random_source(), recorder, startup)
+    add_RecommendationServiceServicer_to_server(service, server)
+    health_pb2_grpc.add_HealthServicer_to_server(service, server)
+
+    logger.info("listening on port: {} (grpc.aio)".format(port))
+    server.add_insecure_port('[::]:'+port)
+    await server.start()
+    try:
+        await launcher.wait_for_termination_aio(server, logger)
+    finally:
+        catalog.stop()
+        close_recorder(recorder)
+
 
+def init_telemetry(server_mode):
     try:
       if "DISABLE_PROFILER" in os.environ:
         raise KeyError()
       else:
         logger.info("Profiler enabled.")
-        initStackdriverProfiling()
+        # retried in the background; the server starts without waiting
+        profiler.start_in_background()
     except KeyError:
         logger.info("Profiler disabled.")
 
+    if os.environ.get("ENABLE_TRACING") != "1":
+      logger.info("Tracing disabled.")
+      return
+    from google.auth.exceptions import DefaultCredentialsError
     try:
-      grpc_client_instrumentor = GrpcInstrumentorClient()
-      grpc_client_instrumentor.instrument()
-      grpc_server_instrumentor = GrpcInstrumentorServer()
-      grpc_server_instrumentor.instrument()
-      if os.environ["ENABLE_TRACING"] == "1":
-        trace.set_tracer_provider(TracerProvider())
-        otel_endpoint = os.getenv("COLLECTOR_SERVICE_ADDR", "localhost:4317")
-        trace.get_tracer_provider().add_span_processor(
-          BatchSpanProcessor(
-              OTLPSpanExporter(
-              endpoint = otel_endpoint,
-              insecure = True
-            )
+      from opentelemetry import trace
+      from opentelemetry.sdk.trace import TracerProvider
+      from opentelemetry.sdk.trace.export import BatchSpanProcessor
+      from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+      if server_mode == "aio":
+        from opentelemetry.instrumentation.grpc import GrpcAioInstrumentorClient, GrpcAioInstrumentorServer
+        GrpcAioInstrumentorClient().instrument()
+        GrpcAioInstrumentorServer().instrument()
+      else:
+        from opentelemetry.instrumentation.grpc import GrpcInstrumentorClient, GrpcInstrumentorServer
+        grpc_client_instrumentor = GrpcInstrumentorClient()
+        grpc_client_instrumentor.instrument()
+        grpc_server_instrumentor = GrpcInstrumentorServer()
+        grpc_server_instrumentor.instrument()
+      trace.set_tracer_provider(TracerProvider())
+      otel_endpoint = os.getenv("COLLECTOR_SERVICE_ADDR", "localhost:4317")
+      trace.get_tracer_provider().add_span_processor(
+        BatchSpanProcessor(
+            OTLPSpanExporter(
+            endpoint = otel_endpoint,
+            insecure = True
           )
         )
-    except (KeyError, DefaultCredentialsError):
+      )
+    except DefaultCredentialsError:
         logger.info("Tracing disabled.")
     except Exception as e:
-        logger.warn(f"Exception on Cloud Trace setup: {traceback.format_exc()}, tracing disabled.") 
+        logger.warn(f"Exception on Cloud Trace setup: {traceback.format_exc()}, tracing disabled.")
+
+
+if __name__ == "__main__":
+    logger.info("initializing recommendationservice")
+
+    server_mode = os.environ.get('GRPC_SERVER_MODE', "sync")
+    if server_mode not in ("sync", "aio"):
+        raise Exception('GRPC_SERVER_MODE must be "sync" or "aio", got ' + server_mode)
 
     port = os.environ.get('PORT', "8080")
     catalog_addr = os.environ.get('PRODUCT_CATALOG_SERVICE_ADDR', '')
     if catalog_addr == "":
         raise Exception('PRODUCT_CATALOG_SERVICE_ADDR environment variable not set')
     logger.info("product catalog address: " + catalog_addr)
-    channel = grpc.insecure_channel(catalog_addr)
-    product_catalog_stub = demo_pb2_grpc.ProductCatalogServiceStub(channel)
-
-    # create gRPC server
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
 
-    # add class to gRPC server
-    service = RecommendationService()
-    demo_pb2_grpc.add_RecommendationServiceServicer_to_server(service, server)
-    health_pb2_grpc.add_HealthServicer_to_server(service, server)
-
-    # start server
-    logger.info("listening on port: " + port)
-    server.add_insecure_port('[::]:'+port)
-    server.start()
-
-    # keep alive
-    try:
-         while True:
-            time.sleep(10000)
-    except KeyboardInterrupt:
-            server.stop(0)
+    # profiler, tracing, channels and the server are set up per worker process
+    def serve_worker():
+        init_telemetry(server_mode)
+        if server_mode == "aio":
+            asyncio.run(serve_aio(port, catalog_addr))
+        else:
+            serve(port, catalog_addr)
+    launcher.run(serve_worker, logger)
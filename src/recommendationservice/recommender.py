@@ -0,0 +1,55 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import heapq
+import random
+
+from sampling import sample_excluding
+
+class CategoryRecommender(object):
+  """Recommends products that share categories with the request's products.
+
+  Every catalog product that shares a category with one of the requested
+  products scores one point per shared category; the top `max_responses`
+  are kept with a bounded heap, ties broken at random. Large categories
+  are subsampled to `max_candidates_per_category` members, so the work per
+  request depends on the request and not on the catalog size. Slots that
+  category overlap cannot fill are filled with random products.
+  """
+
+  def __init__(self, max_candidates_per_category=256):
+    self.max_candidates_per_category = max_candidates_per_category
+
+  def recommend(self, snapshot, product_ids, max_responses, rng=random):
+    positions = snapshot.positions
+    requested = {positions[pid] for pid in product_ids if pid in positions}
+    scores = {}
+    for position in requested:
+      for category in snapshot.categories[position]:
+        members = snapshot.category_index[category]
+        if len(members) > self.max_candidates_per_category:
+          members = rng.sample(members, self.max_candidates_per_category)
+        for candidate in members:
+          if candidate not in requested:
+            scores[candidate] = scores.get(candidate, 0) + 1
+
+    top = heapq.nlargest(max_responses, scores,
+                         key=lambda candidate: (scores[candidate], rng.random()))
+    result = [snapshot.product_ids[i] for i in top]
+    if len(result) < max_responses:
+      result.extend(sample_excluding(
+        snapshot, list(product_ids) + result, max_responses - len(result), rng))
+    return result
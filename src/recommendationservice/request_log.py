@@ -0,0 +1,53 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Recording and reading of ListRecommendations request logs, one JSON
+# object per line: {"user_id": ..., "product_ids": [...], "seed": ...}.
+# The server records when RECOMMENDATION_REQUEST_LOG is set;
+# bench_replay.py replays a log against the servicer.
+
+import json
+import threading
+
+import demo_pb2
+
+class RequestRecorder(object):
+  def __init__(self, path):
+    self._file = open(path, 'a', buffering=1 << 16)
+    self._lock = threading.Lock()
+
+  def record(self, request, seed=None):
+    entry = {'user_id': request.user_id, 'product_ids': list(request.product_ids)}
+    if seed is not None:
+      entry['seed'] = seed
+    line = json.dumps(entry) + '\n'
+    with self._lock:
+      self._file.write(line)
+
+  def close(self):
+    with self._lock:
+      self._file.close()
+
+def read_request_log(path):
+  """Yields (ListRecommendationsRequest, seed or None) for each entry."""
+  with open(path) as f:
+    for line in f:
+      if not line.strip():
+        continue
+      entry = json.loads(line)
+      request = demo_pb2.ListRecommendationsRequest(
+        user_id=entry.get('user_id', ''), product_ids=entry.get('product_ids', []))
+      yield request, entry.get('seed')
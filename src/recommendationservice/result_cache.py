@@ -0,0 +1,86 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from collections import OrderedDict
+
+class ResultCache(object):
+  """A bounded LRU cache with a per-entry TTL, tied to one catalog version.
+
+  Entries are only valid for the catalog snapshot version they were
+  computed from: the first lookup or store with a different version
+  empties the cache. Since snapshot versions are content digests, a
+  refresh that returns an unchanged catalog keeps every entry.
+  A `max_entries` of 0 disables the cache.
+  """
+
+  def __init__(self, max_entries=10000, ttl=30.0, clock=time.monotonic):
+    self.max_entries = max_entries
+    self.ttl = ttl
+    self._clock = clock
+    self._entries = OrderedDict()
+    self._version = None
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.invalidations = 0
+    self.evictions = 0
+
+  def get(self, key, version):
+    if not self.max_entries:
+      return None
+    with self._lock:
+      self._check_version(version)
+      entry = self._entries.get(key)
+      if entry is None or entry[0] < self._clock():
+        self.misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return entry[1]
+
+  def put(self, key, version, value):
+    if not self.max_entries:
+      return
+    with self._lock:
+      self._check_version(version)
+      self._entries[key] = (self._clock() + self.ttl, value)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+        self.evictions += 1
+
+  def _check_version(self, version):
+    if version != self._version:
+      if self._entries:
+        self.invalidations += 1
+        self._entries.clear()
+      self._version = version
+
+  def __len__(self):
+    return len(self._entries)
+
+  def stats(self):
+    lookups = self.hits + self.misses
+    return {
+      'size': len(self._entries),
+      'hits': self.hits,
+      'misses': self.misses,
+      'hit_ratio': self.hits / lookups if lookups else 0.0,
+      'invalidations': self.invalidations,
+      'evictions': self.evictions,
+    }
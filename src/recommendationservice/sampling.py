@@ -0,0 +1,45 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+def sample_excluding(snapshot, excluded_ids, k, rng=random):
+  """Returns up to `k` distinct product ids from `snapshot`, none of which
+  are in `excluded_ids`.
+
+  Positions are drawn at random and rejected when excluded or already
+  taken, which costs O(k + len(excluded_ids)) as long as the excluded and
+  chosen ids cover at most half of the catalog. Past that point rejection
+  would spin, so the remaining positions are enumerated instead.
+  """
+  product_ids = snapshot.product_ids
+  positions = snapshot.positions
+  num_products = len(product_ids)
+  taken = {positions[pid] for pid in excluded_ids if pid in positions}
+  k = min(k, num_products - len(taken))
+  if k <= 0:
+    return []
+  if 2 * (len(taken) + k) > num_products:
+    remaining = [i for i in range(num_products) if i not in taken]
+    return [product_ids[i] for i in rng.sample(remaining, k)]
+  chosen = []
+  while len(chosen) < k:
+    i = rng.randrange(num_products)
+    if i in taken:
+      continue
+    taken.add(i)
+    chosen.append(product_ids[i])
+  return chosen
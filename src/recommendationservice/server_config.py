@@ -0,0 +1,150 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# gRPC server construction for the Python services, tunable from the
+# environment so each deployment can be sized without rebuilding images.
+#
+# This module is shared by emailservice, popupservice and
+# recommendationservice and copied into each of them; keep the copies
+# identical.
+# recommendationservice/test_shared_modules.py fails when they differ.
+#
+#   GRPC_MAX_WORKERS                     handler threads (threaded servers)
+#   GRPC_MAX_CONCURRENT_RPCS             RPCs accepted at once; beyond this
+#                                        new RPCs fail with RESOURCE_EXHAUSTED
+#   GRPC_KEEPALIVE_TIME_MS               keepalive ping interval
+#   GRPC_KEEPALIVE_TIMEOUT_MS            keepalive ping ack timeout
+#   GRPC_KEEPALIVE_PERMIT_WITHOUT_CALLS  allow pings on idle connections (0/1)
+#   GRPC_MAX_CONNECTION_AGE_MS           close connections after this age, so
+#                                        clients rebalance across replicas
+#   GRPC_MAX_RECEIVE_MESSAGE_LENGTH      bytes
+#   GRPC_MAX_SEND_MESSAGE_LENGTH         bytes
+#   METRICS_PORT                         port of the /metrics endpoint, see
+#                                        metrics.py
+
+import os
+import threading
+from concurrent import futures
+
+import grpc
+
+import launcher
+import metrics
+
+# env var -> gRPC channel argument, for the options that are only set when
+# configured.
+_OPTIONAL_OPTIONS = [
+  ('GRPC_KEEPALIVE_TIME_MS', 'grpc.keepalive_time_ms'),
+  ('GRPC_KEEPALIVE_TIMEOUT_MS', 'grpc.keepalive_timeout_ms'),
+  ('GRPC_KEEPALIVE_PERMIT_WITHOUT_CALLS', 'grpc.keepalive_permit_without_calls'),
+  ('GRPC_MAX_CONNECTION_AGE_MS', 'grpc.max_connection_age_ms'),
+  ('GRPC_MAX_RECEIVE_MESSAGE_LENGTH', 'grpc.max_receive_message_length'),
+  ('GRPC_MAX_SEND_MESSAGE_LENGTH', 'grpc.max_send_message_length'),
+]
+
+def _int_env(name, default):
+  value = os.environ.get(name, '')
+  if value == '':
+    return default
+  try:
+    return int(value)
+  except ValueError:
+    raise Exception('{} must be an integer, got {!r}'.format(name, value))
+
+class _CountingThreadPoolExecutor(futures.ThreadPoolExecutor):
+  """A ThreadPoolExecutor that counts the work items waiting for a thread.
+
+  grpc.server submits every accepted RPC here, including ones cancelled
+  while they wait, which never reach a server interceptor's handler.
+  """
+
+  def __init__(self, max_workers):
+    super(_CountingThreadPoolExecutor, self).__init__(max_workers=max_workers)
+    self._waiting = 0
+    self._waiting_lock = threading.Lock()
+
+  def _started(self):
+    with self._waiting_lock:
+      self._waiting -= 1
+
+  def submit(self, fn, *args, **kwargs):
+    def run():
+      self._started()
+      return fn(*args, **kwargs)
+    with self._waiting_lock:
+      self._waiting += 1
+    try:
+      return super(_CountingThreadPoolExecutor, self).submit(run)
+    except BaseException:
+      self._started()
+      raise
+
+  def queue_depth(self):
+    return self._waiting
+
+class ServerConfig(object):
+  """Effective gRPC server settings of one process."""
+
+  def __init__(self, max_workers, max_concurrent_rpcs, options):
+    self.max_workers = max_workers
+    self.max_concurrent_rpcs = max_concurrent_rpcs
+    self.options = options
+
+  @classmethod
+  def from_env(cls, default_max_workers, default_max_concurrent_rpcs=None):
+    max_workers = _int_env('GRPC_MAX_WORKERS', default_max_workers)
+    if default_max_concurrent_rpcs is None:
+      # Allow a short queue per thread, then shed load.
+      default_max_concurrent_rpcs = 4 * max_workers
+    max_concurrent_rpcs = _int_env('GRPC_MAX_CONCURRENT_RPCS', default_max_concurrent_rpcs)
+    options = [launcher.REUSEPORT_OPTION]
+    for env_name, option in _OPTIONAL_OPTIONS:
+      value = _int_env(env_name, None)
+      if value is not None:
+        options.append((option, value))
+    return cls(max_workers, max_concurrent_rpcs, options)
+
+  def describe(self):
+    return "max_workers={} max_concurrent_rpcs={} options={}".format(
+      self.max_workers, self.max_concurrent_rpcs, dict(self.options))
+
+def create_server(logger, default_max_workers, interceptors=None):
+  """Returns a threaded grpc.server configured from the environment, with
+  RPC metrics recorded and served on METRICS_PORT."""
+  config = ServerConfig.from_env(default_max_workers)
+  logger.info("gRPC server settings: " + config.describe())
+  executor = _CountingThreadPoolExecutor(config.max_workers)
+  metrics.REGISTRY.callback_gauge(
+    'grpc_server_thread_pool_queue_depth',
+    'RPCs waiting for a handler thread.', executor.queue_depth)
+  metrics.REGISTRY.callback_gauge(
+    'grpc_server_thread_pool_max_workers', 'Handler threads.', lambda: config.max_workers)
+  metrics.start_http_server_from_env(logger)
+  return grpc.server(executor,
+                     interceptors=[metrics.ServerMetricsInterceptor()] + list(interceptors or []),
+                     options=config.options,
+                     maximum_concurrent_rpcs=config.max_concurrent_rpcs)
+
+def create_aio_server(logger, interceptors=None):
+  """Returns a grpc.aio.server configured from the environment. It has no
+  handler threads, so only GRPC_MAX_CONCURRENT_RPCS bounds concurrency."""
+  config = ServerConfig.from_env(0, default_max_concurrent_rpcs=1000)
+  logger.info("gRPC aio server settings: max_concurrent_rpcs={} options={}".format(
+    config.max_concurrent_rpcs, dict(config.options)))
+  metrics.start_http_server_from_env(logger)
+  return grpc.aio.server(interceptors=[metrics.AsyncServerMetricsInterceptor()] + list(interceptors or []),
+                         options=config.options,
+                         maximum_concurrent_rpcs=config.max_concurrent_rpcs)
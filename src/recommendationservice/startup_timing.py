@@ -0,0 +1,58 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+# The startup milestones, in the order they are expected to happen.
+IMPORTS = 'imports'
+FIRST_SERVING_HEALTH = 'first_serving_health'
+FIRST_REQUEST = 'first_request'
+MILESTONES = (IMPORTS, FIRST_SERVING_HEALTH, FIRST_REQUEST)
+
+class StartupTimer(object):
+  """Records how long after `started` each startup milestone was reached.
+
+  Only the first mark() of each milestone counts; later calls return
+  after one attribute check, so the hot path can call it unconditionally.
+  Once all milestones are in, the report is logged as one line.
+  """
+
+  def __init__(self, logger, started=None, clock=time.monotonic):
+    self._logger = logger
+    self._clock = clock
+    self.started = started if started is not None else clock()
+    self.elapsed = {}
+    self.done = False
+    self._lock = threading.Lock()
+
+  def mark(self, milestone):
+    if self.done or milestone in self.elapsed:
+      return
+    with self._lock:
+      if milestone in self.elapsed:
+        return
+      self.elapsed[milestone] = self._clock() - self.started
+      self.done = len(self.elapsed) == len(MILESTONES)
+    if self.done:
+      self._logger.info("startup timing: " + self.describe())
+
+  def report(self):
+    return {m + '_ms': round(self.elapsed[m] * 1e3, 1)
+            for m in MILESTONES if m in self.elapsed}
+
+  def describe(self):
+    return ' '.join('{}={}'.format(k, v) for k, v in self.report().items())
@@ -0,0 +1,224 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+import unittest
+
+import demo_pb2
+from catalog_cache import AsyncCatalogCache, CatalogCache
+from circuit_breaker import CircuitBreaker
+
+
+def make_products(*ids):
+  return [demo_pb2.Product(id=i, name=i) for i in ids]
+
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+
+class FakeCatalog(object):
+  def __init__(self, products):
+    self.products = products
+    self.calls = 0
+    self.error = None
+    self.called = threading.Event()
+    self.release = threading.Event()
+    self.release.set()
+
+  def __call__(self, timeout=None):
+    self.calls += 1
+    self.called.set()
+    self.release.wait()
+    if self.error is not None:
+      raise self.error
+    return self.products
+
+
+class TestCatalogCache(unittest.TestCase):
+
+  def test_first_get_is_a_miss_then_hits(self):
+    catalog = FakeCatalog(make_products('A', 'B'))
+    cache = CatalogCache(catalog, ttl=10, clock=FakeClock())
+    self.assertEqual([p.id for p in cache.get().products], ['A', 'B'])
+    cache.get()
+    cache.get()
+    self.assertEqual(catalog.calls, 1)
+    stats = cache.stats()
+    self.assertEqual(stats['misses'], 1)
+    self.assertEqual(stats['hits'], 2)
+    self.assertEqual(stats['products'], 2)
+
+  def test_stale_snapshot_is_served_while_refreshing(self):
+    clock = FakeClock()
+    catalog = FakeCatalog(make_products('A'))
+    cache = CatalogCache(catalog, ttl=10, clock=clock)
+    first = cache.get()
+    catalog.products = make_products('A', 'B')
+    catalog.called.clear()
+    clock.now = 11
+    self.assertIs(cache.get(), first)
+    self.assertTrue(catalog.called.wait(5))
+    self.assertEqual(cache.stats()['stale_hits'], 1)
+
+  def test_failed_refresh_keeps_last_good_snapshot(self):
+    clock = FakeClock()
+    catalog = FakeCatalog(make_products('A'))
+    cache = CatalogCache(catalog, ttl=10, clock=clock)
+    first = cache.get()
+    catalog.error = RuntimeError('catalog down')
+    clock.now = 20
+    self.assertIs(cache.refresh(), first)
+    self.assertEqual(cache.stats()['refresh_errors'], 1)
+    self.assertEqual(cache.age(), 20)
+
+  def test_failed_first_load_raises(self):
+    catalog = FakeCatalog([])
+    catalog.error = RuntimeError('catalog down')
+    cache = CatalogCache(catalog, ttl=10, clock=FakeClock())
+    with self.assertRaises(RuntimeError):
+      cache.get()
+
+  def test_open_breaker_serves_stale_snapshot_without_refreshing(self):
+    clock = FakeClock()
+    catalog = FakeCatalog(make_products('A'))
+    breaker = CircuitBreaker('cache-test', window=2, min_calls=1, open_seconds=60, clock=clock)
+    cache = CatalogCache(catalog, ttl=10, clock=clock, breaker=breaker)
+    first = cache.get()
+    breaker.record(breaker.acquire(), 0.01, True)
+    clock.now = 11
+    for _ in range(3):
+      self.assertIs(cache.get(), first)
+    self.assertEqual(catalog.calls, 1)
+    self.assertEqual(cache.stats()['stale_hits'], 3)
+
+  def test_unchanged_catalog_keeps_snapshot_and_version(self):
+    clock = FakeClock()
+    catalog = FakeCatalog(make_products('A', 'B'))
+    cache = CatalogCache(catalog, ttl=10, clock=clock)
+    first = cache.get()
+    clock.now = 5
+    catalog.products = make_products('A', 'B')
+    self.assertIs(cache.refresh(), first)
+    self.assertEqual(cache.age(), 0)
+    catalog.products = make_products('A', 'C')
+    self.assertNotEqual(cache.refresh().version, first.version)
+
+  def test_concurrent_misses_share_one_fetch(self):
+    catalog = FakeCatalog(make_products('A'))
+    catalog.release.clear()
+    cache = CatalogCache(catalog, ttl=10, clock=FakeClock())
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(5)))
+               for _ in range(5)]
+    for thread in threads:
+      thread.start()
+    self.assertTrue(catalog.called.wait(5))
+    while cache.stats()['coalesced'] < 4:
+      time.sleep(0.001)
+    catalog.release.set()
+    for thread in threads:
+      thread.join()
+    self.assertEqual(catalog.calls, 1)
+    self.assertEqual(len(results), 5)
+    self.assertTrue(all(result is results[0] for result in results))
+
+  def test_waiting_for_a_miss_times_out(self):
+    catalog = FakeCatalog(make_products('A'))
+    catalog.release.clear()
+    cache = CatalogCache(catalog, ttl=10, clock=FakeClock())
+    leader = threading.Thread(target=cache.get)
+    leader.start()
+    self.assertTrue(catalog.called.wait(5))
+    with self.assertRaises(TimeoutError):
+      cache.get(0.01)
+    catalog.release.set()
+    leader.join()
+    self.assertEqual(cache.stats()['products'], 1)
+
+  def test_periodic_refresh_keeps_readers_from_refreshing(self):
+    catalog = FakeCatalog(make_products('A'))
+    def fetch(timeout=None):
+      time.sleep(0.05)
+      return catalog(timeout)
+    cache = CatalogCache(fetch, ttl=0.2)
+    cache.start()
+    self.addCleanup(cache.stop)
+    done = time.monotonic() + 1.2
+    def read():
+      while time.monotonic() < done:
+        cache.get()
+        time.sleep(0.001)
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for thread in readers:
+      thread.start()
+    for thread in readers:
+      thread.join()
+    # the initial load, then a periodic refresh started 0.05s before each
+    # expiry: one every 0.2s, and readers almost never see it expired
+    self.assertLessEqual(catalog.calls, 1 + 7)
+    self.assertLess(cache.stats()['stale_hits'], 50)
+
+
+class TestAsyncCatalogCache(unittest.TestCase):
+
+  def test_stale_snapshot_is_refreshed_on_the_loop(self):
+    clock = FakeClock()
+    catalog = FakeCatalog(make_products('A'))
+    async def fetch(timeout):
+      return catalog()
+    async def scenario():
+      cache = AsyncCatalogCache(fetch, ttl=10, clock=clock)
+      first = await cache.get()
+      catalog.products = make_products('A', 'B')
+      clock.now = 11
+      self.assertIs(await cache.get(), first)
+      await asyncio.sleep(0)
+      await asyncio.sleep(0)
+      return cache
+    cache = asyncio.run(scenario())
+    self.assertEqual(catalog.calls, 2)
+    self.assertEqual(cache.stats()['products'], 2)
+    self.assertEqual(cache.stats()['stale_hits'], 1)
+
+  def test_concurrent_misses_share_one_fetch(self):
+    catalog = FakeCatalog(make_products('A'))
+    async def scenario():
+      release = asyncio.Event()
+      async def fetch(timeout):
+        await release.wait()
+        return catalog()
+      cache = AsyncCatalogCache(fetch, ttl=10, clock=FakeClock())
+      readers = [asyncio.ensure_future(cache.get(5)) for _ in range(5)]
+      await asyncio.sleep(0)
+      # a reader that gives up does not cancel the fetch
+      readers[0].cancel()
+      release.set()
+      return cache, await asyncio.gather(*readers[1:])
+    cache, results = asyncio.run(scenario())
+    self.assertEqual(catalog.calls, 1)
+    self.assertTrue(all(result is results[0] for result in results))
+    self.assertEqual(cache.stats()['coalesced'], 4)
+
+
+if __name__ == '__main__':
+  unittest.main()
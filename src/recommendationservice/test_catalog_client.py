@@ -0,0 +1,206 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+import unittest
+from concurrent import futures
+
+import grpc
+
+import catalog_client
+import demo_pb2
+import demo_pb2_grpc
+from catalog_client import AsyncCatalogClient, CatalogClient
+from circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError, OPEN
+from fake_catalog import synthetic_products
+
+
+class ScriptedCatalog(demo_pb2_grpc.ProductCatalogServiceServicer):
+  """Answers ListProducts call n after delays[n] seconds, failing with
+  UNAVAILABLE while n < failures."""
+
+  def __init__(self, delays=(), failures=0):
+    self.delays = list(delays)
+    self.failures = failures
+    self.calls = 0
+    self._lock = threading.Lock()
+
+  def ListProducts(self, request, context):
+    with self._lock:
+      n = self.calls
+      self.calls += 1
+    if n < len(self.delays):
+      time.sleep(self.delays[n])
+    if n < self.failures:
+      context.abort(grpc.StatusCode.UNAVAILABLE, 'try again')
+    return demo_pb2.ListProductsResponse(products=synthetic_products(3))
+
+
+def start(catalog):
+  server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+  demo_pb2_grpc.add_ProductCatalogServiceServicer_to_server(catalog, server)
+  port = server.add_insecure_port('localhost:0')
+  server.start()
+  return server, 'localhost:%d' % port
+
+
+def won(method=catalog_client.LIST_PRODUCTS):
+  return catalog_client.HEDGES_WON.labels(method).value
+
+
+def retries(method=catalog_client.LIST_PRODUCTS):
+  return catalog_client.RETRIES.labels(method).value
+
+
+class TestCatalogClient(unittest.TestCase):
+
+  def serve(self, catalog):
+    server, target = start(catalog)
+    self.addCleanup(server.stop, None)
+    return target
+
+  def test_deadline(self):
+    client = CatalogClient(self.serve(ScriptedCatalog(delays=[1])), timeout=0.1)
+    started = time.monotonic()
+    with self.assertRaises(grpc.RpcError) as raised:
+      client.list_products()
+    self.assertEqual(raised.exception.code(), grpc.StatusCode.DEADLINE_EXCEEDED)
+    self.assertLess(time.monotonic() - started, 0.5)
+
+  def test_inbound_deadline_is_shorter(self):
+    client = CatalogClient(self.serve(ScriptedCatalog(delays=[1])), timeout=5)
+    started = time.monotonic()
+    with self.assertRaises(grpc.RpcError):
+      client.list_products(remaining=0.1)
+    self.assertLess(time.monotonic() - started, 0.5)
+
+  def test_retries_are_counted(self):
+    catalog = ScriptedCatalog(failures=2)
+    client = CatalogClient(self.serve(catalog), max_attempts=3)
+    before = retries()
+    self.assertEqual(len(client.list_products()), 3)
+    self.assertEqual(catalog.calls, 3)
+    self.assertEqual(retries() - before, 2)
+
+  def test_no_retries_with_one_attempt(self):
+    catalog = ScriptedCatalog(failures=1)
+    client = CatalogClient(self.serve(catalog), max_attempts=1)
+    before = retries()
+    with self.assertRaises(grpc.RpcError):
+      client.list_products()
+    self.assertEqual((catalog.calls, retries() - before), (1, 0))
+
+  def test_retries_give_up_after_max_attempts(self):
+    catalog = ScriptedCatalog(failures=100)
+    client = CatalogClient(self.serve(catalog), max_attempts=3)
+    with self.assertRaises(grpc.RpcError) as raised:
+      client.list_products()
+    self.assertEqual(raised.exception.code(), grpc.StatusCode.UNAVAILABLE)
+    self.assertEqual(catalog.calls, 3)
+
+  def test_retry_throttling(self):
+    throttle = catalog_client.RetryThrottle(max_tokens=10, token_ratio=0.1)
+    self.assertEqual([throttle.failure() for _ in range(5)], [True] * 4 + [False])
+    # each success gives back a tenth of a token
+    for _ in range(20):
+      throttle.success()
+    self.assertTrue(throttle.failure())
+
+  def test_async_retries(self):
+    catalog = ScriptedCatalog(failures=2)
+    target = self.serve(catalog)
+    async def run():
+      client = AsyncCatalogClient(target, max_attempts=3)
+      try:
+        return await client.list_products()
+      finally:
+        await client.channel.close()
+    before = retries()
+    self.assertEqual(len(asyncio.run(run())), 3)
+    self.assertEqual(catalog.calls, 3)
+    self.assertEqual(retries() - before, 2)
+
+  def test_hedge_wins_over_slow_call(self):
+    catalog = ScriptedCatalog(delays=[1])
+    client = CatalogClient(self.serve(catalog), hedging_delay=0.05, max_hedges=1)
+    before = won()
+    started = time.monotonic()
+    self.assertEqual(len(client.list_products()), 3)
+    self.assertLess(time.monotonic() - started, 0.5)
+    self.assertEqual(catalog.calls, 2)
+    self.assertEqual(won() - before, 1)
+
+  def test_fast_call_sends_no_hedge(self):
+    catalog = ScriptedCatalog()
+    client = CatalogClient(self.serve(catalog), hedging_delay=0.5)
+    client.list_products()
+    self.assertEqual(catalog.calls, 1)
+
+  def test_async_hedge(self):
+    catalog = ScriptedCatalog(delays=[1])
+    target = self.serve(catalog)
+    async def run():
+      client = AsyncCatalogClient(target, hedging_delay=0.05, max_hedges=1)
+      try:
+        return await client.list_products()
+      finally:
+        await client.channel.close()
+    before = won()
+    started = time.monotonic()
+    self.assertEqual(len(asyncio.run(run())), 3)
+    self.assertLess(time.monotonic() - started, 0.5)
+    self.assertEqual(won() - before, 1)
+
+  def test_open_breaker_fails_fast(self):
+    catalog = ScriptedCatalog(failures=100)
+    breaker = CircuitBreaker('catalog-test', window=4, min_calls=2, open_seconds=60)
+    client = CatalogClient(self.serve(catalog), breaker=breaker, max_attempts=1)
+    for _ in range(2):
+      with self.assertRaises(grpc.RpcError):
+        client.list_products()
+    self.assertEqual(breaker.state, OPEN)
+    with self.assertRaises(CircuitOpenError):
+      client.list_products()
+    self.assertEqual(catalog.calls, 2)
+
+  def test_slow_calls_open_the_breaker(self):
+    catalog = ScriptedCatalog(delays=[0.2, 0.2])
+    breaker = CircuitBreaker('catalog-test', window=4, min_calls=2,
+                             slow_call_seconds=0.1, open_seconds=60)
+    client = CatalogClient(self.serve(catalog), breaker=breaker)
+    client.list_products()
+    client.list_products()
+    self.assertEqual(breaker.state, OPEN)
+
+  def test_inbound_deadline_is_not_a_failure(self):
+    catalog = ScriptedCatalog(delays=[1] * 4)
+    breaker = CircuitBreaker('catalog-test', window=4, min_calls=2, open_seconds=60)
+    client = CatalogClient(self.serve(catalog), breaker=breaker, timeout=5)
+    for _ in range(2):
+      with self.assertRaises(grpc.RpcError):
+        client.list_products(remaining=0.05)
+    self.assertEqual(breaker.state, CLOSED)
+    client = CatalogClient(self.serve(catalog), breaker=breaker, timeout=0.05)
+    for _ in range(2):
+      with self.assertRaises(grpc.RpcError):
+        client.list_products()
+    self.assertEqual(breaker.state, OPEN)
+
+
+if __name__ == '__main__':
+  unittest.main()
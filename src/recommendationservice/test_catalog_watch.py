@@ -0,0 +1,112 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+
+import demo_pb2
+from catalog_client import CatalogClient
+from catalog_watch import CatalogWatcher
+from fake_catalog import diff_products, start_fake_catalog, synthetic_products
+
+
+def ids(products):
+  return [p.id for p in products]
+
+
+def wait_until(predicate, timeout=5.0):
+  deadline = time.monotonic() + timeout
+  while not predicate():
+    if time.monotonic() > deadline:
+      raise AssertionError('timed out')
+    time.sleep(0.01)
+
+
+class TestDiffProducts(unittest.TestCase):
+
+  def test_diff(self):
+    old = synthetic_products(3)
+    new = [old[0], demo_pb2.Product(id=old[1].id, name='renamed'),
+           demo_pb2.Product(id='NEW', name='new')]
+    added, updated, removed = diff_products(old, new)
+    self.assertEqual(ids(added), ['NEW'])
+    self.assertEqual(ids(updated), [old[1].id])
+    self.assertEqual(removed, [old[2].id])
+
+
+class TestCatalogWatcher(unittest.TestCase):
+
+  def watch(self, products, watch=True, **kwargs):
+    server, catalog, port = start_fake_catalog(products, watch=watch)
+    self.addCleanup(server.stop, None)
+    changes = []
+    watcher = CatalogWatcher(CatalogClient('localhost:%d' % port), **kwargs)
+    watcher.start(changes.append)
+    self.addCleanup(watcher.stop)
+    self.assertTrue(watcher.wait_loaded(5))
+    return catalog, watcher, changes
+
+  def test_applies_streamed_changes(self):
+    products = synthetic_products(3)
+    catalog, watcher, changes = self.watch(products)
+    self.assertEqual(ids(watcher.list_products()), ids(products))
+    self.assertEqual(watcher.mode, 'watch')
+    renamed = demo_pb2.Product(id=products[1].id, name='renamed')
+    catalog.set_products([products[0], renamed, demo_pb2.Product(id='NEW')])
+    wait_until(lambda: watcher.version == '2')
+    self.assertEqual(ids(watcher.list_products()), [products[0].id, products[1].id, 'NEW'])
+    self.assertEqual(watcher.list_products()[1].name, 'renamed')
+    self.assertEqual(len(changes), 2)
+    # changes come over the stream, not from re-listing the catalog
+    self.assertEqual(catalog.list_calls, 0)
+
+  def test_resumes_from_known_version(self):
+    products = synthetic_products(3)
+    catalog, watcher, _ = self.watch(products, reconnect_delay=0.01, poll_interval=0.01)
+    catalog.drop_watchers()
+    wait_until(lambda: catalog.watch_calls == 2)
+    catalog.set_products(products[:2])
+    wait_until(lambda: watcher.version == '2')
+    self.assertEqual(ids(watcher.list_products()), ids(products[:2]))
+
+  def test_polls_when_watch_is_unimplemented(self):
+    products = synthetic_products(3)
+    catalog, watcher, _ = self.watch(products, watch=False, poll_interval=0.05)
+    self.assertEqual(watcher.mode, 'poll')
+    self.assertEqual(ids(watcher.list_products()), ids(products))
+    catalog.set_products(products[:1])
+    wait_until(lambda: len(watcher.list_products()) == 1)
+    self.assertGreaterEqual(catalog.list_calls, 2)
+    self.assertIsNone(watcher.version)
+
+  def test_unchanged_poll_keeps_the_product_list(self):
+    catalog, watcher, changes = self.watch(synthetic_products(3), watch=False,
+                                           poll_interval=0.01)
+    first = watcher.list_products()
+    wait_until(lambda: watcher.polls >= 3)
+    self.assertIs(watcher.list_products(), first)
+    self.assertTrue(all(products is first for products in changes))
+
+  def test_lists_directly_until_loaded(self):
+    server, catalog, port = start_fake_catalog(synthetic_products(2))
+    self.addCleanup(server.stop, None)
+    watcher = CatalogWatcher(CatalogClient('localhost:%d' % port))
+    self.assertEqual(len(watcher.list_products()), 2)
+    self.assertEqual(catalog.list_calls, 1)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+
+def call(breaker, duration=0.01, failed=False):
+  breaker.record(breaker.acquire(), duration, failed)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+  def breaker(self, clock=None, **kwargs):
+    options = dict(window=10, min_calls=4, failure_rate=0.5, slow_call_seconds=1.0,
+                   slow_call_rate=0.5, open_seconds=5, probes=2)
+    options.update(kwargs)
+    return CircuitBreaker('test', clock=clock or FakeClock(), **options)
+
+  def test_stays_closed_below_min_calls(self):
+    breaker = self.breaker()
+    for _ in range(3):
+      call(breaker, failed=True)
+    self.assertEqual(breaker.state, CLOSED)
+
+  def test_opens_on_failure_rate(self):
+    breaker = self.breaker()
+    call(breaker)
+    call(breaker)
+    call(breaker, failed=True)
+    self.assertEqual(breaker.state, CLOSED)
+    call(breaker, failed=True)
+    self.assertEqual(breaker.state, OPEN)
+    rejected = breaker.stats()['rejected']
+    with self.assertRaises(CircuitOpenError):
+      breaker.acquire()
+    self.assertFalse(breaker.ready())
+    self.assertEqual(breaker.stats()['rejected'] - rejected, 1)
+
+  def test_opens_on_slow_calls(self):
+    breaker = self.breaker()
+    for _ in range(2):
+      call(breaker)
+      call(breaker, duration=2.0)
+    self.assertEqual(breaker.state, OPEN)
+
+  def test_ignored_outcomes_do_not_count(self):
+    breaker = self.breaker()
+    for _ in range(10):
+      call(breaker, failed=None)
+    self.assertEqual(breaker.stats()['calls'], 0)
+
+  def test_old_outcomes_leave_the_window(self):
+    breaker = self.breaker(window=4)
+    call(breaker, failed=True)
+    for _ in range(4):
+      call(breaker)
+    call(breaker, failed=True)
+    self.assertEqual(breaker.state, CLOSED)
+    self.assertEqual(breaker.stats()['failed'], 1)
+
+  def open(self, clock):
+    breaker = self.breaker(clock)
+    for _ in range(4):
+      call(breaker, failed=True)
+    self.assertEqual(breaker.state, OPEN)
+    return breaker
+
+  def test_half_open_probes_close_it(self):
+    clock = FakeClock()
+    breaker = self.open(clock)
+    clock.now = 5
+    self.assertEqual(breaker.state, HALF_OPEN)
+    first, second = breaker.acquire(), breaker.acquire()
+    # only `probes` calls get through while half-open
+    with self.assertRaises(CircuitOpenError):
+      breaker.acquire()
+    breaker.record(first, 0.01, False)
+    self.assertEqual(breaker.state, HALF_OPEN)
+    breaker.record(second, 0.01, False)
+    self.assertEqual(breaker.state, CLOSED)
+    self.assertEqual(breaker.stats()['calls'], 0)
+
+  def test_failed_probe_reopens_it(self):
+    clock = FakeClock()
+    breaker = self.open(clock)
+    clock.now = 5
+    breaker.record(breaker.acquire(), 0.01, True)
+    self.assertEqual(breaker.state, OPEN)
+    clock.now = 9
+    self.assertEqual(breaker.state, OPEN)
+    clock.now = 10
+    self.assertEqual(breaker.state, HALF_OPEN)
+
+  def test_slow_probe_reopens_it(self):
+    clock = FakeClock()
+    breaker = self.open(clock)
+    clock.now = 5
+    breaker.record(breaker.acquire(), 3.0, False)
+    self.assertEqual(breaker.state, OPEN)
+
+  def test_cancelled_probe_frees_its_slot(self):
+    clock = FakeClock()
+    breaker = self.open(clock)
+    clock.now = 5
+    breaker.acquire()
+    permit = breaker.acquire()
+    self.assertFalse(breaker.ready())
+    breaker.record(permit, 0.01, None)
+    self.assertTrue(breaker.ready())
+
+  def test_calls_from_before_it_opened_are_not_counted(self):
+    clock = FakeClock()
+    breaker = self.breaker(clock)
+    late = breaker.acquire()
+    for _ in range(4):
+      call(breaker, failed=True)
+    clock.now = 5
+    probe = breaker.acquire()
+    breaker.record(late, 0.01, False)
+    breaker.record(probe, 0.01, False)
+    self.assertEqual(breaker.state, HALF_OPEN)
+
+  def test_zero_window_never_opens(self):
+    breaker = self.breaker(window=0)
+    for _ in range(10):
+      call(breaker, failed=True)
+    self.assertEqual(breaker.state, CLOSED)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+from unittest.mock import MagicMock, patch
+
+import launcher
+
+
+def fake_files(files):
+  def fake_open(path, *args, **kwargs):
+    if path not in files:
+      raise FileNotFoundError(path)
+    return io.StringIO(files[path])
+  return patch('builtins.open', side_effect=fake_open)
+
+
+class TestCPUQuota(unittest.TestCase):
+
+  def test_cgroup_v2_quota(self):
+    with fake_files({'/sys/fs/cgroup/cpu.max': '250000 100000\n'}):
+      self.assertEqual(launcher.cgroup_cpu_limit(), 2.5)
+
+  def test_cgroup_v2_unlimited(self):
+    with fake_files({'/sys/fs/cgroup/cpu.max': 'max 100000\n'}):
+      self.assertIsNone(launcher.cgroup_cpu_limit())
+
+  def test_cgroup_v1_quota(self):
+    with fake_files({'/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '200000\n',
+                     '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000\n'}):
+      self.assertEqual(launcher.cgroup_cpu_limit(), 2)
+
+  def test_cgroup_v1_unlimited(self):
+    with fake_files({'/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '-1\n',
+                     '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000\n'}):
+      self.assertIsNone(launcher.cgroup_cpu_limit())
+
+  @patch('launcher.cgroup_cpu_limit', return_value=0.2)
+  def test_fractional_quota_rounds_up_to_one_worker(self, _):
+    self.assertEqual(launcher.available_cpus(), 1)
+
+  @patch('launcher.cgroup_cpu_limit', return_value=2.5)
+  @patch('os.sched_getaffinity', return_value=set(range(8)))
+  def test_quota_caps_visible_cpus(self, *_):
+    self.assertEqual(launcher.available_cpus(), 3)
+
+
+class TestWorkerCount(unittest.TestCase):
+
+  @patch.dict(os.environ, {}, clear=True)
+  def test_defaults_to_one_worker(self):
+    self.assertEqual(launcher.worker_count(), 1)
+
+  @patch.dict(os.environ, {'GRPC_WORKERS': 'auto'})
+  @patch('launcher.available_cpus', return_value=4)
+  def test_auto_uses_cpu_quota(self, _):
+    self.assertEqual(launcher.worker_count(), 4)
+
+  @patch.dict(os.environ, {'GRPC_WORKERS': '3'})
+  def test_explicit_count(self):
+    self.assertEqual(launcher.worker_count(), 3)
+
+  def test_single_worker_runs_in_process(self):
+    serve = MagicMock()
+    launcher.run(serve, MagicMock(), num_workers=1)
+    serve.assert_called_once_with()
+
+
+
+class TestRun(unittest.TestCase):
+
+  def test_signal_while_forking_reaches_every_worker(self):
+    # SIGTERM arrives right after the first fork; the workers wait for it
+    script = textwrap.dedent('''
+      import os, signal
+      from unittest.mock import MagicMock
+      import launcher
+      fork = os.fork
+      def fork_then_signal():
+        pid = fork()
+        if pid and not os.environ.get('SIGNALLED'):
+          os.environ['SIGNALLED'] = '1'
+          os.kill(os.getpid(), signal.SIGTERM)
+        return pid
+      os.fork = fork_then_signal
+      launcher.run(signal.pause, MagicMock(), num_workers=3)
+    ''')
+    result = subprocess.run([sys.executable, '-c', script], timeout=10,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    self.assertEqual(result.returncode, 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+
+import logger
+
+
+def run_logging(code, **env):
+  """Runs `code` in a fresh interpreter and returns its JSON log lines."""
+  output = subprocess.run(
+    [sys.executable, '-c', textwrap.dedent(code)],
+    env=dict(os.environ, **env), cwd=os.path.dirname(os.path.abspath(__file__)),
+    check=True, capture_output=True, text=True).stdout
+  return [json.loads(line) for line in output.splitlines()]
+
+
+def make_record(level=logging.INFO):
+  return logging.LogRecord('test', level, __file__, 1, 'message %s', ('arg',), None)
+
+
+class TestFilters(unittest.TestCase):
+
+  def test_sampling_keeps_rate_below_warning(self):
+    values = iter([0.05, 0.5, 0.9])
+    sampler = logger.SamplingFilter(0.1, random=lambda: next(values))
+    self.assertTrue(sampler.filter(make_record()))
+    self.assertFalse(sampler.filter(make_record()))
+    self.assertTrue(sampler.filter(make_record(logging.WARNING)))
+
+  def test_sample_rates_from_env(self):
+    os.environ['LOG_SAMPLE_RATES'] = 'a=0.5, b=0'
+    self.addCleanup(os.environ.pop, 'LOG_SAMPLE_RATES')
+    self.assertEqual(logger.sample_rates(), {'a': 0.5, 'b': 0.0})
+
+  def test_handler_does_not_format(self):
+    record = make_record()
+    self.assertIs(logger._QueueHandler(None).prepare(record), record)
+    self.assertEqual(record.args, ('arg',))
+
+
+class TestJsonFormatter(unittest.TestCase):
+
+  def test_fields_in_order(self):
+    record = make_record()
+    record.trace_id, record.span_id = 'abc', 'def'
+    out = logger.JsonFormatter().format(record)
+    self.assertEqual(list(json.loads(out)),
+                     ['timestamp', 'severity', 'name', 'message', 'trace_id', 'span_id'])
+    self.assertEqual(json.loads(out)['message'], 'message arg')
+
+  def test_always_valid_json(self):
+    for message in ['"quoted" \\ \n\t', '\x00\x1f', 'caf\u00e9 \u2603', '\ud800', '{"a": 1}']:
+      record = logging.LogRecord('n"ame', logging.INFO, __file__, 1, message, None, None)
+      self.assertEqual(json.loads(logger.JsonFormatter().format(record))['message'], message)
+
+  def test_bad_arguments_and_exceptions(self):
+    try:
+      raise ValueError('boom')
+    except ValueError:
+      record = logging.LogRecord('n', logging.ERROR, __file__, 1, 'bad %d', ('x',), sys.exc_info())
+    entry = json.loads(logger.JsonFormatter().format(record))
+    self.assertIn('bad %d', entry['message'])
+    self.assertIn('ValueError: boom', entry['exc_info'])
+
+
+class TestQueuedLogging(unittest.TestCase):
+
+  def test_records_are_written_at_exit(self):
+    lines = run_logging('''
+      from logger import getJSONLogger
+      log = getJSONLogger('queued')
+      for i in range(100):
+        log.info('line %d', i)
+    ''')
+    self.assertEqual([l['message'] for l in lines], ['line %d' % i for i in range(100)])
+    self.assertEqual(lines[0]['severity'], 'INFO')
+
+  def test_sampled_logger(self):
+    lines = run_logging('''
+      from logger import getJSONLogger
+      log = getJSONLogger('hot')
+      for i in range(100):
+        log.info('hot %d', i)
+      log.warning('always')
+    ''', LOG_SAMPLE_RATES='hot=0')
+    self.assertEqual([l['message'] for l in lines], ['always'])
+
+  def test_trace_context(self):
+    lines = run_logging('''
+      from opentelemetry import trace
+      from opentelemetry.sdk.trace import TracerProvider
+      from logger import getJSONLogger
+      trace.set_tracer_provider(TracerProvider())
+      log = getJSONLogger('traced')
+      log.info('outside')
+      with trace.get_tracer('test').start_as_current_span('span') as span:
+        log.info('inside')
+    ''')
+    self.assertNotIn('trace_id', lines[0])
+    self.assertEqual(len(lines[1]['trace_id']), 32)
+    self.assertEqual(len(lines[1]['span_id']), 16)
+
+  def test_forked_child_logs(self):
+    lines = run_logging('''
+      import logging, os
+      from logger import getJSONLogger
+      log = getJSONLogger('forked')
+      log.info('parent')
+      pid = os.fork()
+      if pid == 0:
+        log.info('child')
+        logging.shutdown()
+        os._exit(0)
+      os.waitpid(pid, 0)
+    ''')
+    self.assertEqual(sorted(l['message'] for l in lines), ['child', 'parent'])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+import urllib.request
+
+import grpc
+
+import demo_pb2
+import demo_pb2_grpc
+import metrics
+import server_config
+from fake_catalog import FakeProductCatalog, synthetic_products
+
+LIST_PRODUCTS = '/hipstershop.ProductCatalogService/ListProducts'
+GET_PRODUCT = '/hipstershop.ProductCatalogService/GetProduct'
+
+
+class FakeLogger(object):
+  def info(self, message):
+    pass
+
+
+def handled(metric, method, code):
+  return metric.labels(method, code).value
+
+
+class TestRegistry(unittest.TestCase):
+
+  def test_exposition(self):
+    registry = metrics.Registry()
+    counter = registry.counter('requests_total', 'Requests.', ('method',))
+    counter.labels('a"b').inc(2)
+    histogram = registry.histogram('latency_seconds', 'Latency.', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+      histogram.observe(value)
+    registry.callback_gauge('depth', 'Depth.', lambda: 3)
+    registry.callback_gauge('unknown', 'Not yet known.', lambda: None)
+    lines = registry.expose().splitlines()
+    self.assertIn('# TYPE requests_total counter', lines)
+    self.assertIn('requests_total{method="a\\"b"} 2', lines)
+    self.assertIn('latency_seconds_bucket{le="0.1"} 1', lines)
+    self.assertIn('latency_seconds_bucket{le="1.0"} 2', lines)
+    self.assertIn('latency_seconds_bucket{le="+Inf"} 3', lines)
+    self.assertIn('latency_seconds_sum 5.55', lines)
+    self.assertIn('latency_seconds_count 3', lines)
+    self.assertIn('depth 3', lines)
+    self.assertNotIn('unknown None', lines)
+
+  def test_registering_twice_returns_the_same_metric(self):
+    registry = metrics.Registry()
+    self.assertIs(registry.counter('c', 'C.'), registry.counter('c', 'C.'))
+
+  def test_http_endpoint(self):
+    registry = metrics.Registry()
+    registry.counter('up', 'Up.').inc()
+    server = metrics.start_http_server(0, registry, addr='localhost')
+    self.addCleanup(server.shutdown)
+    url = 'http://localhost:%d/metrics' % server.server_address[1]
+    with urllib.request.urlopen(url) as response:
+      self.assertIn('up 1', response.read().decode('utf-8'))
+
+
+class TestInterceptors(unittest.TestCase):
+
+  def test_sync_server_and_client(self):
+    server = server_config.create_server(FakeLogger(), default_max_workers=2)
+    demo_pb2_grpc.add_ProductCatalogServiceServicer_to_server(
+      FakeProductCatalog(synthetic_products(10)), server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    self.addCleanup(server.stop, None)
+    channel = grpc.intercept_channel(grpc.insecure_channel('localhost:%d' % port),
+                                     metrics.ClientMetricsInterceptor())
+    self.addCleanup(channel.close)
+    stub = demo_pb2_grpc.ProductCatalogServiceStub(channel)
+
+    before = [handled(metrics.SERVER_HANDLED, LIST_PRODUCTS, 'OK'),
+              handled(metrics.SERVER_HANDLED, GET_PRODUCT, 'NOT_FOUND'),
+              handled(metrics.CLIENT_HANDLED, LIST_PRODUCTS, 'OK'),
+              handled(metrics.CLIENT_HANDLED, GET_PRODUCT, 'NOT_FOUND')]
+    stub.ListProducts(demo_pb2.Empty())
+    with self.assertRaises(grpc.RpcError):
+      stub.GetProduct(demo_pb2.GetProductRequest(id='missing'))
+    after = [handled(metrics.SERVER_HANDLED, LIST_PRODUCTS, 'OK'),
+             handled(metrics.SERVER_HANDLED, GET_PRODUCT, 'NOT_FOUND'),
+             handled(metrics.CLIENT_HANDLED, LIST_PRODUCTS, 'OK'),
+             handled(metrics.CLIENT_HANDLED, GET_PRODUCT, 'NOT_FOUND')]
+    self.assertEqual([a - b for a, b in zip(after, before)], [1, 1, 1, 1])
+    self.assertEqual(metrics.SERVER_IN_FLIGHT.labels(LIST_PRODUCTS).value, 0)
+    self.assertIn('grpc_server_thread_pool_queue_depth 0', metrics.REGISTRY.expose())
+
+  def test_aio_server_and_client(self):
+    class Catalog(demo_pb2_grpc.ProductCatalogServiceServicer):
+      async def ListProducts(self, request, context):
+        return demo_pb2.ListProductsResponse(products=synthetic_products(3))
+
+    async def run():
+      server = server_config.create_aio_server(FakeLogger())
+      demo_pb2_grpc.add_ProductCatalogServiceServicer_to_server(Catalog(), server)
+      port = server.add_insecure_port('localhost:0')
+      await server.start()
+      try:
+        async with grpc.aio.insecure_channel(
+            'localhost:%d' % port,
+            interceptors=[metrics.AsyncClientMetricsInterceptor()]) as channel:
+          await demo_pb2_grpc.ProductCatalogServiceStub(channel).ListProducts(demo_pb2.Empty())
+      finally:
+        await server.stop(None)
+
+    server_before = metrics.SERVER_LATENCY.labels(LIST_PRODUCTS).counts[:]
+    client_before = handled(metrics.CLIENT_HANDLED, LIST_PRODUCTS, 'OK')
+    asyncio.run(run())
+    self.assertEqual(sum(metrics.SERVER_LATENCY.labels(LIST_PRODUCTS).counts) - sum(server_before), 1)
+    self.assertEqual(handled(metrics.CLIENT_HANDLED, LIST_PRODUCTS, 'OK') - client_before, 1)
+
+
+if __name__ == '__main__':
+  unittest.main()
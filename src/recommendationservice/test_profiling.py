@@ -0,0 +1,102 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import threading
+import unittest
+
+from grpc_health.v1 import health_pb2
+
+import profiling
+import recommendation_server
+
+
+class FakeLogger(object):
+  def info(self, message):
+    pass
+
+  warning = info
+
+
+class FlakyStart(object):
+  """Stands in for googlecloudprofiler.start; fails `failures` times."""
+  def __init__(self, failures, block=None):
+    self.failures = failures
+    self.calls = []
+    self.block = block
+
+  def __call__(self, **kwargs):
+    if self.block is not None:
+      self.block.wait()
+    self.calls.append(kwargs)
+    if len(self.calls) <= self.failures:
+      raise ValueError('profiler backend unreachable')
+
+
+def make_agent(start, attempts=4):
+  return profiling.ProfilerAgent('test', FakeLogger(), attempts=attempts,
+                                 base_delay=0.001, max_delay=0.002, start=start)
+
+
+class TestBackoff(unittest.TestCase):
+
+  def test_delays_are_jittered_and_capped(self):
+    delays = list(profiling.backoff_delays(6, 1.0, 5.0, random.Random(1)))
+    self.assertEqual(len(delays), 5)
+    for n, delay in enumerate(delays):
+      self.assertGreaterEqual(delay, 0)
+      self.assertLessEqual(delay, min(5.0, 2 ** n))
+    self.assertEqual(len(set(delays)), 5)
+
+
+class TestProfilerAgent(unittest.TestCase):
+
+  def test_retries_until_started(self):
+    start = FlakyStart(failures=2)
+    agent = make_agent(start)
+    agent.start_in_background().join(5)
+    self.assertEqual(agent.status, profiling.RUNNING)
+    self.assertEqual(len(start.calls), 3)
+    self.assertTrue(start.calls[0]['disable_wall_profiling'])
+
+  def test_gives_up_after_attempts(self):
+    start = FlakyStart(failures=10)
+    agent = make_agent(start, attempts=3)
+    agent.start_in_background().join(5)
+    self.assertEqual(agent.status, profiling.FAILED)
+    self.assertEqual(len(start.calls), 3)
+    self.assertEqual(agent.health_status(), health_pb2.HealthCheckResponse.NOT_SERVING)
+
+  def test_does_not_block_and_reports_starting(self):
+    release = threading.Event()
+    agent = make_agent(FlakyStart(failures=0, block=release))
+    thread = agent.start_in_background()
+    self.assertEqual(agent.health_status(), health_pb2.HealthCheckResponse.UNKNOWN)
+    release.set()
+    thread.join(5)
+    self.assertEqual(agent.health_status(), health_pb2.HealthCheckResponse.SERVING)
+
+  def test_health_sub_service(self):
+    service = recommendation_server.RecommendationService(catalog=None)
+    response = service.Check(
+      health_pb2.HealthCheckRequest(service=profiling.HEALTH_SERVICE), None)
+    self.assertEqual(response.status, health_pb2.HealthCheckResponse.SERVICE_UNKNOWN)
+    response = service.Check(health_pb2.HealthCheckRequest(), None)
+    self.assertEqual(response.status, health_pb2.HealthCheckResponse.SERVING)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import threading
+import unittest
+
+import demo_pb2
+from catalog_cache import CatalogSnapshot
+from random_source import RandomSource, SEED_METADATA_KEY, request_seed
+from recommendation_server import RecommendationService
+from request_log import RequestRecorder, read_request_log
+from result_cache import ResultCache
+
+
+class FakeCatalogCache(object):
+  def __init__(self, products):
+    self.snapshot = CatalogSnapshot(products)
+
+  def get(self, timeout=None):
+    return self.snapshot
+
+
+class FakeContext(object):
+  def __init__(self, seed=None):
+    self.metadata = ((SEED_METADATA_KEY, seed),) if seed is not None else ()
+
+  def invocation_metadata(self):
+    return self.metadata
+
+  def time_remaining(self):
+    return None
+
+
+def make_service(random_source=None, results=None, recorder=None):
+  catalog = FakeCatalogCache(
+    demo_pb2.Product(id='P%d' % i, categories=['C%d' % (i % 5)]) for i in range(200))
+  return RecommendationService(catalog, results=results or ResultCache(max_entries=0),
+                               random_source=random_source, recorder=recorder)
+
+
+def recommend(service, seed=None, user_id='u', product_ids=('P1', 'P2')):
+  request = demo_pb2.ListRecommendationsRequest(user_id=user_id, product_ids=product_ids)
+  return list(demo_pb2.ListRecommendationsResponse.FromString(
+    service.ListRecommendations(request, FakeContext(seed))).product_ids)
+
+
+class TestRandomSource(unittest.TestCase):
+
+  def test_seeded_source_is_reproducible(self):
+    first = [recommend(make_service(RandomSource('42'))) for _ in range(3)]
+    second = [recommend(make_service(RandomSource('42'))) for _ in range(3)]
+    self.assertEqual(first, second)
+
+  def test_generators_are_per_thread(self):
+    source = RandomSource('42')
+    seen = []
+    def worker():
+      seen.append(source.current())
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+      thread.start()
+      thread.join()
+    self.assertIsNot(seen[0], seen[1])
+    self.assertIs(source.current(), source.current())
+
+  def test_request_seed_is_deterministic(self):
+    service = make_service(results=ResultCache())
+    results = {tuple(recommend(service, seed='7')) for _ in range(5)}
+    self.assertEqual(len(results), 1)
+    self.assertEqual(results.pop(), tuple(recommend(make_service(RandomSource('other')), seed='7')))
+
+  def test_request_seed_bypasses_result_cache(self):
+    results = ResultCache()
+    service = make_service(results=results)
+    recommend(service, seed='7')
+    self.assertEqual(results.stats()['size'], 0)
+
+  def test_request_seed_from_metadata(self):
+    self.assertEqual(request_seed(FakeContext('9')), '9')
+    self.assertIsNone(request_seed(FakeContext()))
+    self.assertIsNone(request_seed(None))
+
+
+class TestRequestLog(unittest.TestCase):
+
+  def test_round_trip(self):
+    fd, path = tempfile.mkstemp(suffix='.jsonl')
+    os.close(fd)
+    self.addCleanup(os.remove, path)
+    recorder = RequestRecorder(path)
+    service = make_service(recorder=recorder)
+    recommend(service, user_id='a', product_ids=['P3'])
+    recommend(service, seed='5', user_id='b', product_ids=[])
+    recorder.close()
+
+    entries = list(read_request_log(path))
+    self.assertEqual([(r.user_id, list(r.product_ids), s) for r, s in entries],
+                     [('a', ['P3'], None), ('b', [], '5')])
+
+
+if __name__ == '__main__':
+  unittest.main()
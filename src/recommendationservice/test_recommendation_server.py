@@ -0,0 +1,141 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+from unittest import mock
+
+import demo_pb2
+from catalog_cache import CatalogCache, CatalogSnapshot
+from fake_catalog import start_fake_catalog, synthetic_products
+import metrics
+import recommendation_server
+from recommendation_server import RecommendationService, create_result_cache
+
+
+class FakeCatalogCache(object):
+  def __init__(self, products):
+    self.snapshot = CatalogSnapshot(products)
+    self.gets = 0
+
+  def get(self, timeout=None):
+    self.gets += 1
+    return self.snapshot
+
+
+def make_service(results=None):
+  catalog = FakeCatalogCache(
+    demo_pb2.Product(id='P%d' % i, categories=['C%d' % (i % 3)]) for i in range(30))
+  return RecommendationService(catalog, results=results), catalog
+
+
+def make_request(user_id, product_ids):
+  return demo_pb2.ListRecommendationsRequest(user_id=user_id, product_ids=product_ids)
+
+
+class TestRecommendationService(unittest.TestCase):
+
+  def test_list_recommendations(self):
+    service, _ = make_service()
+    response = demo_pb2.ListRecommendationsResponse.FromString(
+      service.ListRecommendations(make_request('u', ['P0']), None))
+    self.assertEqual(len(response.product_ids), 5)
+    self.assertNotIn('P0', response.product_ids)
+
+  def test_batch_uses_one_snapshot(self):
+    service, catalog = make_service()
+    batch = demo_pb2.ListRecommendationsBatchRequest(requests=[
+      make_request('u%d' % i, ['P%d' % i]) for i in range(10)])
+    response = demo_pb2.ListRecommendationsBatchResponse.FromString(
+      service.ListRecommendationsBatch(batch, None))
+    self.assertEqual(catalog.gets, 1)
+    self.assertEqual(len(response.responses), 10)
+    for i, answer in enumerate(response.responses):
+      self.assertEqual(len(answer.product_ids), 5)
+      self.assertNotIn('P%d' % i, answer.product_ids)
+
+  def test_stream_answers_in_order(self):
+    service, catalog = make_service()
+    requests = [make_request('u%d' % i, ['P%d' % i]) for i in range(4)]
+    responses = [demo_pb2.ListRecommendationsResponse.FromString(r)
+                 for r in service.StreamRecommendations(iter(requests), None)]
+    self.assertEqual(catalog.gets, 1)
+    self.assertEqual(len(responses), 4)
+    for i, answer in enumerate(responses):
+      self.assertNotIn('P%d' % i, answer.product_ids)
+
+  def test_repeat_requests_are_served_from_the_cache(self):
+    service, catalog = make_service()
+    first = service.ListRecommendations(make_request('u', ['P1', 'P2']), None)
+    for _ in range(5):
+      self.assertEqual(
+        service.ListRecommendations(make_request('u', ['P2', 'P1']), None), first)
+    self.assertEqual(service.results.stats()['hits'], 5)
+
+  def test_catalog_change_invalidates_cached_results(self):
+    service, catalog = make_service()
+    service.ListRecommendations(make_request('u', ['P1']), None)
+    catalog.snapshot = CatalogSnapshot([demo_pb2.Product(id='NEW')])
+    response = demo_pb2.ListRecommendationsResponse.FromString(
+      service.ListRecommendations(make_request('u', ['P1']), None))
+    self.assertEqual(list(response.product_ids), ['NEW'])
+
+  def test_result_cache_metrics(self):
+    results = create_result_cache()
+    results.put('k', 'v1', b'')
+    results.get('k', 'v1')
+    results.get('other', 'v1')
+    exposed = metrics.REGISTRY.expose()
+    self.assertIn('recommendation_result_cache_entries 1', exposed)
+    self.assertIn('recommendation_result_cache_hits_total 1', exposed)
+    self.assertIn('recommendation_result_cache_misses_total 1', exposed)
+
+  def test_catalog_cache_metrics(self):
+    clock = mock.Mock(return_value=0.0)
+    catalog = CatalogCache(lambda timeout: synthetic_products(3), ttl=10, clock=clock)
+    recommendation_server.register_catalog_metrics(catalog)
+    catalog.get()
+    catalog.get()
+    catalog.get()
+    clock.return_value = 20.0
+    catalog.refresh()
+    exposed = metrics.REGISTRY.expose()
+    self.assertIn('catalog_snapshot_age_seconds 0.0', exposed)
+    self.assertIn('catalog_cache_hits_total 2', exposed)
+    self.assertIn('catalog_cache_stale_hits_total 0', exposed)
+    self.assertIn('catalog_cache_misses_total 1', exposed)
+    self.assertIn('catalog_cache_coalesced_total 0', exposed)
+    self.assertIn('catalog_cache_refreshes_total 2', exposed)
+    self.assertIn('catalog_cache_refresh_errors_total 0', exposed)
+
+
+class TestServe(unittest.TestCase):
+
+  def test_request_recorder_is_closed_on_shutdown(self):
+    catalog_server, _, catalog_port = start_fake_catalog(synthetic_products(10))
+    self.addCleanup(catalog_server.stop, None)
+    env = {'RECOMMENDATION_REQUEST_LOG': 'requests.jsonl'}
+    with mock.patch.dict(os.environ, env), \
+         mock.patch('recommendation_server.RequestRecorder') as recorder, \
+         mock.patch('launcher.wait_for_termination',
+                    side_effect=lambda server, logger: server.stop(None)):
+      recommendation_server.serve('0', 'localhost:%d' % catalog_port)
+    recorder.assert_called_once_with('requests.jsonl')
+    recorder.return_value.close.assert_called_once_with()
+
+
+if __name__ == '__main__':
+  unittest.main()
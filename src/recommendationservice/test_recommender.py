@@ -0,0 +1,80 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import unittest
+
+import demo_pb2
+from catalog_cache import CatalogSnapshot
+from recommender import CategoryRecommender
+
+
+def make_snapshot(products):
+  return CatalogSnapshot(
+    demo_pb2.Product(id=pid, categories=categories) for pid, categories in products)
+
+
+CATALOG = make_snapshot([
+  ('HAT', ['clothing', 'accessories']),
+  ('TOP', ['clothing', 'tops']),
+  ('TEE', ['clothing', 'tops']),
+  ('WATCH', ['accessories']),
+  ('MUG', ['kitchen']),
+  ('JAR', ['kitchen']),
+  ('CANDLE', ['home']),
+])
+
+
+class TestCategoryIndex(unittest.TestCase):
+
+  def test_index_is_built_with_the_snapshot(self):
+    index = CATALOG.category_index
+    self.assertEqual(sorted(CATALOG.product_ids[i] for i in index['tops']), ['TEE', 'TOP'])
+    self.assertEqual(CATALOG.categories[CATALOG.positions['HAT']],
+                     frozenset(['clothing', 'accessories']))
+
+
+class TestCategoryRecommender(unittest.TestCase):
+
+  def test_highest_overlap_comes_first(self):
+    recommender = CategoryRecommender()
+    for seed in range(20):
+      result = recommender.recommend(CATALOG, ['TOP'], 5, random.Random(seed))
+      self.assertEqual(result[0], 'TEE')
+      self.assertEqual(result[1], 'HAT')
+      self.assertEqual(len(result), 5)
+      self.assertNotIn('TOP', result)
+      self.assertEqual(len(set(result)), 5)
+
+  def test_fewer_matches_than_requested(self):
+    result = CategoryRecommender().recommend(CATALOG, ['MUG'], 1)
+    self.assertEqual(result, ['JAR'])
+
+  def test_unknown_products_fall_back_to_random(self):
+    result = CategoryRecommender().recommend(CATALOG, ['unknown'], 5)
+    self.assertEqual(len(set(result)), 5)
+
+  def test_large_categories_are_subsampled(self):
+    snapshot = make_snapshot(
+      [('SEED', ['big'])] + [('P%d' % i, ['big']) for i in range(1000)])
+    result = CategoryRecommender(max_candidates_per_category=10).recommend(
+      snapshot, ['SEED'], 5)
+    self.assertEqual(len(set(result)), 5)
+    self.assertNotIn('SEED', result)
+
+
+if __name__ == '__main__':
+  unittest.main()
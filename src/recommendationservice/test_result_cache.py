@@ -0,0 +1,73 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from result_cache import ResultCache
+
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+
+class TestResultCache(unittest.TestCase):
+
+  def test_hit_and_miss(self):
+    cache = ResultCache(max_entries=10, ttl=5, clock=FakeClock())
+    self.assertIsNone(cache.get('a', 'v1'))
+    cache.put('a', 'v1', b'result')
+    self.assertEqual(cache.get('a', 'v1'), b'result')
+    stats = cache.stats()
+    self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+    self.assertEqual(stats['hit_ratio'], 0.5)
+
+  def test_entries_expire(self):
+    clock = FakeClock()
+    cache = ResultCache(max_entries=10, ttl=5, clock=clock)
+    cache.put('a', 'v1', b'result')
+    clock.now = 6
+    self.assertIsNone(cache.get('a', 'v1'))
+
+  def test_least_recently_used_entry_is_evicted(self):
+    cache = ResultCache(max_entries=2, ttl=5, clock=FakeClock())
+    cache.put('a', 'v1', 1)
+    cache.put('b', 'v1', 2)
+    cache.get('a', 'v1')
+    cache.put('c', 'v1', 3)
+    self.assertEqual(cache.get('a', 'v1'), 1)
+    self.assertIsNone(cache.get('b', 'v1'))
+    self.assertEqual(len(cache), 2)
+    self.assertEqual(cache.stats()['evictions'], 1)
+
+  def test_new_catalog_version_clears_entries(self):
+    cache = ResultCache(max_entries=10, ttl=5, clock=FakeClock())
+    cache.put('a', 'v1', 1)
+    self.assertIsNone(cache.get('a', 'v2'))
+    self.assertEqual(len(cache), 0)
+    self.assertEqual(cache.stats()['invalidations'], 1)
+
+  def test_zero_entries_disables_the_cache(self):
+    cache = ResultCache(max_entries=0)
+    cache.put('a', 'v1', 1)
+    self.assertIsNone(cache.get('a', 'v1'))
+
+
+if __name__ == '__main__':
+  unittest.main()
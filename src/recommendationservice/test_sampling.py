@@ -0,0 +1,57 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import unittest
+
+import demo_pb2
+from catalog_cache import CatalogSnapshot
+from sampling import sample_excluding
+
+
+def make_snapshot(num_products):
+  return CatalogSnapshot(
+    demo_pb2.Product(id='P%d' % i) for i in range(num_products))
+
+
+class TestSampleExcluding(unittest.TestCase):
+
+  def test_returns_distinct_ids_outside_the_excluded_set(self):
+    snapshot = make_snapshot(100)
+    excluded = ['P%d' % i for i in range(10)]
+    for seed in range(50):
+      result = sample_excluding(snapshot, excluded, 5, random.Random(seed))
+      self.assertEqual(len(result), 5)
+      self.assertEqual(len(set(result)), 5)
+      self.assertFalse(set(result) & set(excluded))
+
+  def test_small_catalog_returns_everything_not_excluded(self):
+    snapshot = make_snapshot(6)
+    result = sample_excluding(snapshot, ['P0', 'P1', 'unknown'], 5)
+    self.assertEqual(sorted(result), ['P2', 'P3', 'P4', 'P5'])
+
+  def test_everything_excluded(self):
+    snapshot = make_snapshot(3)
+    self.assertEqual(sample_excluding(snapshot, ['P0', 'P1', 'P2'], 5), [])
+    self.assertEqual(sample_excluding(make_snapshot(0), [], 5), [])
+
+  def test_duplicate_catalog_ids_are_sampled_once(self):
+    snapshot = CatalogSnapshot(demo_pb2.Product(id=i) for i in ['A', 'A', 'B'])
+    self.assertEqual(sorted(sample_excluding(snapshot, [], 5)), ['A', 'B'])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import grpc
+
+import server_config
+
+
+class TestServerConfig(unittest.TestCase):
+
+  @patch.dict(os.environ, {}, clear=True)
+  def test_defaults(self):
+    config = server_config.ServerConfig.from_env(default_max_workers=4)
+    self.assertEqual(config.max_workers, 4)
+    self.assertEqual(config.max_concurrent_rpcs, 16)
+    self.assertEqual(config.options, [('grpc.so_reuseport', 1)])
+
+  @patch.dict(os.environ, {'GRPC_MAX_WORKERS': '8',
+                           'GRPC_MAX_CONCURRENT_RPCS': '100',
+                           'GRPC_KEEPALIVE_TIME_MS': '30000',
+                           'GRPC_MAX_RECEIVE_MESSAGE_LENGTH': '1048576'}, clear=True)
+  def test_values_from_env(self):
+    config = server_config.ServerConfig.from_env(default_max_workers=4)
+    self.assertEqual(config.max_workers, 8)
+    self.assertEqual(config.max_concurrent_rpcs, 100)
+    self.assertEqual(dict(config.options), {
+      'grpc.so_reuseport': 1,
+      'grpc.keepalive_time_ms': 30000,
+      'grpc.max_receive_message_length': 1048576,
+    })
+
+  @patch.dict(os.environ, {'GRPC_MAX_WORKERS': 'ten'})
+  def test_invalid_value(self):
+    with self.assertRaises(Exception):
+      server_config.ServerConfig.from_env(default_max_workers=4)
+
+
+class TestQueueDepth(unittest.TestCase):
+
+  def test_waiting_work_is_counted(self):
+    executor = server_config._CountingThreadPoolExecutor(1)
+    self.addCleanup(executor.shutdown)
+    started, release = threading.Event(), threading.Event()
+    def block():
+      started.set()
+      release.wait()
+    running = executor.submit(block)
+    started.wait()
+    waiting = [executor.submit(lambda: None) for _ in range(2)]
+    self.assertEqual(executor.queue_depth(), 2)
+    release.set()
+    for future in [running] + waiting:
+      future.result()
+    self.assertEqual(executor.queue_depth(), 0)
+
+
+class TestLoadShedding(unittest.TestCase):
+
+  @patch.dict(os.environ, {'GRPC_MAX_WORKERS': '2', 'GRPC_MAX_CONCURRENT_RPCS': '1'})
+  def test_rpcs_over_the_limit_are_rejected(self):
+    release = threading.Event()
+    entered = threading.Event()
+    def block(request, context):
+      entered.set()
+      release.wait(10)
+      return request
+    handler = grpc.method_handlers_generic_handler('test.Blocking', {
+      'Call': grpc.unary_unary_rpc_method_handler(block)})
+    server = server_config.create_server(MagicMock(), default_max_workers=2)
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    try:
+      with grpc.insecure_channel('localhost:%d' % port) as channel:
+        call = channel.unary_unary('/test.Blocking/Call')
+        first = call.future(b'first')
+        self.assertTrue(entered.wait(5))
+        with self.assertRaises(grpc.RpcError) as raised:
+          call(b'second', timeout=5)
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        release.set()
+        self.assertEqual(first.result(timeout=5), b'first')
+    finally:
+      release.set()
+      server.stop(0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import glob
+import os
+import unittest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Each service is built from its own directory, so these modules are
+# copied into every service that uses them.
+SHARED = {
+  'launcher.py': ('emailservice', 'popupservice', 'recommendationservice'),
+  'logger.py': ('emailservice', 'popupservice', 'recommendationservice'),
+  'metrics.py': ('emailservice', 'popupservice', 'recommendationservice'),
+  'server_config.py': ('emailservice', 'popupservice', 'recommendationservice'),
+  'profiling.py': ('emailservice', 'recommendationservice'),
+  'catalog_client.py': ('popupservice', 'recommendationservice'),
+  'catalog_watch.py': ('popupservice', 'recommendationservice'),
+  'circuit_breaker.py': ('popupservice', 'recommendationservice'),
+  'fake_catalog.py': ('popupservice', 'recommendationservice'),
+}
+
+def read(service, module):
+  with open(os.path.join(SRC, service, module), 'rb') as f:
+    return f.read()
+
+@unittest.skipUnless(os.path.isdir(os.path.join(SRC, 'popupservice')),
+                     'needs the other services, e.g. outside a service image')
+class SharedModulesTest(unittest.TestCase):
+  def test_copies_are_identical(self):
+    for module, services in SHARED.items():
+      expected = read('recommendationservice', module)
+      for service in services:
+        with self.subTest(module=module, service=service):
+          self.assertEqual(read(service, module), expected,
+                           '{}/{} differs from recommendationservice/{}'.format(service, module, module))
+
+  def test_every_shared_module_is_listed(self):
+    for path in glob.glob(os.path.join(SRC, '*', '*.py')):
+      with open(path) as f:
+        shared = '\n# This module is shared by' in f.read()
+      if shared:
+        module = os.path.basename(path)
+        service = os.path.basename(os.path.dirname(path))
+        with self.subTest(path=path):
+          self.assertIn(service, SHARED.get(module, ()))
+
+if __name__ == '__main__':
+  unittest.main()
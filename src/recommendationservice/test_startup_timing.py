@@ -0,0 +1,85 @@
+#!/usr/bin/python
+#
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import unittest
+
+import demo_pb2
+from grpc_health.v1 import health_pb2
+from catalog_cache import CatalogSnapshot
+from recommendation_server import RecommendationService
+from startup_timing import FIRST_REQUEST, FIRST_SERVING_HEALTH, IMPORTS, StartupTimer
+
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 100.0
+
+  def __call__(self):
+    return self.now
+
+
+class FakeLogger(object):
+  def __init__(self):
+    self.messages = []
+
+  def info(self, message):
+    self.messages.append(message)
+
+
+class FakeCatalogCache(object):
+  def __init__(self):
+    self.snapshot = CatalogSnapshot([demo_pb2.Product(id='P%d' % i) for i in range(10)])
+
+  def get(self, timeout=None):
+    return self.snapshot
+
+
+class TestStartupTimer(unittest.TestCase):
+
+  def test_first_mark_counts_and_report_is_logged_once(self):
+    clock, logger = FakeClock(), FakeLogger()
+    timer = StartupTimer(logger, clock=clock)
+    clock.now += 0.1
+    timer.mark(IMPORTS)
+    clock.now += 0.2
+    timer.mark(FIRST_SERVING_HEALTH)
+    clock.now += 0.3
+    timer.mark(FIRST_SERVING_HEALTH)
+    self.assertEqual(logger.messages, [])
+    timer.mark(FIRST_REQUEST)
+    timer.mark(FIRST_REQUEST)
+    self.assertEqual(timer.report(), {'imports_ms': 100.0,
+                                      'first_serving_health_ms': 300.0,
+                                      'first_request_ms': 600.0})
+    self.assertEqual(len(logger.messages), 1)
+
+  def test_service_marks_health_and_first_request(self):
+    timer = StartupTimer(FakeLogger())
+    service = RecommendationService(FakeCatalogCache(), startup=timer)
+    service.Check(health_pb2.HealthCheckRequest(), None)
+    self.assertEqual(set(timer.elapsed), {FIRST_SERVING_HEALTH})
+    service.ListRecommendations(
+      demo_pb2.ListRecommendationsRequest(user_id='u', product_ids=['P1']), None)
+    self.assertEqual(set(timer.elapsed), {FIRST_SERVING_HEALTH, FIRST_REQUEST})
+
+  def test_disabled_telemetry_is_not_imported(self):
+    self.assertNotIn('googlecloudprofiler', sys.modules)
+    self.assertNotIn('opentelemetry.sdk.trace', sys.modules)
+
+
+if __name__ == '__main__':
+  unittest.main()